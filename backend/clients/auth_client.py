@@ -0,0 +1,222 @@
+##########
+# ### Import Packages
+
+# import base packages
+import asyncio
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+# import packages for jwt verification
+import jwt
+from jwt.algorithms import has_crypto
+from pydantic import BaseModel, Field
+from supabase import Client
+
+# import logging client and shared cache
+from clients.logging_client import LoggingClient
+from utils.cache import TTLCache
+
+# configure logger
+logger = LoggingClient.get_logger(__name__)
+
+# algorithms accepted for local verification
+SYMMETRIC_ALGORITHMS = {"HS256"}
+ASYMMETRIC_ALGORITHMS = {"RS256", "ES256"}
+
+# signing keys kept, projects publish a handful at most, and how long one is used before it is fetched again
+MAX_SIGNING_KEYS = 16
+SIGNING_KEY_TTL_SECONDS = 86400
+
+# minimum pause between jwks fetches for unknown kids, tokens with a kid seen in between are verified remotely
+JWKS_REFRESH_INTERVAL_SECONDS = 30
+
+##########
+# ### Auth Types
+
+class AuthenticationError(Exception):
+    """Raised when a bearer token cannot be verified."""
+
+
+class AuthenticatedUser(BaseModel):
+    """Identity extracted from a verified Supabase access token."""
+
+    user_id: str
+    email: str | None = None
+    # supabase access tokens do not carry it, so it is None for locally verified users
+    # unless a custom access token hook adds a created_at claim
+    created_at: str | None = None
+    metadata: dict[str, Any] = Field(default_factory=dict)
+    verified_locally: bool = True
+
+##########
+# ### Supabase Auth Client
+
+class SupabaseAuthClient:
+    def __init__(self, supabase: Client):
+        # remote client is only used as a fallback
+        self._supabase = supabase
+
+        # retrieve verification settings from environment variables
+        self._jwt_secret = os.getenv("SUPABASE_JWT_SECRET") or None
+        self._audience = os.getenv("SUPABASE_JWT_AUDIENCE", "authenticated")
+        self._leeway = int(os.getenv("AUTH_JWT_LEEWAY_SECONDS", "10"))
+
+        # jwks endpoint for asymmetric signing keys, derived from the project url
+        # asymmetric verification requires the optional `cryptography` package
+        supabase_url = os.getenv("SUPABASE_URL", "").rstrip("/")
+        jwks_url = os.getenv("SUPABASE_JWKS_URL") or (
+            f"{supabase_url}/auth/v1/.well-known/jwks.json" if supabase_url else None
+        )
+        self._jwks_client = jwt.PyJWKClient(jwks_url, cache_keys=True) if jwks_url and has_crypto else None
+        self._signing_keys: TTLCache[str, jwt.PyJWK] = TTLCache(
+            max_entries=MAX_SIGNING_KEYS,
+            ttl_seconds=SIGNING_KEY_TTL_SECONDS,
+        )
+        self._last_jwks_refresh = float("-inf")
+
+        # bounded cache of token digest -> verified user
+        self._token_cache: TTLCache[str, AuthenticatedUser] = TTLCache(
+            max_entries=int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000")),
+            ttl_seconds=float(os.getenv("AUTH_CACHE_TTL_SECONDS", "300")),
+        )
+
+        # dedicated pool so remote verification never blocks the event loop
+        self._executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("AUTH_REMOTE_WORKERS", "4")),
+            thread_name_prefix="supabase-auth",
+        )
+
+        logger.info(
+            "initialized supabase auth client (hs256=%s, jwks=%s)",
+            self._jwt_secret is not None,
+            self._jwks_client is not None,
+        )
+
+    # method to verify a bearer token and return the user it belongs to
+    async def authenticate(self, token: str) -> AuthenticatedUser:
+        # serve repeated tokens straight from the cache
+        cache_key = hashlib.sha256(token.encode()).hexdigest()
+        cached_user = self._token_cache.get(cache_key)
+        if cached_user is not None:
+            return cached_user
+
+        # verify locally when a key is available, otherwise ask supabase
+        claims = await self._verify_locally(token)
+        if claims is not None:
+            user = AuthenticatedUser(
+                user_id=claims["sub"],
+                email=claims.get("email"),
+                created_at=str(claims["created_at"]) if claims.get("created_at") else None,
+                metadata=claims.get("user_metadata") or {},
+            )
+            expires_in = claims["exp"] - time.time()
+        else:
+            user = await self._verify_remotely(token)
+            expires_in = self._token_cache.ttl_seconds
+
+            # supabase just accepted the token, its exp still bounds how long it may be served from the cache
+            try:
+                unverified = jwt.decode(token, options={"verify_signature": False})
+                if isinstance(unverified.get("exp"), (int, float)):
+                    expires_in = min(expires_in, unverified["exp"] - time.time())
+            except jwt.PyJWTError:
+                pass
+
+        self._token_cache.set(cache_key, user, expires_at=time.monotonic() + expires_in)
+
+        return user
+
+    # method to verify signature, expiry and audience without a network call
+    async def _verify_locally(self, token: str) -> dict[str, Any] | None:
+        try:
+            header = jwt.get_unverified_header(token)
+        except jwt.PyJWTError as e:
+            raise AuthenticationError("malformed token") from e
+
+        algorithm = header.get("alg")
+        key = await self._get_verification_key(algorithm, header.get("kid"))
+
+        # no key for this token, caller falls back to remote verification
+        if key is None:
+            return None
+
+        try:
+            return jwt.decode(
+                token,
+                key=key,
+                algorithms=[algorithm],
+                audience=self._audience,
+                leeway=self._leeway,
+                options={"require": ["exp", "sub"]},
+            )
+        except jwt.PyJWTError as e:
+            raise AuthenticationError(f"invalid token: {e}") from e
+
+    # method to resolve the key a token should be verified with
+    async def _get_verification_key(self, algorithm: str | None, kid: str | None) -> Any:
+        if algorithm in SYMMETRIC_ALGORITHMS:
+            return self._jwt_secret
+
+        if algorithm not in ASYMMETRIC_ALGORITHMS or self._jwks_client is None or kid is None:
+            return None
+
+        # signing keys rotate rarely, so only unseen kids trigger a fetch
+        signing_key = self._signing_keys.get(kid)
+        if signing_key is None:
+            # any client can send arbitrary kids, so fetch at most once per interval
+            now = time.monotonic()
+            if now - self._last_jwks_refresh < JWKS_REFRESH_INTERVAL_SECONDS:
+                return None
+            self._last_jwks_refresh = now
+
+            try:
+                loop = asyncio.get_running_loop()
+                signing_key = await loop.run_in_executor(
+                    self._executor, self._jwks_client.get_signing_key, kid
+                )
+            except jwt.PyJWTError:
+                logger.exception("could not fetch signing key %s from jwks", kid)
+                return None
+
+            self._signing_keys.set(kid, signing_key)
+
+        return signing_key.key
+
+    # method to verify a token with the supabase auth api off the event loop
+    async def _verify_remotely(self, token: str) -> AuthenticatedUser:
+        loop = asyncio.get_running_loop()
+
+        try:
+            response = await loop.run_in_executor(self._executor, self._supabase.auth.get_user, token)
+        except Exception as e:
+            raise AuthenticationError("remote token verification failed") from e
+
+        if not response or not response.user:
+            raise AuthenticationError("invalid or expired token")
+
+        user = response.user
+        return AuthenticatedUser(
+            user_id=user.id,
+            email=user.email,
+            created_at=str(user.created_at) if user.created_at else None,
+            metadata=user.user_metadata or {},
+            verified_locally=False,
+        )
+
+    # method to report token cache usage for health checks
+    def get_stats(self) -> dict[str, Any]:
+        stats = self._token_cache.stats()
+        lookups = stats["hits"] + stats["misses"]
+        return {
+            **stats,
+            "hit_rate": round(stats["hits"] / lookups, 4) if lookups else None,
+            "signing_keys": len(self._signing_keys),
+        }
+
+    # method to release the remote verification pool
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        logger.info("closed supabase auth client")
@@ -5,9 +5,8 @@
 import os
 
 # import langgraph packages
-from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
-from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
 from psycopg import AsyncConnection
 from psycopg.rows import DictRow, dict_row
 
@@ -16,21 +15,75 @@ from psycopg_pool import AsyncConnectionPool
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 
-# import logging client
+# import logging client, checkpoint serializer, local checkpointers and shared cache
 from clients.logging_client import LoggingClient
+from clients.postgres_client.local_checkpointer import BoundedMemorySaver, close_local_checkpointer, get_local_checkpointer
+from clients.postgres_client.serde import get_checkpoint_serializer
+from utils.cache import TTLCache
 # from clients.postgres_client.queries.service_consents import ServiceConsentMethodsMixin
 
 # import mixins classes for db methods
+from clients.postgres_client.queries.checkpoints import CheckpointRetention, CheckpointRetentionMethodsMixin
+from clients.postgres_client.queries.locks import AdvisoryLockMethodsMixin
+from clients.postgres_client.queries.run_events import RunEventMethodsMixin
+from clients.postgres_client.queries.run_queue import RunQueueMethodsMixin
+from clients.postgres_client.queries.thread_messages import ThreadMessageMethodsMixin
 from clients.postgres_client.queries.threads import ThreadMethodsMixin
 
 # configure logger
 logger = LoggingClient.get_logger(__name__)
 
+##########
+# ### Connection Pool Sizing
+
+# shares of each worker's connection budget given to the run lock pool and the langgraph checkpointer pool
+LOCK_POOL_SHARE = 1 / 4
+CHECKPOINTER_POOL_SHARE = 1 / 2
+
+# function to size per-worker pools from the global connection budget
+def get_pool_sizes() -> dict[str, int]:
+    # every admitted run pins one lock pool connection, so an explicit run limit sizes the lock pool
+    max_runs = os.getenv("MAX_CONCURRENT_RUNS")
+
+    # unset budget keeps the single-process defaults
+    budget = os.getenv("POSTGRES_MAX_CONNECTIONS")
+    if not budget:
+        return {
+            "engine_pool_size": 5,
+            "engine_max_overflow": 10,
+            "psycopg_min_size": 5,
+            "psycopg_max_size": 15,
+            "lock_pool_max_size": max(1, int(max_runs or 10)),
+        }
+
+    # every worker process opens its own pools, so divide the budget between them
+    workers = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+    per_worker = max(5, int(budget) // workers)
+
+    # lock pool holds run locks, checkpointer pool serves checkpoints, the engine serves app queries
+    lock_pool_max_size = max(1, int(max_runs) if max_runs else int(per_worker * LOCK_POOL_SHARE))
+    psycopg_max_size = max(2, int(per_worker * CHECKPOINTER_POOL_SHARE))
+    engine_connections = max(2, per_worker - lock_pool_max_size - psycopg_max_size)
+    engine_pool_size = max(1, engine_connections // 2)
+
+    return {
+        "engine_pool_size": engine_pool_size,
+        "engine_max_overflow": engine_connections - engine_pool_size,
+        "psycopg_min_size": max(1, psycopg_max_size // 3),
+        "psycopg_max_size": psycopg_max_size,
+        "lock_pool_max_size": lock_pool_max_size,
+    }
+
 ##########
 # ### Postgres Database Client
 
 class AsyncPostgresClient(
     ThreadMethodsMixin,
+    AdvisoryLockMethodsMixin,
+    RunEventMethodsMixin,
+    RunQueueMethodsMixin,
+    CheckpointRetentionMethodsMixin,
+    ThreadMessageMethodsMixin,
     # ServiceConsentMethodsMixin
 ):
     def __init__(self):
@@ -41,24 +94,44 @@ class AsyncPostgresClient(
         port = os.getenv("POSTGRES_PORT", "5432")
         database = os.getenv("POSTGRES_DB")
 
+        # in-process cache of owned threads, invalidated locally by delete_thread_id
+        # other workers only notice a delete once their entry expires, so keep the ttl short
+        self._thread_ownership_cache = TTLCache(
+            max_entries=int(os.getenv("THREAD_OWNERSHIP_CACHE_MAX_ENTRIES", "50000")),
+            ttl_seconds=float(os.getenv("THREAD_OWNERSHIP_CACHE_TTL_SECONDS", "30")),
+        )
+
+        # which historical checkpoints pruning keeps, see CheckpointRetention, pruning is opt-in
+        self.checkpoint_retention = CheckpointRetention(os.getenv("CHECKPOINT_RETENTION", "all"))
+        self.checkpoint_keep_last = max(1, int(os.getenv("CHECKPOINT_KEEP_LAST", "20")))
+
+        # checkpoint and archived message serializer, built here so CHECKPOINT_COMPRESSION* from .env apply
+        self._message_serde = get_checkpoint_serializer()
+
         # if running with no database
         self._skip_pings = os.getenv("POSTGRES_HOST") in (None, "localhost", '')
 
         if self._skip_pings:
             logger.info("running with postgres client in local mode, skipping pings")
             self.psycopg_pool = None  # type: ignore
-            self.checkpointer = MemorySaver()
+            self.lock_pool = None  # type: ignore
+            self._psycopg_conninfo = None
+            self.checkpointer = get_local_checkpointer()
             self.engine = None
             return
 
+        # per-worker pool sizes derived from POSTGRES_MAX_CONNECTIONS
+        pool_sizes = get_pool_sizes()
+        logger.info(f"postgres pool sizes for this worker: {pool_sizes}")
+
         # sqlalchemy connection used for flexibility in db driver
         alchemy_connection_string = f"postgresql+asyncpg://{user}:{password}@{host}:{port}/{database}"
 
         # TODO work with ENG to adjust settings
         self.engine = create_async_engine(
             url=alchemy_connection_string,
-            pool_size=5,
-            max_overflow=10,
+            pool_size=pool_sizes["engine_pool_size"],
+            max_overflow=pool_sizes["engine_max_overflow"],
             pool_timeout=30,
             pool_recycle=1800,
             pool_pre_ping=True,
@@ -69,12 +142,28 @@ class AsyncPostgresClient(
 
         # psycopg3 connection required by langgraph
         psycopg_connection_string = f"postgresql://{user}:{password}@{host}:{port}/{database}"
+        self._psycopg_conninfo = psycopg_connection_string
 
         # TODO work with ENG to adjust settings
         self.psycopg_pool: AsyncConnectionPool[AsyncConnection[DictRow]] = AsyncConnectionPool(  # type: ignore
             conninfo=psycopg_connection_string,
-            min_size=5,
-            max_size=15,
+            min_size=pool_sizes["psycopg_min_size"],
+            max_size=pool_sizes["psycopg_max_size"],
+            timeout=30,
+            open=False,
+            check=AsyncConnectionPool.check_connection,
+            kwargs={
+                "autocommit": True,
+                "prepare_threshold": None,
+                "row_factory": dict_row,
+            },
+        )
+
+        # run locks pin their connection for the whole run, so they get a pool of their own
+        self.lock_pool: AsyncConnectionPool[AsyncConnection[DictRow]] = AsyncConnectionPool(  # type: ignore
+            conninfo=psycopg_connection_string,
+            min_size=1,
+            max_size=pool_sizes["lock_pool_max_size"],
             timeout=30,
             open=False,
             check=AsyncConnectionPool.check_connection,
@@ -88,7 +177,7 @@ class AsyncPostgresClient(
         # initialize checkpointer
         self.checkpointer = AsyncPostgresSaver(
             conn=self.psycopg_pool,
-            serde=JsonPlusSerializer(),
+            serde=self._message_serde,
         )
 
         # startup: initialize resources
@@ -99,9 +188,16 @@ class AsyncPostgresClient(
         return self.engine
 
     # method to get psycopg_pool checkpointer
-    def get_checkpointer(self) -> AsyncPostgresSaver | MemorySaver:
+    def get_checkpointer(self) -> BaseCheckpointSaver:
         return self.checkpointer
 
+    # method to report memory held by the local checkpointer, postgres has nothing to report here
+    def get_checkpointer_stats(self) -> dict[str, object]:
+        if isinstance(self.checkpointer, BoundedMemorySaver):
+            return self.checkpointer.stats()
+
+        return {}
+
     # method to properly dispose of engine
     async def dispose_engine(self) -> None:
         logger.info("closing sqlalchemy database engine...")
@@ -124,13 +220,17 @@ class AsyncPostgresClient(
 
         try:
             if self.psycopg_pool is not None:
+                await self.lock_pool.close()
                 await self.psycopg_pool.close()
+            else:
+                await close_local_checkpointer(self.checkpointer)
         except Exception:
             logger.exception("error closing psycopg connection pool")
             raise
 
         else:
             self.psycopg_pool = None
+            self.lock_pool = None
             logger.info("closed psycopg connection pool")
 
     # function to ping engine
@@ -159,6 +259,7 @@ class AsyncPostgresClient(
         # ping test on checkpointer pool
         try:
             await self.psycopg_pool.open()
+            await self.lock_pool.open()
             logger.info("checkpointer pool connection opened")
 
         except Exception as e:
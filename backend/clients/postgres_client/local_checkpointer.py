@@ -0,0 +1,190 @@
+##########
+# ### Import Packages
+
+# import base packages
+import os
+from collections import OrderedDict
+from typing import Any, Sequence
+
+# import langgraph packages
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import BaseCheckpointSaver, ChannelVersions, Checkpoint, CheckpointMetadata, CheckpointTuple
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.serde.base import SerializerProtocol
+
+# import logging client and checkpoint serializer
+from clients.logging_client import LoggingClient
+from clients.postgres_client.serde import get_checkpoint_serializer
+
+# configure logger
+logger = LoggingClient.get_logger(__name__)
+
+##########
+# ### Local Checkpointer Constants
+
+# local checkpointer backends selected by LOCAL_CHECKPOINTER
+LOCAL_CHECKPOINTER_MEMORY = "memory"
+LOCAL_CHECKPOINTER_SQLITE = "sqlite"
+
+##########
+# ### Bounded In-Memory Checkpointer
+
+# in-memory checkpointer that evicts least recently used threads to stay within a thread count and byte budget
+class BoundedMemorySaver(InMemorySaver):
+
+    def __init__(
+        self,
+        *,
+        serde: SerializerProtocol | None = None,
+        max_threads: int = 1000,
+        max_bytes: int = 256 * 1024 * 1024,
+    ):
+        super().__init__(serde=serde)
+        self.max_threads = max(1, max_threads)
+        self.max_bytes = max_bytes
+
+        # serialized bytes held per thread, least recently used first
+        self._thread_bytes: OrderedDict[str, int] = OrderedDict()
+        self._total_bytes = 0
+
+        # per-thread keys of the shared writes and blobs dicts, so eviction never scans them
+        self._write_keys: dict[str, set[tuple[str, str, str]]] = {}
+        self._blob_keys: dict[str, set[tuple[str, str, str, Any]]] = {}
+
+        # counters for /health
+        self._evicted_threads = 0
+        self._oversized_threads: set[str] = set()
+
+    # method to report memory held and evictions
+    def stats(self) -> dict[str, object]:
+        return {
+            "backend": LOCAL_CHECKPOINTER_MEMORY,
+            "threads": len(self._thread_bytes),
+            "max_threads": self.max_threads,
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "evicted_threads": self._evicted_threads,
+        }
+
+    # method to read a checkpoint, reading a thread marks it recently used
+    def get_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        thread_id = config["configurable"]["thread_id"]
+        if thread_id in self._thread_bytes:
+            self._thread_bytes.move_to_end(thread_id)
+
+        return super().get_tuple(config)
+
+    # method to save a checkpoint and the channel values that changed, then evict to the budget
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        blob_keys = [(thread_id, checkpoint_ns, channel, version) for channel, version in new_versions.items()]
+
+        # values and checkpoints saved again under the same key replace what was counted before
+        replaced = sum(len(self.blobs[key][1]) for key in blob_keys if key in self.blobs)
+        if previous := self.storage.get(thread_id, {}).get(checkpoint_ns, {}).get(checkpoint["id"]):
+            replaced += len(previous[0][1]) + len(previous[1][1])
+        next_config = super().put(config, checkpoint, metadata, new_versions)
+
+        saved_checkpoint, saved_metadata, _ = self.storage[thread_id][checkpoint_ns][checkpoint["id"]]
+        added = len(saved_checkpoint[1]) + len(saved_metadata[1]) + sum(len(self.blobs[key][1]) for key in blob_keys)
+        self._blob_keys.setdefault(thread_id, set()).update(blob_keys)
+
+        self._account(thread_id, added - replaced)
+        return next_config
+
+    # method to save pending writes of a task, then evict to the budget
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        outer_key = (thread_id, config["configurable"].get("checkpoint_ns", ""), config["configurable"]["checkpoint_id"])
+
+        # writes with a fixed index replace earlier ones, so measure the checkpoint's writes before and after
+        before = self._writes_bytes(outer_key)
+        super().put_writes(config, writes, task_id, task_path)
+        self._write_keys.setdefault(thread_id, set()).add(outer_key)
+
+        self._account(thread_id, self._writes_bytes(outer_key) - before)
+
+    # method to delete a thread using the per-thread key indexes
+    def delete_thread(self, thread_id: str) -> None:
+        self.storage.pop(thread_id, None)
+        for key in self._write_keys.pop(thread_id, ()):
+            self.writes.pop(key, None)
+        for key in self._blob_keys.pop(thread_id, ()):
+            self.blobs.pop(key, None)
+
+        self._total_bytes -= self._thread_bytes.pop(thread_id, 0)
+        self._oversized_threads.discard(thread_id)
+
+    # method to count serialized bytes of a checkpoint's pending writes
+    def _writes_bytes(self, outer_key: tuple[str, str, str]) -> int:
+        return sum(len(value[1]) for _, _, value, _ in self.writes.get(outer_key, {}).values())
+
+    # method to record bytes added to a thread and evict least recently used threads over the budget
+    def _account(self, thread_id: str, added: int) -> None:
+        self._thread_bytes[thread_id] = self._thread_bytes.get(thread_id, 0) + added
+        self._thread_bytes.move_to_end(thread_id)
+        self._total_bytes += added
+
+        # the thread being written is never evicted
+        while len(self._thread_bytes) > 1 and (
+            len(self._thread_bytes) > self.max_threads or self._total_bytes > self.max_bytes
+        ):
+            evicted = next(iter(self._thread_bytes))
+            self.delete_thread(evicted)
+            self._evicted_threads += 1
+
+        # a single thread larger than the budget is kept whole, warn once so tests can size the budget
+        if self._total_bytes > self.max_bytes and thread_id not in self._oversized_threads:
+            self._oversized_threads.add(thread_id)
+            logger.warning(
+                f"thread {thread_id} holds {self._total_bytes} checkpoint bytes, "
+                f"more than LOCAL_CHECKPOINT_MAX_MB allows on its own"
+            )
+
+##########
+# ### Local Checkpointer Factory
+
+# function to build the local-mode checkpointer from environment variables
+def get_local_checkpointer() -> BaseCheckpointSaver:
+    backend = os.getenv("LOCAL_CHECKPOINTER", LOCAL_CHECKPOINTER_MEMORY)
+
+    if backend == LOCAL_CHECKPOINTER_MEMORY:
+        return BoundedMemorySaver(
+            serde=get_checkpoint_serializer(),
+            max_threads=int(os.getenv("LOCAL_CHECKPOINT_MAX_THREADS", "1000")),
+            max_bytes=int(float(os.getenv("LOCAL_CHECKPOINT_MAX_MB", "256")) * 1024 * 1024),
+        )
+
+    if backend == LOCAL_CHECKPOINTER_SQLITE:
+        # optional dependency, installed with the sqlite extra
+        try:
+            import aiosqlite
+            from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+        except ImportError as e:
+            raise ImportError("LOCAL_CHECKPOINTER=sqlite requires the sqlite extra: uv sync --extra sqlite") from e
+
+        # the connection thread starts on first use, the saver must be created on the event loop
+        path = os.getenv("LOCAL_CHECKPOINT_SQLITE_PATH", "local_checkpoints.sqlite")
+        logger.info(f"persisting local checkpoints to sqlite file {path}")
+        return AsyncSqliteSaver(conn=aiosqlite.connect(path), serde=get_checkpoint_serializer())
+
+    raise ValueError(f"LOCAL_CHECKPOINTER must be {LOCAL_CHECKPOINTER_MEMORY} or {LOCAL_CHECKPOINTER_SQLITE}")
+
+# function to release the local checkpointer, the sqlite backend holds a connection thread
+async def close_local_checkpointer(checkpointer: BaseCheckpointSaver) -> None:
+    conn = getattr(checkpointer, "conn", None)
+    if conn is not None and conn.is_alive():
+        await conn.close()
@@ -0,0 +1,190 @@
+##########
+# ### Import Packages
+
+# import base packages
+import asyncio
+import os
+from typing import NamedTuple
+
+# import packages for db
+from dotenv import load_dotenv
+from psycopg import AsyncConnection, sql
+
+# import logging client
+from clients.logging_client import LoggingClient
+
+# configure logger
+logger = LoggingClient.get_logger(__name__)
+
+##########
+# ### Migration Types
+
+class Migration(NamedTuple):
+    """One idempotent schema change, run in its own autocommit statement."""
+
+    name: str
+    statement: str
+    # index created by the statement, an invalid leftover of an interrupted concurrent build is dropped first
+    index: str | None = None
+
+##########
+# ### Application Schema Migrations
+
+# schema changes for the app's own tables, in order, every statement is safe to run again
+# indexes are built concurrently so live traffic keeps writing to the tables while they build
+MIGRATIONS = [
+    # thread list preview columns and the keyset pagination index
+    Migration(
+        name="conversations_listing_columns",
+        statement='''
+            alter table public.conversations
+                add column if not exists last_message_preview text,
+                add column if not exists updated_at timestamptz not null default now();
+        ''',
+    ),
+    Migration(
+        name="conversations_user_listing_idx",
+        index="conversations_user_listing_idx",
+        statement='''
+            create index concurrently if not exists conversations_user_listing_idx
+                on public.conversations (user_id, created_at desc, thread_id desc)
+                where deleted_at is null;
+        ''',
+    ),
+
+    # resumable run events and their retention index
+    Migration(
+        name="run_events_table",
+        statement='''
+            create table if not exists public.run_events (
+                run_id text not null,
+                event_id integer not null,
+                thread_id text not null,
+                data bytea not null,
+                is_final boolean not null default false,
+                created_at timestamptz not null default now(),
+                primary key (run_id, event_id)
+            );
+        ''',
+    ),
+    Migration(
+        name="run_events_created_at_idx",
+        index="run_events_created_at_idx",
+        statement='''
+            create index concurrently if not exists run_events_created_at_idx
+                on public.run_events (created_at);
+        ''',
+    ),
+
+    # background run queue and the indexes used to claim, reclaim and delete runs
+    Migration(
+        name="run_queue_table",
+        statement='''
+            create table if not exists public.run_queue (
+                run_id text primary key,
+                thread_id text not null,
+                user_id text not null,
+                payload jsonb not null,
+                status text not null default 'queued',
+                attempts integer not null default 0,
+                created_at timestamptz not null default now(),
+                claimed_at timestamptz,
+                finished_at timestamptz
+            );
+        ''',
+    ),
+    Migration(
+        name="run_queue_queued_idx",
+        index="run_queue_queued_idx",
+        statement='''
+            create index concurrently if not exists run_queue_queued_idx
+                on public.run_queue (created_at)
+                where status = 'queued';
+        ''',
+    ),
+    Migration(
+        name="run_queue_running_idx",
+        index="run_queue_running_idx",
+        statement='''
+            create index concurrently if not exists run_queue_running_idx
+                on public.run_queue (claimed_at)
+                where status = 'running';
+        ''',
+    ),
+    Migration(
+        name="run_queue_finished_idx",
+        index="run_queue_finished_idx",
+        statement='''
+            create index concurrently if not exists run_queue_finished_idx
+                on public.run_queue (finished_at)
+                where finished_at is not null;
+        ''',
+    ),
+
+    # archive for messages older than the checkpointed window, seq is the message's position in the thread
+    Migration(
+        name="thread_messages_table",
+        statement='''
+            create table if not exists public.thread_messages (
+                thread_id text not null,
+                seq integer not null,
+                message_id text not null,
+                type text not null,
+                data bytea not null,
+                created_at timestamptz not null default now(),
+                primary key (thread_id, seq)
+            );
+        ''',
+    ),
+]
+
+##########
+# ### Migration Runner
+
+# function to build the psycopg connection string from the POSTGRES_* environment variables
+def get_migration_conninfo() -> str:
+    user = os.getenv("POSTGRES_USERNAME")
+    password = os.getenv("POSTGRES_PASSWORD")
+    host = os.getenv("POSTGRES_HOST")
+    port = os.getenv("POSTGRES_PORT", "5432")
+    database = os.getenv("POSTGRES_DB")
+
+    return f"postgresql://{user}:{password}@{host}:{port}/{database}"
+
+
+# function to apply every migration, run once per deploy before the workers start
+async def run_migrations(conninfo: str) -> None:
+    # sql query to find an index left invalid by an interrupted concurrent build
+    # language=SQL
+    invalid_index_query = '''
+        select exists (
+            select 1
+            from pg_index
+            join pg_class on pg_class.oid = pg_index.indexrelid
+            where pg_class.relname = %(index)s and
+                  not pg_index.indisvalid
+        ) as invalid;
+    '''
+
+    # concurrent index builds cannot run inside a transaction block
+    async with await AsyncConnection.connect(conninfo, autocommit=True) as conn:
+        # give up instead of queueing every query on a table behind a long-held lock
+        await conn.execute("set lock_timeout = '5s';")
+
+        for migration in MIGRATIONS:
+            if migration.index is not None:
+                result = await conn.execute(invalid_index_query, {"index": migration.index})
+                if (await result.fetchone())[0]:
+                    logger.warning(f"dropping invalid index {migration.index} before rebuilding it")
+                    await conn.execute(
+                        sql.SQL("drop index concurrently if exists public.{};").format(sql.Identifier(migration.index))
+                    )
+
+            await conn.execute(migration.statement)
+            logger.info(f"applied migration {migration.name}")
+
+
+if __name__ == "__main__":
+    # python -m clients.postgres_client.migrations, from the backend directory
+    load_dotenv()
+    asyncio.run(run_migrations(get_migration_conninfo()))
@@ -0,0 +1,288 @@
+##########
+# ### Import Packages
+
+# import base packages
+from enum import Enum
+from typing import AsyncIterator
+
+# import packages for db
+from psycopg import AsyncConnection
+from psycopg.rows import DictRow
+from psycopg_pool import AsyncConnectionPool
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# import the run lock namespace, pruning skips threads with a run in progress
+from clients.postgres_client.queries.locks import THREAD_RUN_LOCK_NAMESPACE
+
+##########
+# ### Checkpoint Constants
+
+# notification channel announcing that a worker wrote a new checkpoint for a thread
+CHECKPOINT_WRITTEN_CHANNEL = "checkpoint_written"
+
+##########
+# ### Checkpoint Retention Types
+
+class CheckpointRetention(str, Enum):
+    """Which historical checkpoints of a thread are kept by pruning."""
+
+    # keep every checkpoint, pruning is disabled
+    ALL = "all"
+    # keep only the latest checkpoint of each thread (shallow)
+    LATEST = "latest"
+    # keep the latest `keep_last` checkpoints of each thread
+    LAST_N = "last_n"
+    # keep the latest checkpoint and the checkpoint at the start of every turn, only "async"/"sync"
+    # durability writes those (source='input'), under "exit" this keeps the same rows as LATEST
+    TURNS = "turns"
+
+##########
+# ### Modular Checkpoint Retention Methods for Postgres Client
+
+# prunes the langgraph checkpoint tables, which gain a row per superstep of every turn
+class CheckpointRetentionMethodsMixin:
+
+    # _skip_pings is always True when AsyncEngine=None
+    engine: AsyncEngine | None
+    psycopg_pool: AsyncConnectionPool[AsyncConnection[DictRow]] | None
+    _psycopg_conninfo: str | None
+    _skip_pings: bool
+
+    # retention policy configured on the client
+    checkpoint_retention: CheckpointRetention
+    checkpoint_keep_last: int
+
+    # whether a pruning job has anything to do, local mode keeps checkpoints in memory
+    @property
+    def has_checkpoint_pruning(self) -> bool:
+        return not self._skip_pings and self.checkpoint_retention is not CheckpointRetention.ALL
+
+    # method to page through the ids of threads that have checkpoints
+    async def list_checkpoint_threads(self, after_thread_id: str = '', limit: int = 100) -> list[str]:
+        # nothing is stored in postgres for local tests
+        if self._skip_pings:
+            return []
+
+        # sql query to read one page of thread ids in order, served by checkpoints_thread_id_idx
+        # language=SQL
+        checkpoint_threads_query = '''
+            select distinct thread_id
+            from public.checkpoints
+            where thread_id > :after_thread_id
+            order by thread_id
+            limit :limit;
+        '''
+
+        # allow exceptions to surface to caller
+        try:
+            async with self.engine.connect() as conn:
+                conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+
+                # passing in {...} prevents sql injection
+                result = await conn.execute(
+                    statement=text(checkpoint_threads_query),
+                    parameters={
+                        'after_thread_id': after_thread_id,
+                        'limit': limit
+                    }
+                )
+
+                return list(result.scalars().all())
+
+        except Exception as e:
+            raise e
+
+    # method to delete checkpoints of a batch of threads that the retention policy does not keep
+    async def prune_checkpoints(self, thread_ids: list[str]) -> dict[str, int]:
+        # nothing is stored in postgres for local tests
+        if self._skip_pings or not thread_ids or self.checkpoint_retention is CheckpointRetention.ALL:
+            return {'threads': 0, 'checkpoints': 0, 'writes': 0, 'blobs': 0}
+
+        # latest n per namespace, turns keeps the root input checkpoint that starts each turn
+        keep_last = self.checkpoint_keep_last if self.checkpoint_retention is CheckpointRetention.LAST_N else 1
+        keep_turn_starts = self.checkpoint_retention is CheckpointRetention.TURNS
+
+        # sql query to delete unkept checkpoints and their pending writes
+        # threads with a run in progress hold the run lock and are skipped, the lock is only
+        # looked up in pg_locks so a run starting mid-batch is not turned away as busy, its new
+        # checkpoints are not in this statement's snapshot and are never pruned
+        # subgraph namespaces older than the thread's latest root checkpoint belong to
+        # finished turns and are dropped entirely
+        # language=SQL
+        prune_checkpoints_query = '''
+            with pruned_threads as materialized (
+                select thread_id
+                from unnest(cast(:thread_ids as text[])) as thread_id
+                where not exists (
+                    select 1
+                    from pg_locks
+                    where locktype = 'advisory' and
+                          classid = :namespace and
+                          objid = hashtext(thread_id)::oid and
+                          objsubid = 2 and
+                          granted
+                )
+            ),
+            ranked as (
+                select c.thread_id,
+                       c.checkpoint_ns,
+                       c.checkpoint_id,
+                       c.metadata ->> 'source' as source,
+                       row_number() over (
+                           partition by c.thread_id, c.checkpoint_ns
+                           order by c.checkpoint_id desc
+                       ) as recency,
+                       max(c.checkpoint_id) over (partition by c.thread_id, c.checkpoint_ns) as ns_latest_id,
+                       max(c.checkpoint_id) filter (where c.checkpoint_ns = '') over (partition by c.thread_id) as root_latest_id
+                from public.checkpoints c
+                join pruned_threads p on p.thread_id = c.thread_id
+            ),
+            doomed as (
+                select thread_id,
+                       checkpoint_ns,
+                       checkpoint_id
+                from ranked
+                where (checkpoint_ns <> '' and ns_latest_id < root_latest_id) or
+                      (recency > :keep_last and
+                       not (:keep_turn_starts and checkpoint_ns = '' and source = 'input'))
+            ),
+            deleted_writes as (
+                delete from public.checkpoint_writes w
+                using doomed d
+                where w.thread_id = d.thread_id and
+                      w.checkpoint_ns = d.checkpoint_ns and
+                      w.checkpoint_id = d.checkpoint_id
+                returning 1
+            ),
+            deleted_checkpoints as (
+                delete from public.checkpoints c
+                using doomed d
+                where c.thread_id = d.thread_id and
+                      c.checkpoint_ns = d.checkpoint_ns and
+                      c.checkpoint_id = d.checkpoint_id
+                returning 1
+            )
+            select array(select thread_id from pruned_threads) as thread_ids,
+                   (select count(*) from deleted_checkpoints) as checkpoints,
+                   (select count(*) from deleted_writes) as writes;
+        '''
+
+        # sql query to delete channel values no remaining checkpoint references
+        # runs as its own statement so it sees the checkpoints deleted above
+        # threads whose run started since are skipped, their new blobs may precede their checkpoint
+        # language=SQL
+        delete_orphaned_blobs_query = '''
+            delete from public.checkpoint_blobs b
+            where b.thread_id = any(cast(:thread_ids as text[])) and
+                  not exists (
+                      select 1
+                      from pg_locks
+                      where locktype = 'advisory' and
+                            classid = :namespace and
+                            objid = hashtext(b.thread_id)::oid and
+                            objsubid = 2 and
+                            granted
+                  ) and
+                  not exists (
+                      select 1
+                      from public.checkpoints c
+                      where c.thread_id = b.thread_id and
+                            c.checkpoint_ns = b.checkpoint_ns and
+                            c.checkpoint -> 'channel_versions' ->> b.channel = b.version
+                  );
+        '''
+
+        # allow exceptions to surface to caller
+        try:
+            # one transaction per batch
+            async with self.engine.begin() as conn:
+                # passing in {...} prevents sql injection
+                result = await conn.execute(
+                    statement=text(prune_checkpoints_query),
+                    parameters={
+                        'thread_ids': thread_ids,
+                        'namespace': THREAD_RUN_LOCK_NAMESPACE,
+                        'keep_last': keep_last,
+                        'keep_turn_starts': keep_turn_starts
+                    }
+                )
+                pruned = result.mappings().one()
+
+                blobs = 0
+                if pruned['thread_ids']:
+                    result = await conn.execute(
+                        statement=text(delete_orphaned_blobs_query),
+                        parameters={
+                            'thread_ids': pruned['thread_ids'],
+                            'namespace': THREAD_RUN_LOCK_NAMESPACE
+                        }
+                    )
+                    blobs = result.rowcount
+
+            return {
+                'threads': len(pruned['thread_ids']),
+                'checkpoints': pruned['checkpoints'],
+                'writes': pruned['writes'],
+                'blobs': blobs,
+            }
+
+        except Exception as e:
+            raise e
+
+    # whether other workers read and write the same checkpoints, local mode keeps them in memory
+    @property
+    def has_shared_checkpoints(self) -> bool:
+        return not self._skip_pings
+
+    # method to read the id of a thread_id's latest root checkpoint, served by the checkpoints primary key
+    async def get_latest_checkpoint_id(self, thread_id: str) -> str | None:
+        # nothing is stored in postgres for local tests
+        if self._skip_pings:
+            return None
+
+        # sql query to read the newest checkpoint id, ids sort by creation time
+        # language=SQL
+        latest_checkpoint_query = '''
+            select checkpoint_id
+            from public.checkpoints
+            where thread_id = %(thread_id)s and
+                  checkpoint_ns = ''
+            order by checkpoint_id desc
+            limit 1;
+        '''
+
+        async with self.psycopg_pool.connection() as conn:
+            result = await conn.execute(latest_checkpoint_query, {"thread_id": thread_id})
+            row = await result.fetchone()
+
+        return row["checkpoint_id"] if row else None
+
+    # method to tell other workers that their cached checkpoint of a thread_id is stale
+    async def notify_checkpoint_written(self, thread_id: str, origin: str) -> None:
+        # nothing to notify for local tests
+        if self._skip_pings:
+            return
+
+        # sql query to publish the writer and thread_id on the checkpoint channel
+        # language=SQL
+        notify_query = '''
+            select pg_notify(%(channel)s, %(payload)s);
+        '''
+
+        async with self.psycopg_pool.connection() as conn:
+            await conn.execute(notify_query, {"channel": CHECKPOINT_WRITTEN_CHANNEL, "payload": f"{origin}:{thread_id}"})
+
+    # method to receive (origin, thread_id) of checkpoints written by any worker
+    async def listen_checkpoint_writes(self) -> AsyncIterator[tuple[str, str]]:
+        # nothing to listen to for local tests
+        if self._skip_pings:
+            return
+
+        # a dedicated connection, LISTEN would pin a pool connection forever
+        async with await AsyncConnection.connect(self._psycopg_conninfo, autocommit=True) as conn:
+            await conn.execute(f"listen {CHECKPOINT_WRITTEN_CHANNEL};")
+
+            async for notification in conn.notifies():
+                origin, _, thread_id = notification.payload.partition(":")
+                yield origin, thread_id
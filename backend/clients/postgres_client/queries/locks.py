@@ -0,0 +1,165 @@
+##########
+# ### Import Packages
+
+# import base packages
+import asyncio
+import time
+from typing import AsyncIterator
+
+# import packages for db
+from psycopg import AsyncConnection
+from psycopg.rows import DictRow
+from psycopg_pool import AsyncConnectionPool
+
+##########
+# ### Lock Constants
+
+# first key of the two-key advisory lock form, reserves a namespace for thread runs
+THREAD_RUN_LOCK_NAMESPACE = 7310
+
+# interval between pg_try_advisory_lock attempts while queueing
+LOCK_POLL_INTERVAL_SECONDS = 0.1
+
+# notification channel asking the worker running a thread to cancel it
+THREAD_RUN_CANCEL_CHANNEL = "thread_run_cancel"
+
+##########
+# ### Lock Types
+
+class ThreadLockHandle:
+    """Session-level advisory lock on a thread, pinned to one lock pool connection."""
+
+    def __init__(self, thread_id: str, conn: AsyncConnection[DictRow] | None):
+        self.thread_id = thread_id
+        # None when running in local mode without postgres
+        self.conn = conn
+
+##########
+# ### Modular Advisory Lock Methods for Postgres Client
+
+class AdvisoryLockMethodsMixin:
+
+    # _skip_pings is always True when psycopg_pool=None
+    psycopg_pool: AsyncConnectionPool[AsyncConnection[DictRow]] | None
+    lock_pool: AsyncConnectionPool[AsyncConnection[DictRow]] | None
+    _psycopg_conninfo: str | None
+    _skip_pings: bool
+
+    # method to take the cross-worker run lock for a thread_id
+    async def acquire_thread_lock(self, thread_id: str, timeout: float = 0) -> ThreadLockHandle | None:
+        # in-process locking is sufficient for local tests
+        if self._skip_pings:
+            return ThreadLockHandle(thread_id=thread_id, conn=None)
+
+        # sql query to try the lock without blocking the connection
+        # language=SQL
+        try_lock_query = '''
+            select pg_try_advisory_lock(%(namespace)s, hashtext(%(thread_id)s)) as locked;
+        '''
+
+        # session-level locks live on a connection, so keep it out of the lock pool until release
+        # a separate pool, so runs holding locks never starve the checkpointer of connections
+        conn = await self.lock_pool.getconn()
+        deadline = time.monotonic() + timeout
+
+        try:
+            while True:
+                result = await conn.execute(
+                    try_lock_query,
+                    {"namespace": THREAD_RUN_LOCK_NAMESPACE, "thread_id": thread_id},
+                )
+                row = await result.fetchone()
+
+                if row["locked"]:
+                    return ThreadLockHandle(thread_id=thread_id, conn=conn)
+
+                # held by another worker and caller will not wait any longer
+                if time.monotonic() >= deadline:
+                    await self.lock_pool.putconn(conn)
+                    return None
+
+                await asyncio.sleep(LOCK_POLL_INTERVAL_SECONDS)
+
+        except BaseException:
+            await self.lock_pool.putconn(conn)
+            raise
+
+    # method to release a lock taken with acquire_thread_lock
+    async def release_thread_lock(self, handle: ThreadLockHandle) -> None:
+        # nothing held for local tests
+        if handle.conn is None:
+            return
+
+        # sql query to release the lock
+        # language=SQL
+        unlock_query = '''
+            select pg_advisory_unlock(%(namespace)s, hashtext(%(thread_id)s));
+        '''
+
+        # the pool discards broken connections, which also drops their locks
+        try:
+            await handle.conn.execute(
+                unlock_query,
+                {"namespace": THREAD_RUN_LOCK_NAMESPACE, "thread_id": handle.thread_id},
+            )
+
+        finally:
+            await self.lock_pool.putconn(handle.conn)
+            handle.conn = None
+
+    # method to check whether any worker holds the run lock for a thread_id
+    async def is_thread_locked(self, thread_id: str) -> bool:
+        # local tests run in a single process
+        if self._skip_pings:
+            return False
+
+        # sql query to look the two-key advisory lock up in pg_locks
+        # language=SQL
+        is_locked_query = '''
+            select exists (
+                select 1
+                from pg_locks
+                where locktype = 'advisory' and
+                      classid = %(namespace)s and
+                      objid = hashtext(%(thread_id)s)::oid and
+                      objsubid = 2 and
+                      granted
+            ) as locked;
+        '''
+
+        async with self.psycopg_pool.connection() as conn:
+            result = await conn.execute(
+                is_locked_query,
+                {"namespace": THREAD_RUN_LOCK_NAMESPACE, "thread_id": thread_id},
+            )
+            row = await result.fetchone()
+
+        return row["locked"]
+
+    # method to ask whichever worker runs a thread_id to cancel it
+    async def notify_thread_run_cancel(self, thread_id: str) -> None:
+        # nothing to notify for local tests
+        if self._skip_pings:
+            return
+
+        # sql query to publish the thread_id on the cancel channel
+        # language=SQL
+        notify_query = '''
+            select pg_notify(%(channel)s, %(thread_id)s);
+        '''
+
+        async with self.psycopg_pool.connection() as conn:
+            await conn.execute(notify_query, {"channel": THREAD_RUN_CANCEL_CHANNEL, "thread_id": thread_id})
+
+    # method to receive thread_ids whose runs should be cancelled
+    async def listen_thread_run_cancels(self) -> AsyncIterator[str]:
+        # nothing to listen to for local tests
+        if self._skip_pings:
+            return
+
+        # a dedicated connection, LISTEN would pin a pool connection forever
+        async with await AsyncConnection.connect(self._psycopg_conninfo, autocommit=True) as conn:
+            await conn.execute(f"listen {THREAD_RUN_CANCEL_CHANNEL};")
+
+            async for notification in conn.notifies():
+                yield notification.payload
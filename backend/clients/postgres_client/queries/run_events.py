@@ -0,0 +1,198 @@
+##########
+# ### Import Packages
+
+# import packages for db
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+##########
+# ### Modular Run Event Methods for Postgres Client
+
+# cross-worker copy of each run's SSE events, so any worker can resume a stream
+class RunEventMethodsMixin:
+
+    # _skip_pings is always True when AsyncEngine=None
+    engine: AsyncEngine | None
+    _skip_pings: bool
+
+    # whether run events are persisted, local mode keeps them in-process only
+    @property
+    def has_run_event_store(self) -> bool:
+        return not self._skip_pings
+
+    # method to append a batch of encoded events for a run
+    async def append_run_events(self, run_id: str, thread_id: str, events: list[tuple[int, bytes]]) -> None:
+        # skip for local tests
+        if self._skip_pings or not events:
+            return
+
+        # sql query to insert events, replays of an already stored id are ignored
+        # language=SQL
+        insert_run_events_query = '''
+            insert into public.run_events (run_id, event_id, thread_id, data)
+            values (:run_id, :event_id, :thread_id, :data)
+            on conflict (run_id, event_id) do nothing;
+        '''
+
+        # allow exceptions to surface to caller
+        try:
+            # one round trip for the whole batch
+            async with self.engine.begin() as conn:
+                # passing in {...} prevents sql injection
+                await conn.execute(
+                    statement=text(insert_run_events_query),
+                    parameters=[
+                        {
+                            'run_id': run_id,
+                            'event_id': event_id,
+                            'thread_id': thread_id,
+                            'data': data,
+                        }
+                        for event_id, data in events
+                    ]
+                )
+
+        except Exception as e:
+            raise e
+
+    # method to mark the last stored event of a run as its end
+    async def finish_run_events(self, run_id: str) -> None:
+        # skip for local tests
+        if self._skip_pings:
+            return
+
+        # sql query to flag the highest event id
+        # language=SQL
+        finish_run_events_query = '''
+            update public.run_events
+                set is_final = true
+            where run_id = :run_id and
+                  event_id = (select max(event_id) from public.run_events where run_id = :run_id);
+        '''
+
+        # allow exceptions to surface to caller
+        try:
+            async with self.engine.begin() as conn:
+                # passing in {...} prevents sql injection
+                await conn.execute(
+                    statement=text(finish_run_events_query),
+                    parameters={
+                        'run_id': run_id
+                    }
+                )
+
+        except Exception as e:
+            raise e
+
+    # method to check whether any events are stored for a run on a thread
+    async def run_events_exist(self, run_id: str, thread_id: str) -> bool:
+        # nothing is stored for local tests
+        if self._skip_pings:
+            return False
+
+        # sql query to look up the run
+        # language=SQL
+        run_events_exist_query = '''
+            select exists (
+                select 1
+                from public.run_events
+                where run_id = :run_id and
+                      thread_id = :thread_id
+            ) as found;
+        '''
+
+        # allow exceptions to surface to caller
+        try:
+            async with self.engine.connect() as conn:
+                conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+
+                # passing in {...} prevents sql injection
+                result = await conn.execute(
+                    statement=text(run_events_exist_query),
+                    parameters={
+                        'run_id': run_id,
+                        'thread_id': thread_id
+                    }
+                )
+
+                return bool(result.scalar())
+
+        except Exception as e:
+            raise e
+
+    # method to read a run's events after a given event id
+    async def get_run_events(
+        self,
+        run_id: str,
+        thread_id: str,
+        after_event_id: int = 0,
+        limit: int = 500,
+    ) -> list[dict]:
+        # nothing is stored for local tests
+        if self._skip_pings:
+            return []
+
+        # sql query to page through a run's events in order
+        # language=SQL
+        run_events_query = '''
+            select event_id,
+                   data,
+                   is_final
+            from public.run_events
+            where run_id = :run_id and
+                  thread_id = :thread_id and
+                  event_id > :after_event_id
+            order by event_id
+            limit :limit;
+        '''
+
+        # allow exceptions to surface to caller
+        try:
+            async with self.engine.connect() as conn:
+                conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+
+                # passing in {...} prevents sql injection
+                result = await conn.execute(
+                    statement=text(run_events_query),
+                    parameters={
+                        'run_id': run_id,
+                        'thread_id': thread_id,
+                        'after_event_id': after_event_id,
+                        'limit': limit
+                    }
+                )
+                rows = result.mappings().all()
+
+            return [dict(r) for r in rows]
+
+        except Exception as e:
+            raise e
+
+    # method to delete events of runs older than the retention window
+    async def delete_expired_run_events(self, retention_seconds: float) -> int:
+        # nothing is stored for local tests
+        if self._skip_pings:
+            return 0
+
+        # sql query to drop expired events
+        # language=SQL
+        delete_expired_query = '''
+            delete from public.run_events
+            where created_at < now() - make_interval(secs => :retention_seconds);
+        '''
+
+        # allow exceptions to surface to caller
+        try:
+            async with self.engine.begin() as conn:
+                # passing in {...} prevents sql injection
+                result = await conn.execute(
+                    statement=text(delete_expired_query),
+                    parameters={
+                        'retention_seconds': retention_seconds
+                    }
+                )
+
+                return result.rowcount
+
+        except Exception as e:
+            raise e
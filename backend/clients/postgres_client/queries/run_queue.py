@@ -0,0 +1,354 @@
+##########
+# ### Import Packages
+
+# import base packages
+import json
+
+# import packages for db
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+##########
+# ### Modular Run Queue Methods for Postgres Client
+
+# durable queue of background runs, claimed by any worker with skip locked
+class RunQueueMethodsMixin:
+
+    # _skip_pings is always True when AsyncEngine=None
+    engine: AsyncEngine | None
+    _skip_pings: bool
+
+    # whether runs are queued in postgres, local mode queues them in-process
+    @property
+    def has_run_queue(self) -> bool:
+        return not self._skip_pings
+
+    # method to add a run to the queue
+    async def enqueue_run(self, run_id: str, thread_id: str, user_id: str, payload: dict) -> None:
+        # skip for local tests
+        if self._skip_pings:
+            return
+
+        # sql query to insert the queued run
+        # language=SQL
+        enqueue_run_query = '''
+            insert into public.run_queue (run_id, thread_id, user_id, payload)
+            values (:run_id, :thread_id, :user_id, cast(:payload as jsonb));
+        '''
+
+        # allow exceptions to surface to route
+        try:
+            async with self.engine.begin() as conn:
+                # passing in {...} prevents sql injection
+                await conn.execute(
+                    statement=text(enqueue_run_query),
+                    parameters={
+                        'run_id': run_id,
+                        'thread_id': thread_id,
+                        'user_id': user_id,
+                        'payload': json.dumps(payload)
+                    }
+                )
+
+        except Exception as e:
+            raise e
+
+    # method to claim the oldest queued run, skipping runs other workers are claiming
+    async def claim_next_run(self) -> dict | None:
+        # nothing is queued in postgres for local tests
+        if self._skip_pings:
+            return None
+
+        # sql query to claim one run, served by the partial run_queue_queued_idx
+        # a retried or released run restarts its event ids at 1, so events of earlier claims are deleted with it
+        # language=SQL
+        claim_run_query = '''
+            with claimed as (
+                update public.run_queue
+                    set status = 'running',
+                        claimed_at = now(),
+                        attempts = attempts + 1
+                where run_id = (
+                    select run_id
+                    from public.run_queue
+                    where status = 'queued'
+                    order by created_at
+                    limit 1
+                    for update skip locked
+                )
+                returning run_id, thread_id, user_id, payload, attempts
+            ),
+            cleared as (
+                delete from public.run_events
+                where run_id in (select run_id from claimed)
+            )
+            select run_id, thread_id, user_id, payload, attempts
+            from claimed;
+        '''
+
+        # allow exceptions to surface to caller
+        try:
+            async with self.engine.begin() as conn:
+                result = await conn.execute(statement=text(claim_run_query))
+                row = result.mappings().first()
+
+            if row is None:
+                return None
+
+            # untyped text() results leave jsonb as its json string
+            claimed_run = dict(row)
+            if isinstance(claimed_run['payload'], str):
+                claimed_run['payload'] = json.loads(claimed_run['payload'])
+
+            return claimed_run
+
+        except Exception as e:
+            raise e
+
+    # method to show the runs this worker is executing are still alive
+    async def heartbeat_runs(self, claims: dict[str, int]) -> None:
+        # nothing is claimed in postgres for local tests
+        if self._skip_pings or not claims:
+            return
+
+        # sql query to refresh every claim in one statement, attempts identifies this worker's claim of a run
+        # language=SQL
+        heartbeat_query = '''
+            update public.run_queue
+                set claimed_at = now()
+            from unnest(cast(:run_ids as text[]), cast(:attempts as integer[])) as claim(run_id, attempts)
+            where run_queue.run_id = claim.run_id and
+                  run_queue.attempts = claim.attempts and
+                  run_queue.status = 'running';
+        '''
+
+        # allow exceptions to surface to caller
+        try:
+            async with self.engine.begin() as conn:
+                # passing in {...} prevents sql injection
+                await conn.execute(
+                    statement=text(heartbeat_query),
+                    parameters={
+                        'run_ids': list(claims),
+                        'attempts': list(claims.values())
+                    }
+                )
+
+        except Exception as e:
+            raise e
+
+    # method to requeue runs whose worker stopped heartbeating, failing those out of attempts
+    async def reclaim_stale_runs(self, stale_after_seconds: float, max_attempts: int) -> dict[str, str]:
+        # nothing is claimed in postgres for local tests
+        if self._skip_pings:
+            return {}
+
+        # sql query to release stale claims, served by the partial run_queue_running_idx
+        # requeued runs start over, so their stored events are deleted rather than spliced with the retry's
+        # language=SQL
+        reclaim_query = '''
+            with reclaimed as (
+                update public.run_queue
+                    set status = case when attempts >= :max_attempts then 'failed' else 'queued' end,
+                        finished_at = case when attempts >= :max_attempts then now() end
+                where status = 'running' and
+                      claimed_at < now() - make_interval(secs => :stale_after_seconds)
+                returning run_id, status
+            ),
+            cleared as (
+                delete from public.run_events
+                where run_id in (select run_id from reclaimed where status = 'queued')
+            )
+            select run_id, status
+            from reclaimed;
+        '''
+
+        # allow exceptions to surface to caller
+        try:
+            async with self.engine.begin() as conn:
+                # passing in {...} prevents sql injection
+                result = await conn.execute(
+                    statement=text(reclaim_query),
+                    parameters={
+                        'stale_after_seconds': stale_after_seconds,
+                        'max_attempts': max_attempts
+                    }
+                )
+
+                return {row['run_id']: row['status'] for row in result.mappings().all()}
+
+        except Exception as e:
+            raise e
+
+    # method to record how a claimed run ended
+    async def complete_run(self, run_id: str, attempt: int, status: str) -> None:
+        # skip for local tests
+        if self._skip_pings:
+            return
+
+        # sql query to set the final status, unless the run was reclaimed from this claim meanwhile
+        # a reclaimed run claimed again is running under a higher attempt, which this update leaves alone
+        # language=SQL
+        complete_run_query = '''
+            update public.run_queue
+                set status = :status,
+                    finished_at = now()
+            where run_id = :run_id and
+                  attempts = :attempt and
+                  status = 'running';
+        '''
+
+        # allow exceptions to surface to caller
+        try:
+            async with self.engine.begin() as conn:
+                # passing in {...} prevents sql injection
+                await conn.execute(
+                    statement=text(complete_run_query),
+                    parameters={
+                        'run_id': run_id,
+                        'attempt': attempt,
+                        'status': status
+                    }
+                )
+
+        except Exception as e:
+            raise e
+
+    # method to hand a claimed run back to the queue when its worker shuts down
+    async def release_run(self, run_id: str, attempt: int) -> None:
+        # skip for local tests
+        if self._skip_pings:
+            return
+
+        # sql query to requeue the run, a graceful release does not use up one of its attempts
+        # language=SQL
+        release_run_query = '''
+            update public.run_queue
+                set status = 'queued',
+                    claimed_at = null,
+                    attempts = attempts - 1
+            where run_id = :run_id and
+                  attempts = :attempt and
+                  status = 'running';
+        '''
+
+        # allow exceptions to surface to caller
+        try:
+            async with self.engine.begin() as conn:
+                # passing in {...} prevents sql injection
+                await conn.execute(
+                    statement=text(release_run_query),
+                    parameters={
+                        'run_id': run_id,
+                        'attempt': attempt
+                    }
+                )
+
+        except Exception as e:
+            raise e
+
+    # method to delete a batch of runs that finished before the retention window
+    async def delete_finished_runs(self, retention_seconds: float, batch_size: int = 1000) -> int:
+        # nothing is stored in postgres for local tests
+        if self._skip_pings:
+            return 0
+
+        # sql query to delete the oldest finished runs, served by the partial run_queue_finished_idx
+        # language=SQL
+        delete_finished_query = '''
+            delete from public.run_queue
+            where run_id in (
+                select run_id
+                from public.run_queue
+                where finished_at < now() - make_interval(secs => :retention_seconds)
+                order by finished_at
+                limit :batch_size
+            );
+        '''
+
+        # allow exceptions to surface to caller
+        try:
+            async with self.engine.begin() as conn:
+                # passing in {...} prevents sql injection
+                result = await conn.execute(
+                    statement=text(delete_finished_query),
+                    parameters={
+                        'retention_seconds': retention_seconds,
+                        'batch_size': batch_size
+                    }
+                )
+
+                return result.rowcount
+
+        except Exception as e:
+            raise e
+
+    # method to cancel runs of a thread that have not been claimed yet
+    async def cancel_queued_runs(self, thread_id: str) -> list[str]:
+        # nothing is queued in postgres for local tests
+        if self._skip_pings:
+            return []
+
+        # sql query to cancel queued runs
+        # language=SQL
+        cancel_queued_query = '''
+            update public.run_queue
+                set status = 'cancelled',
+                    finished_at = now()
+            where thread_id = :thread_id and
+                  status = 'queued'
+            returning run_id;
+        '''
+
+        # allow exceptions to surface to caller
+        try:
+            async with self.engine.begin() as conn:
+                # passing in {...} prevents sql injection
+                result = await conn.execute(
+                    statement=text(cancel_queued_query),
+                    parameters={
+                        'thread_id': thread_id
+                    }
+                )
+
+                return list(result.scalars().all())
+
+        except Exception as e:
+            raise e
+
+    # method to check whether a run is waiting or executing
+    async def is_run_pending(self, run_id: str, thread_id: str) -> bool:
+        # nothing is queued in postgres for local tests
+        if self._skip_pings:
+            return False
+
+        # sql query to look up the run's status
+        # language=SQL
+        run_pending_query = '''
+            select exists (
+                select 1
+                from public.run_queue
+                where run_id = :run_id and
+                      thread_id = :thread_id and
+                      status in ('queued', 'running')
+            ) as pending;
+        '''
+
+        # allow exceptions to surface to caller
+        try:
+            async with self.engine.connect() as conn:
+                conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+
+                # passing in {...} prevents sql injection
+                result = await conn.execute(
+                    statement=text(run_pending_query),
+                    parameters={
+                        'run_id': run_id,
+                        'thread_id': thread_id
+                    }
+                )
+
+                return bool(result.scalar())
+
+        except Exception as e:
+            raise e
@@ -0,0 +1,123 @@
+##########
+# ### Import Packages
+
+# import base packages
+from typing import NamedTuple
+
+# import langchain packages
+from langchain_core.messages import BaseMessage
+
+# import packages for db
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# import checkpoint serializer type, archived messages are encoded like checkpoint values
+from clients.postgres_client.serde import CompressedJsonPlusSerializer
+
+##########
+# ### Thread Message Types
+
+class ThreadMessagePage(NamedTuple):
+    """A page of archived messages in conversation order."""
+
+    messages: list[BaseMessage]
+    # pass as `before` to fetch the preceding page, None when the page starts the thread
+    next_before: int | None
+
+##########
+# ### Modular Thread Message Methods for Postgres Client
+
+# append-only archive of messages that dropped out of a thread's checkpointed window
+class ThreadMessageMethodsMixin:
+
+    # _skip_pings is always True when AsyncEngine=None
+    engine: AsyncEngine | None
+    _skip_pings: bool
+
+    # serializer shared by archive writes and reads, built once the client reads the environment
+    _message_serde: CompressedJsonPlusSerializer
+
+    # whether old messages can be archived, local mode keeps every message in the checkpoint
+    @property
+    def has_message_archive(self) -> bool:
+        return not self._skip_pings
+
+    # method to archive messages starting at position first_seq of a thread
+    async def archive_thread_messages(self, thread_id: str, first_seq: int, messages: list[BaseMessage]) -> None:
+        # skip for local tests
+        if self._skip_pings or not messages:
+            return
+
+        # sql query to append messages, a retried turn archiving the same positions is ignored
+        # language=SQL
+        archive_messages_query = '''
+            insert into public.thread_messages (thread_id, seq, message_id, type, data)
+            values (:thread_id, :seq, :message_id, :type, :data)
+            on conflict (thread_id, seq) do nothing;
+        '''
+
+        # one row per message, encoded like checkpoint values
+        rows = []
+        for offset, message in enumerate(messages):
+            type_, data = self._message_serde.dumps_typed(message)
+            rows.append({
+                'thread_id': thread_id,
+                'seq': first_seq + offset,
+                'message_id': message.id,
+                'type': type_,
+                'data': data,
+            })
+
+        # allow exceptions to surface to caller
+        try:
+            # one round trip for the whole batch
+            async with self.engine.begin() as conn:
+                # passing in {...} prevents sql injection
+                await conn.execute(
+                    statement=text(archive_messages_query),
+                    parameters=rows
+                )
+
+        except Exception as e:
+            raise e
+
+    # method to read the page of archived messages just before position `before`
+    async def list_thread_messages(self, thread_id: str, before: int, limit: int = 50) -> ThreadMessagePage:
+        # nothing is archived for local tests
+        if self._skip_pings or before <= 0:
+            return ThreadMessagePage(messages=[], next_before=None)
+
+        # sql query to read one page backwards by primary key
+        # language=SQL
+        list_messages_query = '''
+            select seq, type, data
+            from public.thread_messages
+            where thread_id = :thread_id and
+                  seq < :before
+            order by seq desc
+            limit :limit;
+        '''
+
+        # allow exceptions to surface to caller
+        try:
+            async with self.engine.connect() as conn:
+                conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+
+                # passing in {...} prevents sql injection
+                result = await conn.execute(
+                    statement=text(list_messages_query),
+                    parameters={
+                        'thread_id': thread_id,
+                        'before': before,
+                        'limit': limit
+                    }
+                )
+                rows = list(reversed(result.mappings().all()))
+
+        except Exception as e:
+            raise e
+
+        messages = [self._message_serde.loads_typed((row['type'], row['data'])) for row in rows]
+        first_seq = rows[0]['seq'] if rows else 0
+
+        return ThreadMessagePage(messages=messages, next_before=first_seq if first_seq > 0 else None)
@@ -1,10 +1,50 @@
 ##########
 # ### Import Packages
 
+# import base packages
+import base64
+from datetime import datetime
+
 # import packages for db
+from pydantic import BaseModel
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncEngine
 
+# import shared cache
+from utils.cache import TTLCache
+
+##########
+# ### Thread Types
+
+class ThreadAccess(BaseModel):
+    """Result of validating a user_id thread_id pair."""
+
+    owned: bool
+    # None when the checkpoint store could not be consulted (local mode)
+    is_new: bool | None = None
+
+class ThreadPage(BaseModel):
+    """One page of a user's threads, newest first."""
+
+    threads: list[dict]
+    # opaque cursor for the next page, None on the last page
+    next_cursor: str | None = None
+
+# encode the (created_at, thread_id) keyset position of the last thread on a page
+def encode_thread_cursor(created_at: datetime, thread_id: str) -> str:
+    position = f"{created_at.isoformat()}|{thread_id}"
+    return base64.urlsafe_b64encode(position.encode()).decode().rstrip("=")
+
+# decode a cursor from encode_thread_cursor, raises ValueError if malformed
+def decode_thread_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        position = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, thread_id = position.split("|", 1)
+        return datetime.fromisoformat(created_at), thread_id
+
+    except Exception as e:
+        raise ValueError("invalid thread cursor") from e
+
 ##########
 # ### Modular Thread Methods for Postgres Client
 
@@ -14,6 +54,10 @@ class ThreadMethodsMixin:
     engine: AsyncEngine | None
     _skip_pings: bool
 
+    # (user_id, thread_id) -> True for owned threads that have a checkpoint, new threads are never cached
+    # entries expire quickly, so a thread deleted through another worker is re-checked against deleted_at soon
+    _thread_ownership_cache: TTLCache[tuple[str, str], bool]
+
     # method to insert thread_id user_id pair into db
     async def insert_thread_id(self, user_id: str, thread_id: str) -> None:
         # skip for local tests
@@ -46,50 +90,94 @@ class ThreadMethodsMixin:
         except Exception as e:
             raise e
 
-    # method to list all thread(s) for a user_id
-    async def list_threads(self, user_id: str) -> list:
-        # empty list for local tests
+    # method to list a page of thread(s) for a user_id, newest first
+    async def list_threads(self, user_id: str, limit: int = 50, cursor: str | None = None) -> ThreadPage:
+        # empty page for local tests
         if self._skip_pings:
-            return []
+            return ThreadPage(threads=[])
 
-        # sql query to retrieve all thread(s) for a given user_id
+        # sql query to retrieve one page of thread(s), keyset on (created_at, thread_id)
+        # order by is qualified so it sorts on the column rather than the truncated alias
+        # language=SQL
         threads_query = '''
             select thread_id,
+                   created_at as cursor_created_at,
                    date_trunc('second', created_at)::timestamptz(0) as created_at,
-                   title
+                   date_trunc('second', updated_at)::timestamptz(0) as updated_at,
+                   title,
+                   last_message_preview
             from public.conversations
             where user_id = :user_id and
                   deleted_at is null
-            order by created_at desc;
-        '''.strip()
+                  {after_cursor}
+            order by conversations.created_at desc, conversations.thread_id desc
+            limit :limit;
+        '''
+
+        # one extra row tells whether another page exists
+        parameters = {
+            'user_id': user_id,
+            'limit': limit + 1
+        }
+
+        # continue strictly after the last thread of the previous page
+        after_cursor = ''
+        if cursor is not None:
+            parameters['cursor_created_at'], parameters['cursor_thread_id'] = decode_thread_cursor(cursor)
+            after_cursor = 'and (created_at, thread_id) < (:cursor_created_at, :cursor_thread_id)'
 
         # allow exceptions to surface to route
         try:
-            # query for all thread(s) belonging to user
+            # read-only page, autocommit avoids opening a transaction
             async with self.engine.connect() as conn:
+                conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+
                 # passing in {...} prevents sql injection
                 result = await conn.execute(
-                    statement=text(threads_query),
-                    parameters={
-                        'user_id': user_id
-                    }
+                    statement=text(threads_query.format(after_cursor=after_cursor)),
+                    parameters=parameters
                 )
-                rows = result.mappings().all()
-
-            return [dict(r) for r in rows]
+                rows = [dict(r) for r in result.mappings().all()]
 
         except Exception as e:
             raise e
 
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_thread_cursor(rows[-1]['cursor_created_at'], str(rows[-1]['thread_id']))
+
+        for row in rows:
+            del row['cursor_created_at']
+
+        return ThreadPage(threads=rows, next_cursor=next_cursor)
+
     # method to confirm whether a thread_id belongs to a user_id
     async def confirm_thread_id(self, user_id: str, thread_id: str) -> bool:
-        # default true for local tests
+        thread_access = await self.validate_thread_access(user_id=user_id, thread_id=thread_id)
+        return thread_access.owned
+
+    # method to check ownership and whether a thread has a checkpoint in one read
+    async def validate_thread_access(self, user_id: str, thread_id: str) -> ThreadAccess:
+        # owned threads with a checkpoint are served from the in-process cache
+        cache_key = (user_id, thread_id)
+        if self._thread_ownership_cache.get(cache_key):
+            return ThreadAccess(owned=True, is_new=False)
+
+        # default owned for local tests, checkpoint state is unknown
         if self._skip_pings:
-            return True
+            return ThreadAccess(owned=True)
 
-        # sql query to check existence of thread_id user_id pair
-        check_thread_id_query = '''
-            select 1
+        # sql query to check the thread_id user_id pair and its checkpoint together
+        # checkpoints.thread_id is text, so it gets its own parameter in case conversations.thread_id is a uuid
+        # language=SQL
+        thread_access_query = '''
+            select exists (
+                       select 1
+                       from public.checkpoints
+                       where thread_id = :checkpoint_thread_id and
+                             checkpoint_ns = ''
+                   ) as has_checkpoint
             from public.conversations
             where user_id = :user_id and
                   thread_id = :thread_id and
@@ -98,12 +186,15 @@ class ThreadMethodsMixin:
 
         # allow exceptions to surface to route
         try:
-            # begin transaction to write thread_id user_id pair
-            async with self.engine.begin() as conn:
+            # read-only check, autocommit avoids opening a transaction
+            async with self.engine.connect() as conn:
+                conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+
                 # passing in {...} prevents sql injection
                 result = await conn.execute(
-                    statement=text(check_thread_id_query),
+                    statement=text(thread_access_query),
                     parameters={
+                        'checkpoint_thread_id': thread_id,
                         'thread_id': thread_id,
                         'user_id': user_id
                     }
@@ -111,9 +202,56 @@ class ThreadMethodsMixin:
 
                 # retrieve the first row and check
                 row = result.first()
-                thread_id_exists = row is not None
 
-                return thread_id_exists
+        except Exception as e:
+            raise e
+
+        if row is None:
+            return ThreadAccess(owned=False)
+
+        # a new thread stays uncached until a turn checkpoints it, a failed first run must still look new
+        if row.has_checkpoint:
+            self._thread_ownership_cache.set(cache_key, True)
+
+        return ThreadAccess(owned=True, is_new=not row.has_checkpoint)
+
+    # method to record that a thread now has a checkpoint
+    def mark_thread_initialized(self, user_id: str, thread_id: str) -> None:
+        # nothing is read back in local mode, where every thread is reported owned
+        if self._skip_pings:
+            return
+
+        self._thread_ownership_cache.set((user_id, thread_id), True)
+
+    # method to record a finished turn on the thread list, so listing never reads checkpoints
+    async def update_thread_activity(self, user_id: str, thread_id: str, last_message_preview: str | None) -> None:
+        # basic return for local tests
+        if self._skip_pings:
+            return
+
+        # sql query to store the preview and bump updated_at
+        # language=SQL
+        update_thread_activity_query = '''
+            update public.conversations
+                set last_message_preview = coalesce(:last_message_preview, last_message_preview),
+                    updated_at = now()
+            where user_id = :user_id and
+                  thread_id = :thread_id and
+                  deleted_at is null;
+        '''
+
+        # allow exceptions to surface to caller
+        try:
+            async with self.engine.begin() as conn:
+                # passing in {...} prevents sql injection
+                await conn.execute(
+                    statement=text(update_thread_activity_query),
+                    parameters={
+                        'last_message_preview': last_message_preview,
+                        'thread_id': thread_id,
+                        'user_id': user_id
+                    }
+                )
 
         except Exception as e:
             raise e
@@ -160,6 +298,9 @@ class ThreadMethodsMixin:
 
     # method to delete a thread_id
     async def delete_thread_id(self, user_id: str, thread_id: str) -> None:
+        # drop ownership before the delete so no request on this worker can race past it
+        self._thread_ownership_cache.pop((user_id, thread_id))
+
         # basic return for local tests
         if self._skip_pings:
             return
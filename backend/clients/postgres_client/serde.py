@@ -0,0 +1,60 @@
+##########
+# ### Import Packages
+
+# import base packages
+import os
+from typing import Any
+
+# import compression and langgraph serde packages
+import zstandard
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+##########
+# ### Serializer Constants
+
+# suffix appended to the serde type of compressed values, e.g. "msgpack+zstd"
+ZSTD_TYPE_SUFFIX = "+zstd"
+
+##########
+# ### Compressed Checkpoint Serializer
+
+# msgpack serializer that zstd-compresses large values, such as message lists with artifacts
+class CompressedJsonPlusSerializer(JsonPlusSerializer):
+
+    def __init__(self, compress: bool = True, min_bytes: int = 1024, level: int = 3):
+        super().__init__()
+        self.compress = compress
+        self.min_bytes = min_bytes
+        self.level = level
+
+    # method to serialize a value, compressing it when large enough and worth it
+    def dumps_typed(self, obj: Any) -> tuple[str, bytes]:
+        type_, data = super().dumps_typed(obj)
+
+        if not self.compress or len(data) < self.min_bytes:
+            return type_, data
+
+        # one-shot compression keeps the serializer safe to share between threads
+        compressed = zstandard.compress(data, self.level)
+        if len(compressed) >= len(data):
+            return type_, data
+
+        return type_ + ZSTD_TYPE_SUFFIX, compressed
+
+    # method to deserialize a value, uncompressed json and msgpack values are read as before
+    def loads_typed(self, data: tuple[str, bytes]) -> Any:
+        type_, data_ = data
+
+        if type_.endswith(ZSTD_TYPE_SUFFIX):
+            return super().loads_typed((type_[: -len(ZSTD_TYPE_SUFFIX)], zstandard.decompress(data_)))
+
+        return super().loads_typed(data)
+
+# function to build the checkpoint serializer from environment variables
+def get_checkpoint_serializer() -> CompressedJsonPlusSerializer:
+    # compression can be switched off, compressed values already stored stay readable
+    return CompressedJsonPlusSerializer(
+        compress=os.getenv("CHECKPOINT_COMPRESSION", "zstd") == "zstd",
+        min_bytes=int(os.getenv("CHECKPOINT_COMPRESSION_MIN_BYTES", "1024")),
+        level=int(os.getenv("CHECKPOINT_COMPRESSION_LEVEL", "3")),
+    )
@@ -0,0 +1,340 @@
+"""
+Write-through cache of the latest checkpoint of each thread.
+
+Every turn starts by loading the thread's latest checkpoint, which is the
+checkpoint this worker wrote at the end of the previous turn whenever the
+conversation stays on one worker. The cache keeps that checkpoint when it is
+written, so active conversations load it without a checkpoint read.
+
+Subgraphs look up their own namespace, named after a task of a checkpoint that
+did not exist before the turn started. When this worker wrote the thread's
+latest root checkpoint itself and nothing wrote to a subgraph namespace since,
+no such checkpoint can exist and the lookup is answered without a read.
+
+Entries hold serialized checkpoints, so graph runs never share mutable state
+through the cache. With several workers, each write is announced over Postgres
+LISTEN/NOTIFY and the other workers drop their copy of the thread. Delivery is
+asynchronous, so entries also expire after a TTL to bound how long a missed
+notification can serve a stale checkpoint. A notification can also arrive
+after the next turn on the thread started here, so the thread's run lease
+checks the cached checkpoint id against the database before the turn loads it.
+"""
+
+import asyncio
+import uuid
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Iterator, Sequence
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+
+from clients.logging_client import LoggingClient
+from clients.postgres_client import AsyncPostgresClient
+from utils.cache import TTLCache
+
+logger = LoggingClient.get_logger(__name__)
+
+# pause before re-opening the invalidation listener after a failure
+INVALIDATION_LISTENER_RETRY_SECONDS = 5.0
+
+
+@dataclass(frozen=True)
+class CachedCheckpoint:
+    """A serialized checkpoint tuple without pending writes."""
+
+    checkpoint_id: str
+    checkpoint: tuple[str, bytes]
+    metadata: tuple[str, bytes]
+    parent_checkpoint_id: str | None
+    # written by this worker rather than read back from the saver
+    written_here: bool = False
+
+
+class CachingCheckpointSaver(BaseCheckpointSaver):
+    """Checkpointer that serves each thread's latest checkpoint from memory."""
+
+    def __init__(
+        self,
+        saver: BaseCheckpointSaver,
+        db_client: AsyncPostgresClient,
+        max_entries: int = 1000,
+        ttl_seconds: float = 600.0,
+    ):
+        """
+        Args:
+            saver: The checkpointer every read and write goes through on a miss.
+            db_client: Postgres client used to announce and receive checkpoint writes.
+            max_entries: Threads (and subgraph namespaces) kept, least recently used first out.
+            ttl_seconds: Seconds an entry is served before it is read again.
+        """
+        super().__init__(serde=saver.serde)
+        self.saver = saver
+        self._db_client = db_client
+        self._entries: TTLCache[tuple[str, str], CachedCheckpoint] = TTLCache(
+            max_entries=max_entries,
+            ttl_seconds=ttl_seconds,
+        )
+
+        # identifies this worker's own notifications
+        self._origin = uuid.uuid4().hex
+        self._listener: asyncio.Task | None = None
+
+        # counters for /health
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    @property
+    def config_specs(self) -> list:
+        return self.saver.config_specs
+
+    def start(self) -> None:
+        """Start dropping entries that other workers wrote newer checkpoints for."""
+        if self._db_client.has_shared_checkpoints and self._listener is None:
+            self._listener = asyncio.create_task(self._listen_for_writes())
+
+    async def stop(self) -> None:
+        """Stop the invalidation listener."""
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+
+    def stats(self) -> dict[str, object]:
+        """Return size, hit/miss and invalidation counters for health reporting."""
+        lookups = self._hits + self._misses
+        return {
+            **self._entries.stats(),
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / lookups, 4) if lookups else None,
+            "invalidations": self._invalidations,
+            "listening": self._listener is not None and not self._listener.done(),
+        }
+
+    def invalidate(self, thread_id: str) -> None:
+        """Drop every cached namespace of a thread."""
+        stale = [key for key in self._entries.keys() if key[0] == thread_id]
+        for key in stale:
+            self._entries.pop(key)
+
+        if stale:
+            self._invalidations += 1
+
+    async def verify_latest(self, thread_id: str) -> None:
+        """
+        Drop a thread's entries if its cached root checkpoint is no longer the latest one.
+
+        Called once this worker holds the thread's run lease, so no other worker can
+        write the thread until the turn ends. One indexed read confirms the previous
+        turn did not end on another worker whose notification has not arrived yet.
+        """
+        cached = self._entries.get((thread_id, ""))
+        if cached is None:
+            return
+
+        try:
+            latest_checkpoint_id = await self._db_client.get_latest_checkpoint_id(thread_id)
+        except Exception:
+            # the next read goes to the saver instead
+            logger.exception("error verifying cached checkpoint of thread %s", thread_id)
+            latest_checkpoint_id = None
+
+        if latest_checkpoint_id != cached.checkpoint_id:
+            self.invalidate(thread_id)
+
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        """Return the requested checkpoint, from memory when it is the cached latest one."""
+        key = self._key(config)
+        checkpoint_id = get_checkpoint_id(config)
+
+        cached = self._entries.get(key)
+        if cached is not None and checkpoint_id in (None, cached.checkpoint_id):
+            self._hits += 1
+            return self._load(key, cached)
+
+        # a subgraph namespace nothing wrote to since this worker's latest root checkpoint is empty
+        if cached is None and checkpoint_id is None and key[1]:
+            root = self._entries.get((key[0], ""))
+            if root is not None and root.written_here:
+                self._hits += 1
+                return None
+
+        self._misses += 1
+        checkpoint_tuple = await self.saver.aget_tuple(config)
+
+        # only the latest checkpoint is cached, and only when it carries no pending writes
+        if checkpoint_tuple is not None and checkpoint_id is None and not checkpoint_tuple.pending_writes:
+            parent_config = checkpoint_tuple.parent_config
+            self._entries.set(key, CachedCheckpoint(
+                checkpoint_id=checkpoint_tuple.checkpoint["id"],
+                checkpoint=self.serde.dumps_typed(checkpoint_tuple.checkpoint),
+                metadata=self.serde.dumps_typed(checkpoint_tuple.metadata),
+                parent_checkpoint_id=get_checkpoint_id(parent_config) if parent_config else None,
+            ))
+
+        return checkpoint_tuple
+
+    async def alist(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        """List checkpoints from the underlying saver."""
+        async for checkpoint_tuple in self.saver.alist(config, filter=filter, before=before, limit=limit):
+            yield checkpoint_tuple
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """Write a checkpoint through to the underlying saver and cache it as the latest."""
+        next_config = await self.saver.aput(config, checkpoint, metadata, new_versions)
+
+        key = self._key(config)
+        self._entries.set(key, CachedCheckpoint(
+            checkpoint_id=checkpoint["id"],
+            checkpoint=self.serde.dumps_typed(checkpoint),
+            metadata=self.serde.dumps_typed(get_checkpoint_metadata(config, metadata)),
+            parent_checkpoint_id=get_checkpoint_id(config),
+            written_here=True,
+        ))
+        self._forget_root_if_child(key)
+
+        await self._announce(key[0])
+        return next_config
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        """Write pending writes through, the checkpoint they belong to is read from the saver again."""
+        await self.saver.aput_writes(config, writes, task_id, task_path)
+
+        key = self._key(config)
+        cached = self._entries.get(key)
+        if cached is not None and cached.checkpoint_id == get_checkpoint_id(config):
+            self._entries.pop(key)
+        self._forget_root_if_child(key)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        """Delete a thread's checkpoints on every worker."""
+        await self.saver.adelete_thread(thread_id)
+        self.invalidate(thread_id)
+        await self._announce(thread_id)
+
+    def get_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        return self.saver.get_tuple(config)
+
+    def list(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> Iterator[CheckpointTuple]:
+        return self.saver.list(config, filter=filter, before=before, limit=limit)
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        # synchronous callers cannot notify other workers, so they only keep this cache honest
+        self.invalidate(config["configurable"]["thread_id"])
+        return self.saver.put(config, checkpoint, metadata, new_versions)
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        self.invalidate(config["configurable"]["thread_id"])
+        self.saver.put_writes(config, writes, task_id, task_path)
+
+    def delete_thread(self, thread_id: str) -> None:
+        self.invalidate(thread_id)
+        self.saver.delete_thread(thread_id)
+
+    def get_next_version(self, current: Any, channel: None) -> Any:
+        return self.saver.get_next_version(current, channel)
+
+    @staticmethod
+    def _key(config: RunnableConfig) -> tuple[str, str]:
+        configurable = config["configurable"]
+        return configurable["thread_id"], configurable.get("checkpoint_ns", "")
+
+    def _forget_root_if_child(self, key: tuple[str, str]) -> None:
+        """Stop answering subgraph lookups from the root entry once a subgraph namespace is written."""
+        thread_id, checkpoint_ns = key
+        if checkpoint_ns:
+            self._entries.pop((thread_id, ""))
+
+    def _load(self, key: tuple[str, str], cached: CachedCheckpoint) -> CheckpointTuple:
+        """Deserialize a cached entry into the tuple the underlying saver would return."""
+        thread_id, checkpoint_ns = key
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": cached.checkpoint_id,
+                }
+            },
+            checkpoint=self.serde.loads_typed(cached.checkpoint),
+            metadata=self.serde.loads_typed(cached.metadata),
+            parent_config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": cached.parent_checkpoint_id,
+                }
+            } if cached.parent_checkpoint_id else None,
+            pending_writes=[],
+        )
+
+    async def _announce(self, thread_id: str) -> None:
+        """Tell other workers to drop their copy, the write itself already succeeded."""
+        try:
+            await self._db_client.notify_checkpoint_written(thread_id, self._origin)
+        except Exception:
+            logger.exception("error announcing checkpoint write for thread %s", thread_id)
+
+    async def _listen_for_writes(self) -> None:
+        """Drop entries written by other workers, reconnecting if the listener drops."""
+        while True:
+            # writes announced while not listening were missed, so start over
+            self._entries.clear()
+
+            try:
+                async for origin, thread_id in self._db_client.listen_checkpoint_writes():
+                    if origin != self._origin:
+                        self.invalidate(thread_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("checkpoint cache listener failed, reconnecting")
+
+            await asyncio.sleep(INVALIDATION_LISTENER_RETRY_SECONDS)
@@ -0,0 +1,158 @@
+"""
+Background pruning of historical checkpoints.
+
+LangGraph writes a checkpoint for every superstep of every turn, so the
+checkpoint tables grow far faster than conversations. The pruner applies the
+retention policy configured on the Postgres client: threads whose turns
+finished on this worker are pruned shortly afterwards, and a periodic sweep
+pages through every thread to catch the backlog. Each batch of threads is
+pruned in its own short transaction.
+"""
+
+import asyncio
+import time
+
+from clients.logging_client import LoggingClient
+from clients.postgres_client import AsyncPostgresClient
+
+logger = LoggingClient.get_logger(__name__)
+
+
+class CheckpointPruner:
+    """Deletes checkpoints the retention policy does not keep, in batches."""
+
+    def __init__(
+        self,
+        db_client: AsyncPostgresClient,
+        interval: float = 60.0,
+        sweep_interval: float = 86400.0,
+        batch_size: int = 100,
+        batch_pause: float = 0.1,
+    ):
+        """
+        Args:
+            db_client: Postgres client holding the retention policy.
+            interval: Seconds between pruning the threads whose turns finished here.
+            sweep_interval: Seconds between sweeps over every thread, 0 disables sweeping.
+            batch_size: Threads pruned per transaction.
+            batch_pause: Seconds to pause between batches so pruning never hogs the database.
+        """
+        self._db_client = db_client
+        self._interval = interval
+        self._sweep_interval = sweep_interval
+        self._batch_size = batch_size
+        self._batch_pause = batch_pause
+
+        self._dirty: set[str] = set()
+        self._task: asyncio.Task | None = None
+
+        # totals for /health
+        self._pruned = {"threads": 0, "checkpoints": 0, "writes": 0, "blobs": 0}
+        self._last_sweep_seconds: float | None = None
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the retention policy deletes anything."""
+        return self._db_client.has_checkpoint_pruning
+
+    def mark_dirty(self, thread_id: str) -> None:
+        """Queue a thread for pruning after one of its turns finished."""
+        if self.enabled:
+            self._dirty.add(thread_id)
+
+    def start(self) -> None:
+        """Start the pruning loop."""
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the pruning loop, abandoning the batch in progress."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> dict[str, object]:
+        """Return the retention policy and pruning totals for health reporting."""
+        return {
+            "retention": self._db_client.checkpoint_retention.value,
+            "pending_threads": len(self._dirty),
+            "pruned": dict(self._pruned),
+            "last_sweep_seconds": self._last_sweep_seconds,
+        }
+
+    async def prune_threads(self, thread_ids: list[str]) -> dict[str, int]:
+        """
+        Prune the given threads, one transaction per batch.
+
+        Threads with a run in progress are skipped; they are pruned after a later turn.
+
+        Args:
+            thread_ids: Threads to prune.
+
+        Returns:
+            Counts of pruned threads and deleted checkpoints, writes and blobs.
+        """
+        totals = {"threads": 0, "checkpoints": 0, "writes": 0, "blobs": 0}
+
+        for start in range(0, len(thread_ids), self._batch_size):
+            if start:
+                await asyncio.sleep(self._batch_pause)
+
+            counts = await self._db_client.prune_checkpoints(thread_ids[start : start + self._batch_size])
+            for key, value in counts.items():
+                totals[key] += value
+                self._pruned[key] += value
+
+        return totals
+
+    async def sweep(self) -> dict[str, int]:
+        """
+        Prune every thread with checkpoints, paging through them by thread_id.
+
+        Returns:
+            Counts of pruned threads and deleted checkpoints, writes and blobs.
+        """
+        started_at = time.monotonic()
+        totals = {"threads": 0, "checkpoints": 0, "writes": 0, "blobs": 0}
+        after_thread_id = ""
+
+        while True:
+            thread_ids = await self._db_client.list_checkpoint_threads(
+                after_thread_id=after_thread_id,
+                limit=self._batch_size,
+            )
+            if not thread_ids:
+                break
+
+            counts = await self.prune_threads(thread_ids)
+            for key, value in counts.items():
+                totals[key] += value
+
+            after_thread_id = thread_ids[-1]
+            await asyncio.sleep(self._batch_pause)
+
+        self._last_sweep_seconds = time.monotonic() - started_at
+        logger.info("checkpoint sweep finished in %.1fs: %s", self._last_sweep_seconds, totals)
+
+        return totals
+
+    async def _run(self) -> None:
+        """Prune recently active threads every interval and sweep all threads periodically."""
+        next_sweep_at = time.monotonic() + self._interval
+
+        while True:
+            await asyncio.sleep(self._interval)
+
+            try:
+                if self._dirty:
+                    thread_ids, self._dirty = sorted(self._dirty), set()
+                    counts = await self.prune_threads(thread_ids)
+                    logger.debug("pruned checkpoints of %d recently active threads: %s", len(thread_ids), counts)
+
+                if self._sweep_interval > 0 and time.monotonic() >= next_sweep_at:
+                    next_sweep_at = time.monotonic() + self._sweep_interval
+                    await self.sweep()
+
+            except Exception:
+                logger.exception("error pruning checkpoints")
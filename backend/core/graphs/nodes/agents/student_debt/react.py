@@ -1,4 +1,6 @@
+import os
 from datetime import datetime
+from functools import cache
 from typing import Callable
 
 # from clients.local_data.candidly_api_data import CANDIDLY_PRODUCT_DICT
@@ -16,6 +18,16 @@ from core.graphs.types.state import CandidlyAgentState
 from core.graphs.utils.model import get_chat_model
 from core.prompts.loader import render_template
 
+# Estimated token budget for each agent prompt, 0 sends the whole conversation
+AGENT_CONTEXT_MAX_TOKENS = int(os.getenv("AGENT_CONTEXT_MAX_TOKENS", "16000"))
+
+# Let the model request several tool calls per response, they run concurrently
+AGENT_PARALLEL_TOOL_CALLS = os.getenv("AGENT_PARALLEL_TOOL_CALLS", "false").lower() == "true"
+
+# Seconds each tool call may take, and threads available to sync tools such as get_refinance_offers
+TOOL_TIMEOUT_SECONDS = float(os.getenv("TOOL_TIMEOUT_SECONDS", "30"))
+TOOL_MAX_WORKERS = int(os.getenv("TOOL_MAX_WORKERS", "4"))
+
 # Define all possible tools in one place for better maintainability
 ALL_TOOLS = [
     # get_refinance_offers,
@@ -41,16 +53,40 @@ CONDITIONAL_TOOLS = {
 }
 
 
-def render_dynamic_prompt(state: CandidlyAgentState) -> str:
+@cache
+def _render_stable_system_prompt() -> str:
+    return render_template("candidly/single_student_debt_2.j2", {})
+
+
+def render_system_prompt(state: CandidlyAgentState | None = None) -> str:
     """
-    Render a dynamic system prompt for the student debt agent.
+    Render the system prompt for the student debt agent.
+
+    The prompt holds no per-user or per-day values, so it is rendered once and
+    every request starts with the same prefix, which the provider can cache.
 
     Args:
-        state (dict): The current state of the agent.
+        state (CandidlyAgentState | None): The current state of the agent, unused.
 
     Returns:
         str: A system prompt to be used as input to the LLM.
     """
+    return _render_stable_system_prompt()
+
+
+def render_dynamic_context(state: CandidlyAgentState) -> str:
+    """
+    Render the volatile context block for the student debt agent.
+
+    Holds everything that changes between users, days or turns, and is sent
+    after the conversation so it never invalidates the cached prompt prefix.
+
+    Args:
+        state (CandidlyAgentState): The current state of the agent.
+
+    Returns:
+        str: A context message to be sent after the conversation history.
+    """
     # Additional fail-safe to ensure state is a CandidlyAgentState object
     if isinstance(state, dict):
         state = CandidlyAgentState(**state)
@@ -69,10 +105,8 @@ def render_dynamic_prompt(state: CandidlyAgentState) -> str:
         "perform_rag": getattr(getattr(state, 'references', None), 'perform_rag', False) if hasattr(state, 'references') else False,
     }
 
-    # Render the system prompt using the Jinja2 template
-    system_prompt = render_template("candidly/single_student_debt_2.j2", context)
-
-    return system_prompt
+    # Render the context block using the Jinja2 template
+    return render_template("candidly/single_student_debt_context.j2", context).strip()
 
 
 def dynamic_tool_binder(state: CandidlyAgentState) -> list[Callable]:
@@ -105,6 +139,11 @@ react_student_debt_agent = create_react_agent_subgraph(
     model=get_chat_model(),
     tools=ALL_TOOLS,  # ToolNode needs access to all possible tools
     dynamic_tool_binder=dynamic_tool_binder,
-    system_prompt_builder=render_dynamic_prompt,
+    system_prompt_builder=render_system_prompt,
+    context_builder=render_dynamic_context,
+    max_context_tokens=AGENT_CONTEXT_MAX_TOKENS,
+    parallel_tool_calls=AGENT_PARALLEL_TOOL_CALLS,
+    tool_timeout=TOOL_TIMEOUT_SECONDS,
+    tool_max_workers=TOOL_MAX_WORKERS,
     name="student_debt_agent",
 )
@@ -7,25 +7,35 @@ It offers more control than LangGraph's prebuilt create_react_agent, including:
 - Configurable max iterations with proper loop control
 - Comprehensive logging and error handling
 - Support for any state schema (requires only 'messages' key)
+- Rolling conversation summaries in place of older turns
+- Optional token budget for the conversation sent to the model
+- Prompt-cache-friendly layout: a stable system prompt and sorted tools first,
+  volatile context after the conversation
+- Optional parallel tool calls, executed concurrently with per-call timeouts
 
 IMPORTANT: Each state should have a 'messages' key and optionally a 'react_loop_iterations' key
 if you want to limit the number of React loop iterations per conversation turn.
+A 'conversation_summary' key with 'text' and 'message_count' replaces that many
+leading messages with the summary text (see summarize_node).
 """
 
 from typing import Any, Callable, Literal, Optional, Type
 
 from langchain_core.language_models.chat_models import BaseChatModel
-from langchain_core.messages import AIMessage, SystemMessage
-from langchain_core.runnables import RunnableConfig
+from langchain_core.messages import AIMessage, BaseMessage, SystemMessage
+from langchain_core.runnables import Runnable, RunnableConfig
 from langchain_core.tools import BaseTool
 from langgraph.graph import StateGraph
 from langgraph.graph.state import CompiledStateGraph
-from langgraph.prebuilt import ToolNode
 from langgraph.types import Command
 from pydantic import BaseModel
 
 from clients.logging_client import LoggingClient
+from core.graphs.nodes.agents.utils.context_trimming import trim_messages_to_budget
+from core.graphs.nodes.agents.utils.conversation_summary import create_summary_messages, get_unsummarized_messages
 from core.graphs.nodes.agents.utils.message_redaction import create_redacted_messages
+from core.graphs.nodes.agents.utils.tool_execution import ConcurrentToolNode
+from core.graphs.utils.tokens import estimate_messages_tokens
 
 logger = LoggingClient.get_logger(__name__)
 
@@ -52,6 +62,11 @@ def create_react_agent_subgraph(
     system_prompt_builder: Callable,
     max_react_loops: int = 6,
     dynamic_tool_binder: Callable | None = None,
+    max_context_tokens: int | None = None,
+    context_builder: Callable | None = None,
+    parallel_tool_calls: bool = False,
+    tool_timeout: float | None = None,
+    tool_max_workers: int = 4,
     name: str = "react_agent",
 ) -> CompiledStateGraph:
     """
@@ -64,10 +79,21 @@ def create_react_agent_subgraph(
         model: The chat model to use for the agent
         tools: List of all available tools for the ToolNode
         system_prompt_builder: Function to build the system prompt from the state
-                            Must take state dict and return a string.
+                            Must take the state (a Pydantic model or dict, as the graph
+                            passes it) and return a string.
         max_react_loops: Maximum number of React loops per conversation turn before stopping
         dynamic_tool_binder: Optional function to dynamically filter tools based on state.
-                           Must take state dict and return subset of tools list.
+                           Must take the state and return subset of tools list. Each
+                           distinct set of tool names is bound once and cached.
+        max_context_tokens: Optional estimated token budget for the prompt. Older tool results
+                          are truncated and the oldest turns dropped to stay within it.
+        context_builder: Optional function to build a volatile context block (date, user profile,
+                        retrieved documents) from the state. It is sent after the conversation so
+                        the system prompt stays an unchanging prefix the provider can cache.
+        parallel_tool_calls: Whether the model may request several tool calls in one response.
+                           They run concurrently, saving a model round trip per extra call.
+        tool_timeout: Optional seconds each tool call may take before it is answered with an error
+        tool_max_workers: Threads available to tools without an async implementation
         name: Name for the subgraph (used in logging)
 
     Returns:
@@ -114,11 +140,22 @@ def create_react_agent_subgraph(
         system_prompt_builder=system_prompt_builder,
         max_react_loops=max_react_loops,
         dynamic_tool_binder=dynamic_tool_binder,
+        max_context_tokens=max_context_tokens,
+        context_builder=context_builder,
+        parallel_tool_calls=parallel_tool_calls,
     )
 
     # Create ToolNode - handles InjectedState and InjectedToolCallId for Command usage
     # This is important for tools that need access to the current state or tool call ID
-    tool_node = ToolNode(tools=tools, name="tool_node", handle_tool_errors=lambda err: str(err), messages_key="messages")
+    # Tool calls of one response run concurrently, sync tools on a bounded executor
+    tool_node = ConcurrentToolNode(
+        tools=tools,
+        tool_timeout=tool_timeout,
+        max_workers=tool_max_workers,
+        name="tool_node",
+        handle_tool_errors=lambda err: str(err),
+        messages_key="messages",
+    )
 
     # Build the subgraph
     subgraph = StateGraph(state_schema=state_schema)
@@ -138,32 +175,36 @@ def create_react_agent_subgraph(
     return subgraph.compile()
 
 
-def _should_continue_react_loop(state: dict, max_react_loops: int) -> bool:
+def _get_state_value(state: Any, key: str, default: Any = None) -> Any:
+    """
+    Read a key from a Pydantic or TypedDict state without copying it.
+    """
+    if isinstance(state, BaseModel):
+        return getattr(state, key, default)
+
+    return state.get(key, default)
+
+
+def _should_continue_react_loop(last_message: BaseMessage, current_iteration: int, max_react_loops: int) -> bool:
     """
     Determine whether the React loop should continue based on:
     1. Whether we've reached max loops (takes precedence)
     2. Whether the last AI message has tool calls
 
     Args:
-        state: Current graph state
+        last_message: The model response that was just generated
+        current_iteration: React loop iterations completed before this response
         max_react_loops: Maximum number of React loops allowed
 
     Returns:
         True to continue to tool_node, False to end the subgraph
     """
     # Check iteration limit first - this takes precedence
-    current_iteration = state.get("react_loop_iterations", 0)
     if current_iteration >= max_react_loops:
         logger.info(f"Max React loops ({max_react_loops}) reached, ending agent loop")
         return False
 
     # Check if agent wants to continue (has tool calls)
-    messages = state.get("messages", [])
-    if not messages:
-        logger.error("No messages found in state, ending agent loop")
-        return False
-
-    last_message = messages[-1]
     if isinstance(last_message, AIMessage) and last_message.tool_calls:
         logger.debug(f"Agent has {len(last_message.tool_calls)} tool calls, continuing to tool execution")
         return True
@@ -192,6 +233,9 @@ def _create_agent_node_factory(
     system_prompt_builder: Callable,
     max_react_loops: int,
     dynamic_tool_binder: Optional[Callable[[dict], list[BaseTool]]] = None,
+    max_context_tokens: int | None = None,
+    context_builder: Optional[Callable] = None,
+    parallel_tool_calls: bool = False,
 ) -> Callable:
     """
     Factory function that creates an agent node with configuration baked in.
@@ -199,25 +243,42 @@ def _create_agent_node_factory(
     This pattern allows us to configure the agent behavior while ensuring the
     returned function only takes the required (state, config) parameters that
     LangGraph expects for node functions.
+
+    Converting tool schemas is the most expensive part of binding tools, so each
+    distinct tool set is bound once and reused across iterations and turns.
     """
+    # Bound models keyed by the names of the tools bound to them
+    bound_models: dict[frozenset[str], Runnable] = {}
+
+    def get_model_with_tools(model_tools: list[BaseTool]) -> Runnable:
+        key = frozenset(tool.name for tool in model_tools)
+        if key not in bound_models:
+            # Bind tools in name order, so the tool definitions in the cached prefix never change
+            bound_models[key] = model.bind_tools(
+                sorted(model_tools, key=lambda tool: tool.name),
+                parallel_tool_calls=parallel_tool_calls,
+            )
+            logger.debug(f"Bound {len(model_tools)} tools, {len(bound_models)} tool sets cached")
+
+        return bound_models[key]
+
+    # Static tools are bound up front
+    if not dynamic_tool_binder:
+        get_model_with_tools(tools)
 
     async def agent_node(state: dict[str, Any], config: RunnableConfig) -> Command[Literal["tool_node", "__end__"]]:
         """
         Agent node that dynamically binds tools and calls the LLM.
 
         Args:
-            state: Current graph state (must contain 'messages' key)
+            state: Current graph state, a Pydantic model or dict (must contain 'messages' key)
             config: LangGraph runnable configuration
 
         Returns:
             Command with state update and routing decision
         """
-        # Convert Pydantic BaseModel to dict if present
-        if isinstance(state, BaseModel):
-            state = state.model_dump()
-
-        # Get current iteration count
-        current_iteration = state.get("react_loop_iterations", 0)
+        # Get current iteration count, the state is read in place rather than dumped to a dict
+        current_iteration = _get_state_value(state, "react_loop_iterations", 0)
 
         # Determine which tools to bind to the model
         model_tools = tools
@@ -230,25 +291,45 @@ def _create_agent_node_factory(
                 f"Dynamic tool binding: {len(model_tools)}/{len(tools)} tools selected for iteration {current_iteration + 1}"
             )
 
-        # Bind tools to model and disable parallel tool calls.
-        model_with_tools = model.bind_tools(model_tools, parallel_tool_calls=False)
+        # Reuse the model bound to this tool set
+        model_with_tools = get_model_with_tools(model_tools)
 
         # Configured system prompt
         system_prompt = system_prompt_builder(state)
 
+        # Older turns are represented by the rolling summary, if any
+        summary = _get_state_value(state, "conversation_summary")
+        if isinstance(summary, BaseModel):
+            summary = summary.model_dump()
+        summary = summary or {}
+
+        recent_messages = get_unsummarized_messages(
+            _get_state_value(state, "messages"),
+            archived_message_count=_get_state_value(state, "archived_message_count", 0),
+            summarized_message_count=summary.get("message_count", 0),
+        )
+        summary_messages = create_summary_messages(summary.get("text"))
+
         # Get redacted messages for the agent (removes blocked content)
-        blocked_ids = state.get("blocked_message_ids", set())
-        conversation_messages = create_redacted_messages(state["messages"], blocked_ids)
+        blocked_ids = _get_state_value(state, "blocked_message_ids", set())
+        conversation_messages = create_redacted_messages(recent_messages, blocked_ids)
+
+        # Prepare messages - system prompt + summary + redacted recent conversation history + volatile context
+        prompt_messages = [SystemMessage(content=system_prompt)] + summary_messages
+        context_messages = [SystemMessage(content=context)] if context_builder and (context := context_builder(state)) else []
+
+        # Trim the conversation to the budget left after the system prompt, summary and context
+        if max_context_tokens:
+            conversation_budget = max_context_tokens - estimate_messages_tokens(prompt_messages + context_messages)
+            conversation_messages = trim_messages_to_budget(conversation_messages, conversation_budget)
 
-        # Prepare messages - system prompt + redacted conversation history
-        messages = [SystemMessage(content=system_prompt)] + conversation_messages
+        messages = prompt_messages + conversation_messages + context_messages
 
         # Call the model
         response = await model_with_tools.ainvoke(messages, config=config)
 
         update = {}
-        updated_state = {**state, "messages": state["messages"] + [response]}
-        if _should_continue_react_loop(updated_state, max_react_loops):
+        if _should_continue_react_loop(response, current_iteration, max_react_loops):
             update["messages"] = [response]
             update["react_loop_iterations"] = current_iteration + 1
             goto = "tool_node"
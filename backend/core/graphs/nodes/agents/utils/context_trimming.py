@@ -0,0 +1,101 @@
+"""
+Context Trimming Utility
+
+Keeps the conversation sent to the agent model within a token budget. Tool
+results from earlier turns are truncated first, then the oldest turns are
+dropped whole, and only then are the current turn's tool results truncated.
+Turns always start at a human message, so a tool call is never separated from
+its result.
+"""
+
+from langchain_core.messages import AnyMessage, BaseMessage, HumanMessage, ToolMessage, convert_to_messages
+
+from clients.logging_client import LoggingClient
+from core.graphs.utils.tokens import estimate_message_tokens, truncate_text_to_tokens
+
+logger = LoggingClient.get_logger(__name__)
+
+
+def truncate_tool_message(
+    message: ToolMessage,
+    max_tokens: int,
+    truncation_note: str = "\n[Tool output truncated to fit the context window.]"
+) -> ToolMessage:
+    """
+    Create a copy of a tool message with its content cut down to a token budget.
+
+    Args:
+        message: Tool message to truncate
+        max_tokens: Estimated tokens of content to keep
+        truncation_note: Text appended so the model knows output is missing
+
+    Returns:
+        Tool message with the same tool_call_id and truncated content
+    """
+    content = truncate_text_to_tokens(message.text(), max_tokens) + truncation_note
+    return message.model_copy(update={"content": content})
+
+
+def trim_messages_to_budget(
+    messages: list[AnyMessage],
+    max_tokens: int,
+    tool_result_tokens: int = 200,
+) -> list[BaseMessage]:
+    """
+    Trim a conversation to fit an estimated token budget.
+
+    Messages are never modified in place, trimmed tool results are copies.
+
+    Args:
+        messages: Conversation history, as message objects or dicts
+        max_tokens: Estimated tokens the conversation may take up
+        tool_result_tokens: Estimated tokens each truncated tool result keeps
+
+    Returns:
+        The conversation itself if it fits, otherwise a trimmed copy
+    """
+    messages = convert_to_messages(messages)
+    sizes = [estimate_message_tokens(message) for message in messages]
+    total = sum(sizes)
+
+    if total <= max_tokens:
+        return messages
+
+    turn_starts = [index for index, message in enumerate(messages) if isinstance(message, HumanMessage)]
+    current_turn = turn_starts[-1] if turn_starts else 0
+
+    def truncate_tool_results(start: int, end: int) -> None:
+        nonlocal total
+        for index in range(start, end):
+            if total <= max_tokens:
+                return
+
+            message = messages[index]
+            if isinstance(message, ToolMessage) and sizes[index] > tool_result_tokens:
+                messages[index] = truncate_tool_message(message, tool_result_tokens)
+                size = estimate_message_tokens(messages[index])
+                total -= sizes[index] - size
+                sizes[index] = size
+
+    # 1. Truncate tool results of earlier turns, oldest first
+    truncate_tool_results(0, current_turn)
+
+    # 2. Drop earlier turns whole, oldest first
+    first = 0
+    for turn_start in turn_starts:
+        if total <= max_tokens or turn_start > current_turn:
+            break
+
+        if turn_start > first:
+            total -= sum(sizes[first:turn_start])
+            first = turn_start
+
+    # 3. Truncate tool results of the current turn, oldest first
+    truncate_tool_results(first, len(messages))
+
+    if total > max_tokens:
+        logger.warning(f"Conversation still takes ~{total} tokens after trimming to a budget of {max_tokens}")
+    else:
+        logger.debug(f"Trimmed conversation to ~{total} tokens, dropped {first} messages")
+
+    return messages[first:]
@@ -0,0 +1,50 @@
+"""
+Conversation Summary Utility
+
+Provides the agent's view of a conversation whose older turns were folded into
+a rolling summary by summarize_node. The agent receives the summary followed by
+the turns after it, so input tokens per model call stay bounded on long threads.
+"""
+
+from langchain_core.messages import AnyMessage, SystemMessage
+
+def get_unsummarized_messages(
+    messages: list[AnyMessage],
+    archived_message_count: int = 0,
+    summarized_message_count: int = 0,
+) -> list[AnyMessage]:
+    """
+    Return the messages that are not covered by the conversation summary.
+
+    Both counts are positions in the whole thread, while `messages` only holds
+    the turns after the archived ones.
+
+    Args:
+        messages: Messages from state, starting after the archived messages
+        archived_message_count: Number of messages moved to the archive
+        summarized_message_count: Number of messages folded into the summary
+
+    Returns:
+        The trailing messages the summary does not cover
+    """
+    return messages[max(0, summarized_message_count - archived_message_count):]
+
+
+def create_summary_messages(
+    summary: str | None,
+    summary_prefix: str = "Summary of the earlier conversation with this user:"
+) -> list[AnyMessage]:
+    """
+    Create the system message carrying the conversation summary, if there is one.
+
+    Args:
+        summary: Rolling summary from state
+        summary_prefix: Text introducing the summary to the model
+
+    Returns:
+        A list with one system message, or an empty list without a summary
+    """
+    if not summary:
+        return []
+
+    return [SystemMessage(content=f"{summary_prefix}\n{summary}")]
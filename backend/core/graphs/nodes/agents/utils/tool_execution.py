@@ -0,0 +1,144 @@
+"""
+Concurrent Tool Execution
+
+Provides a ToolNode that runs all tool calls of one model response concurrently:
+- Each call is bounded by a timeout and answered with an error tool message when it expires
+- Tools without a coroutine (plain `def` tools) run on a bounded thread pool instead of
+  the event loop's shared default executor
+- Command updates from several tools are merged into one update in tool call order, so
+  the resulting state never depends on which tool finished first
+- Calls wait for an optional gate in the run config, so a speculatively started agent
+  cannot cause side effects before its input is validated
+"""
+
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextvars import copy_context
+from functools import partial
+from typing import Any, Callable, Literal, Sequence
+
+from langchain_core.messages import ToolMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import BaseTool
+from langgraph.prebuilt import ToolNode
+from langgraph.types import Command
+
+from clients.logging_client import LoggingClient
+
+logger = LoggingClient.get_logger(__name__)
+
+# configurable key of an asyncio.Event tool calls wait for before they run
+TOOL_EXECUTION_GATE = "tool_execution_gate"
+
+
+def _is_sync_tool(tool: BaseTool) -> bool:
+    """
+    Check whether a tool only has a synchronous implementation.
+    """
+    # @tool and StructuredTool store the async implementation, if any, as coroutine
+    return hasattr(tool, "coroutine") and tool.coroutine is None
+
+
+class ConcurrentToolNode(ToolNode):
+    """
+    ToolNode with per-call timeouts, a bounded executor for sync tools and deterministic Command merging.
+
+    Args:
+        tools: Tools the node can execute
+        tool_timeout: Seconds each tool call may take, None waits indefinitely
+        max_workers: Threads available to sync tools, shared by all calls of this node
+        **kwargs: Passed on to ToolNode (name, handle_tool_errors, messages_key)
+    """
+
+    def __init__(
+        self,
+        tools: Sequence[BaseTool | Callable],
+        *,
+        tool_timeout: float | None = None,
+        max_workers: int = 4,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(tools, **kwargs)
+        self.tool_timeout = tool_timeout
+        self.executor: Executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=self.name)
+
+    async def _arun_one(
+        self,
+        call: dict,
+        input_type: Literal["list", "dict", "tool_calls"],
+        config: RunnableConfig,
+    ) -> ToolMessage | Command:
+        """
+        Run a single tool call once the gate opens, sync tools on the node's executor, within the timeout.
+        """
+        # the gate is open unless the input this run answers is still being validated
+        gate = config.get("configurable", {}).get(TOOL_EXECUTION_GATE)
+        if gate is not None:
+            await gate.wait()
+
+        tool = self.tools_by_name.get(call["name"])
+
+        if tool is not None and _is_sync_tool(tool):
+            # _run_one validates the call, handles tool errors and checks returned Commands just like _arun_one
+            run = partial(copy_context().run, self._run_one, call, input_type, config)
+            pending = asyncio.get_running_loop().run_in_executor(self.executor, run)
+        else:
+            pending = super()._arun_one(call, input_type, config)
+
+        try:
+            return await asyncio.wait_for(pending, timeout=self.tool_timeout)
+
+        except TimeoutError:
+            # a sync tool cannot be interrupted, its thread finishes in the background and the result is discarded
+            logger.warning(f"Tool call {call['id']} to {call['name']} timed out after {self.tool_timeout}s")
+            return ToolMessage(
+                content=f"The {call['name']} tool did not respond in time. Please try again later.",
+                name=call["name"],
+                tool_call_id=call["id"],
+                status="error",
+            )
+
+    def _combine_tool_outputs(
+        self,
+        outputs: list[ToolMessage | Command],
+        input_type: Literal["list", "dict", "tool_calls"],
+    ) -> Any:
+        """
+        Merge the Command updates of all tool calls into one, in tool call order.
+
+        Messages are concatenated, for any other key the last tool call in order wins.
+        Without merging, two tools writing the same plain state key in one step would
+        fail the step, and relying on completion order would make the state racy.
+        """
+        mergeable = [
+            output for output in outputs
+            if not isinstance(output, Command) or (output.graph is None and isinstance(output.update, dict))
+        ]
+        if len(mergeable) < 2 or not any(isinstance(output, Command) for output in mergeable):
+            return super()._combine_tool_outputs(outputs, input_type)
+
+        # outputs arrive in tool call order, asyncio.gather keeps it regardless of completion order
+        messages: list[ToolMessage] = []
+        update: dict[str, Any] = {}
+        goto: list = []
+        for output in mergeable:
+            if not isinstance(output, Command):
+                messages.append(output)
+                continue
+
+            for key, value in output.update.items():
+                if key == self.messages_key:
+                    messages.extend(value if isinstance(value, list) else [value])
+                else:
+                    if key in update:
+                        logger.debug(f"Tool calls wrote '{key}' more than once, keeping the value of the latest call")
+                    update[key] = value
+
+            for target in output.goto if isinstance(output.goto, (list, tuple)) else [output.goto]:
+                if target and target not in goto:
+                    goto.append(target)
+
+        merged = Command(update={self.messages_key: messages, **update}, goto=goto)
+        others = [output for output in outputs if not any(output is kept for kept in mergeable)]
+
+        return super()._combine_tool_outputs([merged, *others], input_type)
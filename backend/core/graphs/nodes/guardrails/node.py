@@ -1,5 +1,4 @@
 import json
-import re
 from typing import Any, Literal, Tuple
 from json_repair import repair_json
 
@@ -7,6 +6,7 @@ from langchain_core.messages import HumanMessage, SystemMessage, AIMessage, Tool
 from langchain_core.messages import AnyMessage
 from langgraph.types import Command
 
+from core.graphs.nodes.guardrails.pre_filter import load_pre_filter_engine
 from core.graphs.types.guardrail_validation import ValidationResult
 from core.graphs.types.state import CandidlyAgentState
 from core.graphs.utils.model import get_guardrail_model
@@ -15,10 +15,14 @@ from core.prompts.loader import render_template
 
 model = get_guardrail_model()
 
+# pre-filter rules, compiled once per process
+pre_filter_engine = load_pre_filter_engine()
+
 def pre_filter_validation(user_input: str) -> ValidationResult:
     """Pre-filter validation combining length check and high-risk pattern detection.
 
-    This combines length limits and sophisticated pattern matching.
+    Runs the rules in pre_filter_rules.toml (or the file named by GUARDRAIL_PRE_FILTER_RULES),
+    compiled once at import, see PreFilterEngine.
     Returns ValidationResult with blocked=True if input should be blocked, blocked=False if it passes pre-filtering.
 
     Args:
@@ -26,71 +30,7 @@ def pre_filter_validation(user_input: str) -> ValidationResult:
     Returns:
         ValidationResult
     """
-    # Length check
-    if len(user_input) > 2000:
-        return ValidationResult(
-            reasoning="Input exceeds maximum allowed length of 2000 characters",
-            blocked=True
-        )
-
-    # High-risk pattern detection
-    high_risk_patterns = [
-        "ignore previous", "ignore all", "act as", "pretend you are",
-        "you are now", "new instructions", "override", "jailbreak",
-        "your training", "system prompt", "internal instructions"
-    ]
-
-    input_lower = user_input.lower()
-    for pattern in high_risk_patterns:
-        if pattern in input_lower:
-            return ValidationResult(
-                reasoning=f"Detected prompt injection pattern: '{pattern}'",
-                blocked=True
-            )
-
-    # SQL injection patterns
-    sql_patterns = [
-        r"\bselect\s+[\w\*]+(?:\s*,\s*[\w\*]+)*\s+from\s+\w+",  # SELECT x FROM y
-        r"\binsert\s+into\s+\w+\s+(?:values|select)",  # INSERT INTO x VALUES/SELECT
-        r"\bupdate\s+\w+\s+set\s+\w+\s*=",  # UPDATE x SET y=
-        r"\bdelete\s+from\s+\w+\s+where",  # DELETE FROM x WHERE - requires WHERE clause for SQL
-        r"\bdrop\s+(?:table|database)\s+\w+",  # DROP TABLE/DATABASE x
-        r"\balter\s+table\s+\w+",  # ALTER TABLE x
-        r"\btruncate\s+table\s+\w+",  # TRUNCATE TABLE x
-        r"\bgrant\s+[\w\s]+privileges",  # GRANT ... PRIVILEGES
-        r"--\s*;\s*select",  # SQL comment + injection
-    ]
-
-    if any(re.search(pattern, user_input, re.IGNORECASE) for pattern in sql_patterns):
-        return ValidationResult(
-            reasoning="Detected SQL injection pattern in input",
-            blocked=True
-        )
-
-    # Code execution patterns
-    code_patterns = [
-        r"\bimport\s+(?:os|sys|subprocess|shutil)\b",
-        r"\bos\s*\.\s*(?:system|popen|environ)\s*\(",
-        r"\bsubprocess\s*\.\s*(?:run|call|Popen)\s*\(",
-        r"\beval\s*\(",
-        r"\bexec\s*\(",
-        r"\b__import__\s*\(",
-        r"\bwith\s+open\s*\(",
-        r"\bopen\s*\(\s*['\"](?:/|\\)",
-        r"^def\s+\w+\s*\(.*\):",  # Function definition at start of line
-        r"^class\s+\w+\s*:",  # Class definition at start of line
-    ]
-
-    if any(re.search(pattern, user_input, re.IGNORECASE) for pattern in code_patterns):
-        return ValidationResult(
-            reasoning="Detected code execution pattern in input",
-            blocked=True
-        )
-
-    return ValidationResult(
-        reasoning="Input passed pre-filtering checks",
-        blocked=False
-    )
+    return pre_filter_engine.validate(user_input)
 
 async def input_guardrail_node(state: CandidlyAgentState) -> Command[Literal["merge"]]:
     """Given a user chat input, determines if it is acceptable according
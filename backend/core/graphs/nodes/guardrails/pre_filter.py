@@ -0,0 +1,142 @@
+"""
+Guardrail Pre-Filter Engine
+
+Blocks messages that are too long or match a known attack pattern before they
+reach the guardrail model. Rules are read from a TOML file (see
+pre_filter_rules.toml) and compiled once per process.
+
+Each message is lowercased once. Phrase rules are plain substring scans of the
+lowercased text. Pattern rules name the literal keywords every match contains,
+and a pattern is only searched when all of them occur in the message, so a
+typical message costs a few substring scans instead of a case-insensitive regex
+search per rule. Messages with non-ASCII characters, where case-insensitive
+matching and lowercasing can disagree, are searched with every pattern.
+"""
+
+import os
+import re
+import tomllib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from clients.logging_client import LoggingClient
+from core.graphs.types.guardrail_validation import ValidationResult
+
+logger = LoggingClient.get_logger(__name__)
+
+# rules shipped with the guardrail node
+DEFAULT_RULES_PATH = Path(__file__).with_name("pre_filter_rules.toml")
+
+
+@dataclass(frozen=True)
+class PreFilterRule:
+    """A phrase list or a regex pattern, blocking the message when it fires."""
+
+    name: str
+    reason: str
+    # lowercase substrings, any of which fires the rule
+    phrases: tuple[str, ...] = ()
+    pattern: re.Pattern | None = None
+    # lowercase substrings that all occur in every match of the pattern
+    keywords: tuple[str, ...] = ()
+
+
+class PreFilterEngine:
+    """
+    Compiled pre-filter rules, checked in order against each message.
+
+    Args:
+        rules: The rules, the first that fires determines the result
+        max_length: Characters a message may have, longer ones are blocked
+    """
+
+    def __init__(self, rules: list[PreFilterRule], max_length: int):
+        self.rules = rules
+        self.max_length = max_length
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> "PreFilterEngine":
+        """
+        Build the engine from a parsed rules file, compiling every pattern.
+
+        Raises:
+            ValueError: If a rule has neither phrases nor a pattern, or a pattern does not compile.
+        """
+        rules = []
+        for rule in config.get("rules", []):
+            if not rule.get("phrases") and not rule.get("pattern"):
+                raise ValueError(f"pre-filter rule '{rule.get('name')}' needs phrases or a pattern")
+
+            try:
+                pattern = re.compile(rule["pattern"], re.IGNORECASE) if rule.get("pattern") else None
+            except re.error as e:
+                raise ValueError(f"pre-filter rule '{rule['name']}' has an invalid pattern: {e}") from e
+
+            rules.append(PreFilterRule(
+                name=rule["name"],
+                reason=rule["reason"],
+                phrases=tuple(phrase.lower() for phrase in rule.get("phrases", [])),
+                pattern=pattern,
+                keywords=tuple(keyword.lower() for keyword in rule.get("keywords", [])),
+            ))
+
+        return cls(rules, max_length=config.get("max_length", 2000))
+
+    @classmethod
+    def from_file(cls, path: str | os.PathLike) -> "PreFilterEngine":
+        """Build the engine from a TOML rules file."""
+        with open(path, "rb") as f:
+            engine = cls.from_config(tomllib.load(f))
+
+        logger.info(f"Loaded {len(engine.rules)} pre-filter rules from {path}")
+        return engine
+
+    def validate(self, user_input: str) -> ValidationResult:
+        """
+        Check a message against the length limit and every rule.
+
+        Args:
+            user_input (str): The user input to validate.
+        Returns:
+            ValidationResult, with the name of the rule that fired when blocked
+        """
+        if len(user_input) > self.max_length:
+            return ValidationResult(
+                reasoning=f"Input exceeds maximum allowed length of {self.max_length} characters",
+                blocked=True,
+                rule="max_length",
+            )
+
+        lowered = user_input.lower()
+        gated = lowered.isascii()
+
+        # keyword scans are shared by rules with the same keywords
+        found: dict[str, bool] = {}
+
+        for rule in self.rules:
+            for phrase in rule.phrases:
+                if phrase in lowered:
+                    return ValidationResult(reasoning=rule.reason.format(phrase=phrase), blocked=True, rule=rule.name)
+
+            if rule.pattern is None:
+                continue
+
+            if gated and not all(
+                found[keyword] if keyword in found else found.setdefault(keyword, keyword in lowered)
+                for keyword in rule.keywords
+            ):
+                continue
+
+            if rule.pattern.search(user_input):
+                return ValidationResult(reasoning=rule.reason, blocked=True, rule=rule.name)
+
+        return ValidationResult(
+            reasoning="Input passed pre-filtering checks",
+            blocked=False
+        )
+
+
+def load_pre_filter_engine() -> PreFilterEngine:
+    """Load the rules file named by GUARDRAIL_PRE_FILTER_RULES, or the default rules."""
+    return PreFilterEngine.from_file(os.getenv("GUARDRAIL_PRE_FILTER_RULES") or DEFAULT_RULES_PATH)
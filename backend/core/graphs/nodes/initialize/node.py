@@ -1,10 +1,11 @@
 ##########
 # ### Import Packages
 
-# import typing packages
+# import base and typing packages
+import os
 from typing import Any
 
-from langchain_core.messages import AIMessage, AnyMessage
+from langchain_core.messages import AIMessage, AnyMessage, HumanMessage, RemoveMessage
 from langchain_core.runnables import RunnableConfig
 
 # import logging client
@@ -16,6 +17,9 @@ from core.graphs.types.state import CandidlyAgentState
 # configure logger
 logger = LoggingClient.get_logger(__name__)
 
+# messages kept in the checkpoint, older ones are archived at the start of a turn, 0 keeps all
+MESSAGE_WINDOW_SIZE = int(os.getenv("MESSAGE_WINDOW_SIZE", "40"))
+
 ##########
 # ### Utility Functions
 
@@ -97,6 +101,20 @@ async def create_thread_title(
             logger.info(f'updated title for thread: {thread_id}')
 
 
+# finds where the message window starts, always at a human message so tool calls stay with their results
+def get_message_window_start(messages: list[AnyMessage], window_size: int) -> int:
+    # short threads and disabled windows keep everything
+    if window_size <= 0 or len(messages) <= window_size:
+        return 0
+
+    # walk back from the earliest position that fits the window to the turn it falls in
+    for index in range(len(messages) - window_size, 0, -1):
+        if type(messages[index]) is HumanMessage:
+            return index
+
+    return 0
+
+
 ##########
 # ### Node Logic
 
@@ -111,21 +129,44 @@ async def initialize_node(state: CandidlyAgentState, config: RunnableConfig) ->
 
     Returns:
         dict[str, Any]: A dictionary containing initialization values for the graph state.
-            Currently sets 'react_loop_iterations' to 0.
+            Sets 'react_loop_iterations' to 0 and, for threads longer than the message
+            window, removes the archived messages and advances 'archived_message_count'.
+            Only messages the conversation summary already covers are archived.
     """
     # extract user_id and thread_id from configurable
     user_id = config['configurable']['user_id']
     thread_id = config['configurable']['thread_id']
 
-    # runs a short check to see if title should be created for thread
-    await create_thread_title(
-        messages=state.messages,
-        thread_id=thread_id,
-        user_id=user_id,
-        db_client=config['configurable']['db_client']
-    )
+    db_client: AsyncPostgresClient = config['configurable']['db_client']
+
+    # runs a short check to see if title should be created for thread, archived threads are long past it
+    if state.archived_message_count == 0:
+        await create_thread_title(
+            messages=state.messages,
+            thread_id=thread_id,
+            user_id=user_id,
+            db_client=db_client
+        )
 
     # initialize state_update
     state_update: dict[str, Any] = {"react_loop_iterations": 0}
 
+    # archive messages older than the window so checkpoints only carry recent turns
+    window_start = get_message_window_start(state.messages, MESSAGE_WINDOW_SIZE) if db_client.has_message_archive else 0
+
+    # the agent only sees archived turns through the summary, so never archive past what it covers
+    # both bounds fall on human messages, summarize_node cuts the history there as well
+    summarized = state.conversation_summary.message_count if state.conversation_summary else 0
+    window_start = max(0, min(window_start, summarized - state.archived_message_count))
+    if window_start > 0:
+        archived = state.messages[:window_start]
+        await db_client.archive_thread_messages(
+            thread_id=thread_id,
+            first_seq=state.archived_message_count,
+            messages=archived,
+        )
+
+        state_update["messages"] = [RemoveMessage(id=message.id) for message in archived]
+        state_update["archived_message_count"] = state.archived_message_count + window_start
+
     return state_update
@@ -5,12 +5,16 @@ from langgraph.types import Command
 
 from core.graphs.types.state import CandidlyAgentState
 from core.graphs.utils.model import get_safe_response_model
+from core.graphs.utils.tokens import truncate_text_to_tokens
 from core.prompts.loader import render_template
 from core.graphs.nodes.utils.conversation_context import extract_conversation_context
 
 # Import the model for generating safe responses
 model = get_safe_response_model()
 
+# Estimated tokens of the flagged message shown to the model, inputs blocked for length can be very long
+FLAGGED_MESSAGE_MAX_TOKENS = 500
+
 
 async def safe_response_node(state: CandidlyAgentState) -> Command[Literal["__end__"]]:
     """
@@ -28,6 +32,7 @@ async def safe_response_node(state: CandidlyAgentState) -> Command[Literal["__en
     """
     # Extract the flagged message and conversation context
     flagged_message, conversation_context = extract_conversation_context(state.messages, max_human_messages=2)
+    flagged_message = truncate_text_to_tokens(flagged_message, FLAGGED_MESSAGE_MAX_TOKENS)
 
     # Extract guardrail information from state
     assessment = state.guardrail_assessment
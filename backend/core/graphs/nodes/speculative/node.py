@@ -0,0 +1,91 @@
+##########
+# ### Import Packages
+
+# import base and typing packages
+import asyncio
+from typing import Any
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.config import get_stream_writer
+
+# import logging client
+from clients.logging_client import LoggingClient
+from core.graphs.nodes.agents.student_debt.react import react_student_debt_agent
+from core.graphs.nodes.agents.utils.tool_execution import TOOL_EXECUTION_GATE
+from core.graphs.nodes.guardrails.node import input_guardrail_node
+from core.graphs.nodes.safe_response.node import safe_response_node
+from core.graphs.types.guardrail_validation import GuardrailVerdict
+from core.graphs.types.state import CandidlyAgentState
+
+# configure logger
+logger = LoggingClient.get_logger(__name__)
+
+##########
+# ### Utility Functions
+
+# runs the agent until it is done or cancelled, returning only what it adds to the state
+async def run_agent(state: CandidlyAgentState, config: RunnableConfig) -> dict[str, Any]:
+    result = await react_student_debt_agent.ainvoke(state, config)
+
+    # the subgraph returns its whole state, the input messages are already in the parent's
+    known_ids = {message.id for message in state.messages}
+    return {
+        "messages": [message for message in result["messages"] if message.id not in known_ids],
+        "react_loop_iterations": result["react_loop_iterations"],
+    }
+
+
+##########
+# ### Node Logic
+
+async def speculative_response_node(state: CandidlyAgentState, config: RunnableConfig) -> dict[str, Any]:
+    """
+    Starts the student debt agent at the same time as the input guardrail instead of after it.
+
+    The agent's tokens are streamed between a 'pending' and a 'passed' or 'blocked'
+    GuardrailVerdict, and the server holds them back until the verdict arrives (see
+    stream_graph_responses). Tool calls wait for the verdict as well, so nothing the
+    agent does has side effects before the input is validated. On a block the agent
+    is cancelled and the safe response is generated instead.
+
+    Args:
+        state (CandidlyAgentState): The current state of the Candidly agent containing
+            conversation context and agent data.
+        config (RunnableConfig): The run configuration, passed on to the agent.
+
+    Returns:
+        dict[str, Any]: The guardrail assessment together with either the agent's or the
+            safe response's messages.
+    """
+    writer = get_stream_writer()
+    writer(GuardrailVerdict(status="pending"))
+
+    # the agent's tool calls wait for this gate, the model call does not
+    gate = asyncio.Event()
+    agent_config = {**config, "configurable": {**config.get("configurable", {}), TOOL_EXECUTION_GATE: gate}}
+    agent = asyncio.create_task(run_agent(state, agent_config))
+
+    try:
+        guardrail = await input_guardrail_node(state)
+    except BaseException:
+        agent.cancel()
+        raise
+
+    update = dict(guardrail.update)
+
+    if update["guardrail_assessment"].blocked:
+        # cancel before announcing the verdict, so no speculative token is streamed after it
+        agent.cancel()
+        await asyncio.gather(agent, return_exceptions=True)
+        writer(GuardrailVerdict(status="blocked"))
+        logger.info("input blocked, discarded the speculative agent response")
+
+        blocked_state = state.model_copy(update=update)
+        safe_response = await safe_response_node(blocked_state)
+
+        return {**update, **safe_response.update}
+
+    writer(GuardrailVerdict(status="passed"))
+    gate.set()
+
+    return {**update, **await agent}
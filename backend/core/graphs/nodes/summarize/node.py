@@ -0,0 +1,158 @@
+##########
+# ### Import Packages
+
+# import base and typing packages
+import os
+from typing import Any
+
+from langchain_core.messages import AnyMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
+
+# import logging client
+from clients.logging_client import LoggingClient
+from clients.postgres_client import AsyncPostgresClient
+from core.graphs.nodes.agents.utils.conversation_summary import get_unsummarized_messages
+from core.graphs.nodes.utils.conversation_context import parse_message
+from core.graphs.types.conversation_summary import ConversationSummary
+from core.graphs.types.state import CandidlyAgentState
+from core.graphs.utils.model import get_summary_model
+from core.graphs.utils.tokens import estimate_message_tokens, estimate_messages_tokens
+from core.prompts.loader import render_template
+
+# configure logger
+logger = LoggingClient.get_logger(__name__)
+
+# estimated tokens of unsummarized history that trigger a summary update, 0 disables summarization
+SUMMARY_TOKEN_BUDGET = int(os.getenv("SUMMARY_TOKEN_BUDGET", "4000"))
+
+# estimated tokens of the most recent turns that are always sent to the agent verbatim
+SUMMARY_RECENT_TOKENS = int(os.getenv("SUMMARY_RECENT_TOKENS", "1500"))
+
+# characters of each tool result passed to the summary model
+SUMMARY_TOOL_RESULT_CHARS = 500
+
+# archived messages the summary does not cover that are loaded back in, older ones are skipped
+SUMMARY_ARCHIVE_BACKFILL_MESSAGES = 200
+
+# import the small model for summarizing older turns
+model = get_summary_model()
+
+##########
+# ### Utility Functions
+
+# finds where the recent turns start, always at a human message so tool calls stay with their results
+def get_summary_cut(messages: list[AnyMessage], recent_tokens: int) -> int:
+    # walk back until the turns after the cut hold at least recent_tokens
+    tokens = 0
+    for index in range(len(messages) - 1, 0, -1):
+        tokens += estimate_message_tokens(messages[index])
+
+        if tokens >= recent_tokens and type(messages[index]) is HumanMessage:
+            return index
+
+    return 0
+
+
+# formats messages as tagged lines for the summary prompt
+def format_transcript(messages: list[AnyMessage]) -> str:
+    lines = []
+    for message in messages:
+        msg_type, content = parse_message(message)
+
+        # tool results are shown in full to the user, the gist is enough for the summary
+        if isinstance(message, ToolMessage):
+            content = content[:SUMMARY_TOOL_RESULT_CHARS]
+
+        # skip tool call requests without text
+        if content and msg_type != "unknown":
+            lines.append(f"<{msg_type}>{content}</{msg_type}>")
+
+    return "\n".join(lines)
+
+
+##########
+# ### Node Logic
+
+async def summarize_node(state: CandidlyAgentState, config: RunnableConfig) -> dict[str, Any]:
+    """
+    Folds older turns into the rolling conversation summary once history outgrows the token budget.
+
+    Runs alongside the agent, so the small model never delays the response. The
+    summary it writes is used by the agent from the next turn on, together with
+    the turns after it.
+
+    Threads archived before initialize_node waited for the summary can have archived
+    messages the summary never covered, those are loaded back from the archive.
+
+    Args:
+        state (CandidlyAgentState): The current state of the Candidly agent containing
+            conversation context and agent data.
+        config (RunnableConfig): Configuration for the runnable.
+
+    Returns:
+        dict[str, Any]: An empty update while the unsummarized history fits the budget,
+            otherwise the new 'conversation_summary'.
+    """
+    if SUMMARY_TOKEN_BUDGET <= 0:
+        return {}
+
+    # only history the summary does not cover yet counts towards the budget
+    previous = state.conversation_summary
+    summarized_message_count = previous.message_count if previous else 0
+    messages = get_unsummarized_messages(
+        messages=state.messages,
+        archived_message_count=state.archived_message_count,
+        summarized_message_count=summarized_message_count,
+    )
+
+    # archived messages past the summary are part of the unsummarized history as well
+    if summarized_message_count < state.archived_message_count:
+        db_client: AsyncPostgresClient = config['configurable']['db_client']
+        try:
+            page = await db_client.list_thread_messages(
+                thread_id=config['configurable']['thread_id'],
+                before=state.archived_message_count,
+                limit=min(state.archived_message_count - summarized_message_count, SUMMARY_ARCHIVE_BACKFILL_MESSAGES),
+            )
+        except Exception:
+            logger.exception("error loading archived messages for the conversation summary")
+            return {}
+
+        messages = page.messages + messages
+    if estimate_messages_tokens(messages) <= SUMMARY_TOKEN_BUDGET:
+        return {}
+
+    cut = get_summary_cut(messages, SUMMARY_RECENT_TOKENS)
+    if cut == 0:
+        return {}
+
+    # blocked messages never reach the agent, so they stay out of the summary as well
+    folded = [message for message in messages[:cut] if message.id not in state.blocked_message_ids]
+
+    # load the system role and prompt templates
+    system_role = render_template("candidly/conversation_summary_role.j2", {}).strip()
+    prompt = render_template("candidly/conversation_summary_prompt.j2", {
+        "previous_summary": previous.text if previous else None,
+        "transcript": format_transcript(folded),
+    }).strip()
+
+    # a failed update is retried on the next turn, the agent keeps the previous summary meanwhile
+    try:
+        response = await model.ainvoke([
+            SystemMessage(content=system_role),
+            HumanMessage(content=prompt),
+        ])
+        summary = response.text().strip()
+
+    except Exception:
+        logger.exception("error updating conversation summary")
+        return {}
+
+    if not summary:
+        return {}
+
+    # positions count from the start of the thread, including archived messages, loaded ones end at the archive's end
+    message_count = state.archived_message_count + len(state.messages) - len(messages) + cut
+    logger.info(f"summarized {len(folded)} messages, {message_count} messages now covered by the summary")
+
+    return {"conversation_summary": ConversationSummary(text=summary, message_count=message_count)}
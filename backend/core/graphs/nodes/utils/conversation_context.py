@@ -5,11 +5,20 @@ This module provides shared functionality for parsing messages and extracting co
 context that can be used across different nodes in the graph.
 """
 
+import os
 from typing import Any, Tuple
 
 from langchain_core.messages import HumanMessage, SystemMessage, AIMessage, ToolMessage
 from langchain_core.messages import AnyMessage
 
+from core.graphs.utils.tokens import estimate_text_tokens, truncate_text_to_tokens
+
+# Estimated token budget for the previous discussion given to the guardrail and safe-response models
+CONTEXT_MAX_TOKENS = int(os.getenv("GUARDRAIL_CONTEXT_MAX_TOKENS", "1000"))
+
+# Estimated tokens kept of each tool result in the context
+CONTEXT_TOOL_RESULT_TOKENS = 100
+
 
 def parse_message(msg: AnyMessage) -> Tuple[str, str]:
     """Extract content from a message, handling different message types.
@@ -44,13 +53,21 @@ def parse_message(msg: AnyMessage) -> Tuple[str, str]:
     return msg_type, content.strip()
 
 
-def extract_conversation_context(messages: list[AnyMessage], max_human_messages: int = 2) -> Tuple[str, str]:
+def extract_conversation_context(
+    messages: list[AnyMessage],
+    max_human_messages: int = 2,
+    max_context_tokens: int = CONTEXT_MAX_TOKENS,
+) -> Tuple[str, str]:
     """
     Extract the latest human message for analysis and all messages up to and including the previous N human messages for context.
 
+    Context stops at the oldest message that fits max_context_tokens, so older messages are dropped first and
+    a message that only partly fits is truncated. Tool results are always cut down to a short excerpt.
+
     Args:
         messages: List of messages from state.messages
         max_human_messages: Maximum number of previous human messages to include in context (default: 2)
+        max_context_tokens: Estimated token budget for the context (default: GUARDRAIL_CONTEXT_MAX_TOKENS)
 
     Returns:
         Tuple of (latest_human_message, formatted_context)
@@ -63,6 +80,7 @@ def extract_conversation_context(messages: list[AnyMessage], max_human_messages:
     # Build context from previous messages up to and including the previous N human messages
     context_messages = []
     human_message_count = 0
+    context_tokens = 0
 
     # Work backwards through messages (excluding the latest one) until we find max_human_messages human messages
     for msg in reversed(messages[:-1]):
@@ -70,10 +88,19 @@ def extract_conversation_context(messages: list[AnyMessage], max_human_messages:
         msg_type, content = parse_message(msg)
 
         if isinstance(msg, ToolMessage):
-            content = '\n'.join([el for el in content.split('\n') if el.strip() != ''][:5]) + '\n[Details shown to user omitted here for brevity.]'
+            content = '\n'.join([el for el in content.split('\n') if el.strip() != ''][:5])
+            content = truncate_text_to_tokens(content, CONTEXT_TOOL_RESULT_TOKENS) + '\n[Details shown to user omitted here for brevity.]'
+
+        # Truncate the message that exhausts the token budget and stop there
+        if msg_type and content and context_tokens + estimate_text_tokens(content) > max_context_tokens:
+            content = truncate_text_to_tokens(content, max_context_tokens - context_tokens)
+            if content:
+                context_messages.append(f"<{msg_type}>{content}</{msg_type}>")
+            break
 
         # Add to context if we have valid content
         if msg_type and content:
+            context_tokens += estimate_text_tokens(content)
             context_messages.append(f"<{msg_type}>{content}</{msg_type}>")
 
             # Count human messages
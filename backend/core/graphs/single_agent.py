@@ -1,3 +1,5 @@
+import os
+
 from langgraph.graph import END, START, StateGraph
 
 from core.graphs.nodes.agents.student_debt.react import react_student_debt_agent
@@ -5,29 +7,52 @@ from core.graphs.nodes.guardrails.node import input_guardrail_node
 from core.graphs.nodes.initialize.node import initialize_node
 from core.graphs.nodes.merge.node import chat_router, merge_node
 from core.graphs.nodes.safe_response.node import safe_response_node
+from core.graphs.nodes.speculative.node import speculative_response_node
+from core.graphs.nodes.summarize.node import summarize_node
 from core.graphs.types.state import CandidlyAgentState
 
+# start the agent alongside the input guardrail, holding its output back until the verdict
+SPECULATIVE_GUARDRAIL = os.getenv("SPECULATIVE_GUARDRAIL", "false").lower() == "true"
+
 graph = StateGraph(CandidlyAgentState)
 
 graph.add_node("initialize", initialize_node)
-graph.add_node("input_guardrail", input_guardrail_node)
-graph.add_node("merge", merge_node)
-graph.add_node("student_debt_agent", react_student_debt_agent)
-graph.add_node("safe_response", safe_response_node)
+graph.add_node("summarize", summarize_node)
 
 graph.add_edge(START, "initialize")
-graph.add_edge("initialize", "input_guardrail")
 
-graph.add_edge("input_guardrail", "merge")
+if SPECULATIVE_GUARDRAIL:
+    graph.add_node("speculative_response", speculative_response_node)
+
+    graph.add_edge("initialize", "speculative_response")
+    graph.add_edge("speculative_response", END)
+
+    # the latest message is never folded into the summary, so it need not wait for the guardrail
+    graph.add_edge("initialize", "summarize")
+
+else:
+    graph.add_node("input_guardrail", input_guardrail_node)
+    graph.add_node("merge", merge_node)
+    graph.add_node("student_debt_agent", react_student_debt_agent)
+    graph.add_node("safe_response", safe_response_node)
+
+    graph.add_edge("initialize", "input_guardrail")
+
+    graph.add_edge("input_guardrail", "merge")
+
+    graph.add_conditional_edges(
+        "merge",
+        chat_router,
+        {
+            "safe_response": "safe_response",
+            "student_debt_agent": "student_debt_agent"
+        }
+    )
+
+    # summary updates run alongside the response and are used from the next turn
+    graph.add_edge("merge", "summarize")
 
-graph.add_conditional_edges(
-    "merge",
-    chat_router,
-    {
-        "safe_response": "safe_response",
-        "student_debt_agent": "student_debt_agent"
-    }
-)
+    graph.add_edge("safe_response", END)
+    graph.add_edge("student_debt_agent", END)
 
-graph.add_edge("safe_response", END)
-graph.add_edge("student_debt_agent", END)
+graph.add_edge("summarize", END)
@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+
+
+class ConversationSummary(BaseModel):
+    text: str
+    # messages from the start of the thread, archived ones included, that the summary covers
+    message_count: int
+
+
+def keep_latest_summary(
+    current: ConversationSummary | None,
+    update: ConversationSummary | None,
+) -> ConversationSummary | None:
+    """
+    Keep whichever summary covers more of the conversation.
+
+    The agent subgraph hands back the summary it started with in the same step
+    summarize_node writes a newer one, so the older value must not win.
+    """
+    if current is None or update is None:
+        return update or current
+
+    return update if update.message_count >= current.message_count else current
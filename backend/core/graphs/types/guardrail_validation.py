@@ -1,6 +1,15 @@
+from typing import Literal
+
 from pydantic import BaseModel
 
 
 class ValidationResult(BaseModel):
     reasoning: str
     blocked: bool
+    # pre-filter rule that blocked the input, None for the guardrail model's verdicts
+    rule: str | None = None
+
+
+class GuardrailVerdict(BaseModel):
+    # streamed (mode='custom') while the agent answers ahead of the guardrail, see speculative_response_node
+    status: Literal["pending", "passed", "blocked"]
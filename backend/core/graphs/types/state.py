@@ -4,12 +4,19 @@ from langchain_core.messages import AnyMessage
 from langgraph.graph.message import add_messages
 from pydantic import BaseModel, Field
 
+from core.graphs.types.conversation_summary import ConversationSummary, keep_latest_summary
 from core.graphs.types.guardrail_validation import ValidationResult
 
 
 class CandidlyAgentState(BaseModel):
     messages: Annotated[list[AnyMessage], add_messages]
 
+    # -- Older messages live in the thread_messages archive, see initialize_node --
+    archived_message_count: int = 0
+
+    # -- Older turns folded into a rolling summary, see summarize_node --
+    conversation_summary: Annotated[ConversationSummary | None, keep_latest_summary] = None
+
     # -- Needed for our custom react agent --
     react_loop_iterations: int
 
@@ -1,7 +1,13 @@
+import asyncio
 import os
+import time
 
 import dotenv
+import httpx
 from langchain.chat_models import init_chat_model
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.outputs import LLMResult
 
 from clients.logging_client import LoggingClient
 
@@ -19,42 +25,179 @@ PROVIDER_LARGE_MODEL_MAPPING = {
     "openai": "openai:gpt-4.1",
 }
 
-def get_chat_model():
-    """Returns chat model used across the repository to enable easy configuration."""
-    model_card = PROVIDER_LARGE_MODEL_MAPPING[MODEL_PROVIDER]
-    model_name = model_card.split(":")[1]
-    logger.info(f"Using chat model: {model_card}")
+# API endpoint of providers whose models share a pooled HTTP client, opened at startup by warm_up_model_connections
+PROVIDER_WARMUP_URLS = {
+    "openai": os.environ.get("OPENAI_BASE_URL", "https://api.openai.com/v1").rstrip("/") + "/models",
+}
+
+# connect fails fast, read bounds the wait for a response or the next streamed token
+MODEL_CONNECT_TIMEOUT_SECONDS = float(os.getenv("MODEL_CONNECT_TIMEOUT_SECONDS", "5"))
+MODEL_READ_TIMEOUT_SECONDS = float(os.getenv("MODEL_READ_TIMEOUT_SECONDS", "60"))
+
+# connection pool of each provider's HTTP client, per worker process
+MODEL_MAX_CONNECTIONS = int(os.getenv("MODEL_MAX_CONNECTIONS", "100"))
+MODEL_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("MODEL_MAX_KEEPALIVE_CONNECTIONS", "20"))
+MODEL_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("MODEL_KEEPALIVE_EXPIRY_SECONDS", "120"))
+
+# connections opened to each provider during startup, 0 skips the warmup
+MODEL_WARMUP_CONNECTIONS = int(os.getenv("MODEL_WARMUP_CONNECTIONS", "2"))
+
+# models are built once per process and shared by every node that asks for the same role
+_models: dict[str, BaseChatModel] = {}
+
+# one pooled async HTTP client per provider, created before workers fork but only connected inside them
+_http_clients: dict[str, httpx.AsyncClient] = {}
+
+
+class ModelUsageCallbackHandler(BaseCallbackHandler):
+    """Records the token usage of every call to a model, including prompt tokens read from the provider's cache."""
+
+    # counting is cheap, so skip the executor hop async runs would otherwise take
+    run_inline = True
+
+    def __init__(self, role: str):
+        self.role = role
+        self.calls = 0
+        self.input_tokens = 0
+        self.cached_input_tokens = 0
+        self.output_tokens = 0
+
+    def on_llm_end(self, response: LLMResult, **kwargs) -> None:
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if not usage:
+                    continue
+
+                cached = (usage.get("input_token_details") or {}).get("cache_read") or 0
+                self.calls += 1
+                self.input_tokens += usage["input_tokens"]
+                self.cached_input_tokens += cached
+                self.output_tokens += usage["output_tokens"]
+                logger.info(
+                    f"{self.role} model call used {usage['input_tokens']} input tokens "
+                    f"({cached} cached) and {usage['output_tokens']} output tokens"
+                )
+
+    def stats(self) -> dict[str, object]:
+        return {
+            "calls": self.calls,
+            "input_tokens": self.input_tokens,
+            "cached_input_tokens": self.cached_input_tokens,
+            "cached_input_ratio": round(self.cached_input_tokens / self.input_tokens, 4) if self.input_tokens else None,
+            "output_tokens": self.output_tokens,
+        }
+
+
+# token usage of each registered model, reported on /health
+_usage_handlers: dict[str, ModelUsageCallbackHandler] = {}
+
+
+def get_model_timeout() -> httpx.Timeout:
+    """Returns the timeout applied to every model request."""
+    return httpx.Timeout(MODEL_READ_TIMEOUT_SECONDS, connect=MODEL_CONNECT_TIMEOUT_SECONDS)
+
+
+def get_http_client(provider: str) -> httpx.AsyncClient:
+    """Returns the async HTTP client shared by all models of a provider."""
+    if provider not in _http_clients:
+        _http_clients[provider] = httpx.AsyncClient(
+            timeout=get_model_timeout(),
+            limits=httpx.Limits(
+                max_connections=MODEL_MAX_CONNECTIONS,
+                max_keepalive_connections=MODEL_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=MODEL_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+        )
+
+    return _http_clients[provider]
 
-    return init_chat_model(
+
+def get_registered_model(role: str, model_card: str, disable_streaming: bool) -> BaseChatModel:
+    """
+    Returns the model registered for a role, building it on first use.
+
+    Models of a provider listed in PROVIDER_WARMUP_URLS share that provider's HTTP client.
+    """
+    if role in _models:
+        return _models[role]
+
+    provider, model_name = model_card.split(":", 1)
+    logger.info(f"Using {role} model: {model_card}")
+
+    client_kwargs = {"http_async_client": get_http_client(provider)} if provider in PROVIDER_WARMUP_URLS else {}
+    _usage_handlers[role] = ModelUsageCallbackHandler(role)
+    _models[role] = init_chat_model(
         model_card,
         temperature=0,
         max_tokens=None,
-        timeout=None,
+        timeout=get_model_timeout(),
         max_retries=2,
-        disable_streaming=False,
+        disable_streaming=disable_streaming,
         tags=[model_name],
         stream_usage=True,
+        callbacks=[_usage_handlers[role]],
+        **client_kwargs,
     )
 
+    return _models[role]
+
+
+def get_model_usage_stats() -> dict[str, dict[str, object]]:
+    """Returns token usage per model role since the process started."""
+    return {role: handler.stats() for role, handler in _usage_handlers.items()}
+
+
+async def warm_up_model_connections(connections: int = MODEL_WARMUP_CONNECTIONS) -> int:
+    """
+    Opens keep-alive connections to every provider in use, so the first model request
+    after startup does not pay for DNS resolution and the TLS handshake.
+
+    The warmup request is unauthenticated, any HTTP response leaves a reusable connection
+    in the pool. Failures are logged and never stop startup.
+
+    Returns:
+        Number of connections opened.
+    """
+    if connections <= 0:
+        return 0
+
+    async def open_connection(provider: str, client: httpx.AsyncClient) -> bool:
+        try:
+            await client.get(PROVIDER_WARMUP_URLS[provider])
+            return True
+        except httpx.HTTPError as e:
+            logger.warning(f"Could not open a warm connection to {provider}: {e!r}")
+            return False
+
+    started = time.perf_counter()
+    # concurrent requests each need their own connection, so the pool ends up holding all of them
+    opened = await asyncio.gather(*(
+        open_connection(provider, client)
+        for provider, client in _http_clients.items()
+        for _ in range(connections)
+    ))
+
+    logger.info(f"Opened {sum(opened)} model connections in {time.perf_counter() - started:.2f}s")
+    return sum(opened)
+
+
+async def close_model_connections() -> None:
+    """Closes the pooled HTTP clients of all providers."""
+    for client in _http_clients.values():
+        await client.aclose()
+
+
+def get_chat_model():
+    """Returns chat model used across the repository to enable easy configuration."""
+    return get_registered_model("chat", PROVIDER_LARGE_MODEL_MAPPING[MODEL_PROVIDER], disable_streaming=False)
+
 
 def get_summary_model():
     """
     Returns summary model used across the repository to enable easy configuration.
     """
-    model_card = PROVIDER_SMALL_MODEL_MAPPING[MODEL_PROVIDER]
-    model_name = model_card.split(":")[1]
-    logger.info(f"Using summary model: {model_card}")
-
-    return init_chat_model(
-        model_card,
-        temperature=0,
-        max_tokens=None,
-        timeout=None,
-        max_retries=2,
-        disable_streaming=True,
-        tags=[model_name],
-        stream_usage=True,
-    )
+    return get_registered_model("summary", PROVIDER_SMALL_MODEL_MAPPING[MODEL_PROVIDER], disable_streaming=True)
 
 
 def get_guardrail_model():
@@ -62,21 +205,7 @@ def get_guardrail_model():
     Returns guardrail model optimized for fast security validation.
     Uses Claude Haiku for speed and efficiency in input validation.
     """
-    model_card = PROVIDER_SMALL_MODEL_MAPPING[MODEL_PROVIDER]
-    model_name = model_card.split(":")[1]
-    logger.info(f"Using guardrail model: {model_card}")
-
-
-    return init_chat_model(
-        model_card,
-        temperature=0,
-        max_tokens=None,
-        timeout=None,
-        max_retries=2,
-        disable_streaming=True,
-        tags=[model_name],
-        stream_usage=True,
-    )
+    return get_registered_model("guardrail", PROVIDER_SMALL_MODEL_MAPPING[MODEL_PROVIDER], disable_streaming=True)
 
 
 def get_safe_response_model():
@@ -84,58 +213,18 @@ def get_safe_response_model():
     Returns safe-response model optimized for fast appropriate responses.
     Uses Claude Haiku for speed and efficiency in response.
     """
-    model_card = PROVIDER_SMALL_MODEL_MAPPING[MODEL_PROVIDER]
-    model_name = model_card.split(":")[1]
-    logger.info(f"Using safe-response model: {model_card}")
-
-
-    return init_chat_model(
-        model_card,
-        temperature=0,
-        max_tokens=None,
-        timeout=None,
-        max_retries=2,
-        disable_streaming=False,
-        tags=[model_name],
-        stream_usage=True,
-    )
+    return get_registered_model("safe-response", PROVIDER_SMALL_MODEL_MAPPING[MODEL_PROVIDER], disable_streaming=False)
 
 
 def get_fast_model():
     """
     Returns fast model used across the repository to enable easy configuration.
     """
-    model_card = PROVIDER_SMALL_MODEL_MAPPING[MODEL_PROVIDER]
-    model_name = model_card.split(":")[1]
-    logger.info(f"Using fast model: {model_card}")
-
-    return init_chat_model(
-        model_card,
-        temperature=0,
-        max_tokens=None,
-        timeout=None,
-        max_retries=2,
-        disable_streaming=True,
-        tags=[model_name],
-        stream_usage=True,
-    )
+    return get_registered_model("fast", PROVIDER_SMALL_MODEL_MAPPING[MODEL_PROVIDER], disable_streaming=True)
 
 
 def get_sql_model():
     """
     Returns SQL model used across the repository to enable easy configuration.
     """
-    model_card = PROVIDER_SMALL_MODEL_MAPPING[MODEL_PROVIDER]
-    model_name = model_card.split(":")[1]
-    logger.info(f"Using SQL model: {model_card}")
-
-    return init_chat_model(
-        model_card,
-        temperature=0,
-        max_tokens=None,
-        timeout=None,
-        max_retries=2,
-        disable_streaming=True,
-        tags=[model_name],
-        stream_usage=True,
-    )
+    return get_registered_model("SQL", PROVIDER_SMALL_MODEL_MAPPING[MODEL_PROVIDER], disable_streaming=True)
@@ -0,0 +1,119 @@
+"""
+Offline token estimation for prompt budgeting.
+
+Splits text the way GPT-style BPE tokenizers pre-tokenize it (words with their
+leading space, digit groups of up to three, punctuation runs, whitespace runs)
+and charges each piece what a BPE vocabulary typically spends on it. Long
+words and symbol-heavy text such as JSON are charged more than the flat four
+characters per token rule. Letters outside the Latin script (CJK, Cyrillic,
+Arabic, ...) are charged a token each, since their words are rarely single
+tokens and scripts without spaces form one piece per sentence. Estimates err
+on the high side, so a prompt trimmed to a budget stays within it without
+downloading a tokenizer.
+"""
+
+import json
+import math
+import re
+from functools import lru_cache
+
+from langchain_core.messages import AIMessage, BaseMessage
+
+# role markers and separators the chat format adds around every message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# characters of a word that fit in one token, and of a punctuation run
+WORD_CHARS_PER_TOKEN = 7
+SYMBOL_CHARS_PER_TOKEN = 2
+
+# last code point of the Latin Extended-B block, letters after it are charged a token each
+LATIN_LAST_CHAR = "\u024f"
+
+# pre-tokenization pieces: contractions, words, digit groups, symbol runs, whitespace runs
+_PIECE_PATTERN = re.compile(r"'(?:[sdmt]|ll|ve|re)| ?[^\W\d_]+| ?\d{1,3}| ?(?:[^\s\w]|_)+|\s+")
+
+
+def _piece_tokens(piece: str) -> int:
+    """Estimate the tokens of one pre-tokenized piece."""
+    stripped = piece.lstrip(" ")
+    if not stripped or stripped.isspace() or stripped.isdigit() or stripped.startswith("'"):
+        return 1
+
+    if stripped[0].isalpha():
+        if stripped.isascii():
+            return math.ceil(len(stripped) / WORD_CHARS_PER_TOKEN)
+
+        latin_chars = sum(1 for char in stripped if char <= LATIN_LAST_CHAR)
+        return math.ceil(latin_chars / WORD_CHARS_PER_TOKEN) + len(stripped) - latin_chars
+
+    return math.ceil(len(stripped) / SYMBOL_CHARS_PER_TOKEN)
+
+
+@lru_cache(maxsize=4096)
+def estimate_text_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a text.
+
+    Args:
+        text: The text to measure.
+
+    Returns:
+        The estimated token count.
+    """
+    return sum(_piece_tokens(piece) for piece in _PIECE_PATTERN.findall(text))
+
+
+def estimate_message_tokens(message: BaseMessage) -> int:
+    """
+    Estimate the tokens a message takes up in a chat prompt, including tool calls.
+
+    Args:
+        message: The message to measure.
+
+    Returns:
+        The estimated token count.
+    """
+    tokens = MESSAGE_OVERHEAD_TOKENS + estimate_text_tokens(message.text())
+
+    if isinstance(message, AIMessage):
+        for tool_call in message.tool_calls:
+            tokens += estimate_text_tokens(tool_call["name"] + json.dumps(tool_call["args"]))
+
+    return tokens
+
+
+def estimate_messages_tokens(messages: list[BaseMessage]) -> int:
+    """
+    Estimate the tokens a list of messages takes up in a chat prompt.
+
+    Args:
+        messages: The messages to measure.
+
+    Returns:
+        The estimated token count.
+    """
+    return sum(estimate_message_tokens(message) for message in messages)
+
+
+@lru_cache(maxsize=1024)
+def truncate_text_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Cut a text down to its longest prefix of whole pieces within a token budget.
+
+    Args:
+        text: The text to truncate.
+        max_tokens: Maximum estimated tokens to keep.
+
+    Returns:
+        The text itself if it fits, otherwise its truncated prefix.
+    """
+    tokens = 0
+    length = 0
+    for piece in _PIECE_PATTERN.findall(text):
+        tokens += _piece_tokens(piece)
+        if tokens > max_tokens:
+            return text[:length]
+
+        length += len(piece)
+
+    return text
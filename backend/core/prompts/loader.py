@@ -44,3 +44,23 @@ def render_template(
             f"Unexpected error rendering template '{template_name}' with context keys: {list(context.keys())}"
         )
         return fallback
+
+
+def preload_templates() -> int:
+    """
+    Compile every template into the environment's cache.
+
+    Called before worker processes fork so each worker shares the compiled
+    templates instead of parsing them on its first request.
+
+    Returns:
+        int: Number of templates loaded
+    """
+    template_names = env.list_templates(extensions=["j2"])
+
+    for template_name in template_names:
+        env.get_template(template_name)
+
+    logger.info(f"Preloaded {len(template_names)} prompt templates")
+
+    return len(template_names)
@@ -0,0 +1,174 @@
+"""
+Global admission control for graph runs.
+
+Caps the number of graph runs executing at once in a worker so traffic spikes
+queue up in front of the graph instead of exhausting the checkpointer pool and
+the model provider's rate limits at the same moment. Requests beyond the
+concurrency limit wait in a bounded FIFO queue; when the queue is full or a
+request waits too long it is rejected immediately with a Retry-After hint.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Any
+
+from clients.logging_client import LoggingClient
+
+logger = LoggingClient.get_logger(__name__)
+
+# smoothing factor for the moving averages reported on /health
+EWMA_ALPHA = 0.2
+
+
+class AdmissionRejectedError(Exception):
+    """Raised when a run cannot be admitted; carries a Retry-After hint in seconds."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdmissionTicket:
+    """A concurrency slot held for the duration of one graph run."""
+
+    def __init__(self, controller: "AdmissionController", wait_seconds: float):
+        self.wait_seconds = wait_seconds
+        self._controller = controller
+        self._started_at = time.monotonic()
+        self._released = False
+
+    async def release(self) -> None:
+        """Return the slot to the controller. Safe to call more than once."""
+        if self._released:
+            return
+
+        self._released = True
+        self._controller._release(run_seconds=time.monotonic() - self._started_at)
+
+
+class AdmissionController:
+    """Bounded-concurrency gate with a bounded, time-limited wait queue."""
+
+    def __init__(self, max_concurrent_runs: int, max_queue_size: int, queue_timeout: float):
+        """
+        Args:
+            max_concurrent_runs: Graph runs allowed to execute at once.
+            max_queue_size: Requests allowed to wait for a slot before new ones are rejected.
+            queue_timeout: Seconds a request may wait for a slot.
+        """
+        if max_concurrent_runs < 1:
+            raise ValueError("max_concurrent_runs must be at least 1")
+
+        self.max_concurrent_runs = max_concurrent_runs
+        self.max_queue_size = max_queue_size
+        self.queue_timeout = queue_timeout
+
+        self._running = 0
+        self._waiters: deque[asyncio.Future] = deque()
+
+        # counters and moving averages for /health
+        self._admitted = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._avg_wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+        self._avg_run_seconds = 0.0
+
+    async def admit(self) -> AdmissionTicket:
+        """
+        Wait for a run slot.
+
+        Returns:
+            An AdmissionTicket that must be released when the run ends.
+
+        Raises:
+            AdmissionRejectedError: If the queue is full or the wait timed out.
+        """
+        # fast path, a slot is free and nobody is ahead in line
+        if self._running < self.max_concurrent_runs and not self._waiters:
+            self._running += 1
+            return self._issue_ticket(wait_seconds=0.0)
+
+        if len(self._waiters) >= self.max_queue_size:
+            self._rejected += 1
+            raise AdmissionRejectedError("server is at capacity, run queue is full", self.retry_after())
+
+        # queue for a slot handed over by _release
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        enqueued_at = time.monotonic()
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self.queue_timeout)
+
+        except TimeoutError as e:
+            # the slot may have been handed over just as the timeout fired
+            if waiter.done() and not waiter.cancelled():
+                return self._issue_ticket(wait_seconds=time.monotonic() - enqueued_at)
+
+            waiter.cancel()
+            self._remove_waiter(waiter)
+            self._timed_out += 1
+            raise AdmissionRejectedError("timed out waiting for a run slot", self.retry_after()) from e
+
+        except asyncio.CancelledError:
+            # pass an already handed over slot on to the next waiter
+            if waiter.done() and not waiter.cancelled():
+                self._release(run_seconds=None)
+            else:
+                waiter.cancel()
+                self._remove_waiter(waiter)
+            raise
+
+        return self._issue_ticket(wait_seconds=time.monotonic() - enqueued_at)
+
+    def retry_after(self) -> int:
+        """Estimate in whole seconds when a rejected request should retry."""
+        queued_runs = len(self._waiters) + 1
+        drain_seconds = self._avg_run_seconds * queued_runs / self.max_concurrent_runs
+        return max(1, math.ceil(drain_seconds))
+
+    def stats(self) -> dict[str, Any]:
+        """Return queue depth, wait times and counters for health reporting."""
+        return {
+            "running": self._running,
+            "max_concurrent_runs": self.max_concurrent_runs,
+            "queue_depth": len(self._waiters),
+            "max_queue_size": self.max_queue_size,
+            "avg_wait_ms": round(self._avg_wait_seconds * 1000, 1),
+            "max_wait_ms": round(self._max_wait_seconds * 1000, 1),
+            "avg_run_ms": round(self._avg_run_seconds * 1000, 1),
+            "admitted": self._admitted,
+            "rejected": self._rejected,
+            "timed_out": self._timed_out,
+        }
+
+    def _issue_ticket(self, wait_seconds: float) -> AdmissionTicket:
+        """Record admission metrics and hand out a ticket for a slot already taken."""
+        self._admitted += 1
+        self._avg_wait_seconds += EWMA_ALPHA * (wait_seconds - self._avg_wait_seconds)
+        self._max_wait_seconds = max(self._max_wait_seconds, wait_seconds)
+
+        return AdmissionTicket(controller=self, wait_seconds=wait_seconds)
+
+    def _release(self, run_seconds: float | None) -> None:
+        """Hand the slot to the next live waiter, or free it."""
+        if run_seconds is not None:
+            self._avg_run_seconds += EWMA_ALPHA * (run_seconds - self._avg_run_seconds)
+
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+        self._running -= 1
+
+    def _remove_waiter(self, waiter: asyncio.Future) -> None:
+        """Drop a waiter that gave up from the queue."""
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
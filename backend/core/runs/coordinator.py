@@ -0,0 +1,719 @@
+"""
+Per-thread run coordination.
+
+Ensures only one graph run executes per thread at a time so concurrent chat
+requests (e.g. frontend retries) never race on the same checkpoint or pay for
+the same LLM call twice. Within a worker an asyncio lock keyed by thread_id
+serializes runs; across uvicorn workers a Postgres advisory lock held on a
+checkpointer pool connection does the same.
+
+Runs execute in background tasks that publish their SSE events to a per-run
+replay buffer, so a client that drops mid-answer can resume the stream with
+`Last-Event-ID` instead of running the graph again. Events are also copied to
+Postgres in batches so the stream can be resumed from any worker. A run whose
+clients have all disconnected is cancelled after a short grace period so
+abandoned answers stop consuming tokens.
+"""
+
+import asyncio
+import time
+import uuid
+from collections import deque
+from enum import Enum
+from itertools import islice
+from typing import AsyncGenerator, AsyncIterator, Awaitable, Callable
+
+from clients.logging_client import LoggingClient
+from clients.postgres_client import AsyncPostgresClient
+from clients.postgres_client.queries.locks import ThreadLockHandle
+from core.checkpoints.cache import CachingCheckpointSaver
+from utils.cache import TTLCache
+from utils.sse import encode_sse_event
+
+logger = LoggingClient.get_logger(__name__)
+
+# finished runs kept in memory for resumption, beyond this the oldest are dropped
+MAX_RETAINED_RUNS = 256
+
+# interval between reads when following a run that executes on another worker
+RUN_EVENT_POLL_INTERVAL_SECONDS = 0.25
+
+# page size when reading persisted run events
+RUN_EVENT_PAGE_SIZE = 500
+
+# pause before re-opening the cross-worker cancel listener after a failure
+CANCEL_LISTENER_RETRY_SECONDS = 5.0
+
+
+class ConflictPolicy(str, Enum):
+    """What a chat request does when its thread already has a run in progress."""
+
+    # wait for the running turn to finish, then run
+    QUEUE = "queue"
+    # fail fast with a 409
+    REJECT = "reject"
+    # attach to the running turn's event stream instead of starting a new one
+    JOIN = "join"
+
+
+class CancelOutcome(str, Enum):
+    """Result of a request to cancel a thread's run."""
+
+    # the run executed on this worker and has stopped
+    CANCELLED = "cancelled"
+    # the run executes on another worker, which has been asked to stop it
+    CANCEL_REQUESTED = "cancel_requested"
+    # no run was in progress
+    NOT_RUNNING = "not_running"
+
+
+class ThreadBusyError(Exception):
+    """Raised when a thread already has a run in progress and the caller will not wait."""
+
+
+class RunStream:
+    """
+    In-process fan-out of one run's SSE events.
+
+    Events get monotonically increasing ids and are kept in a bounded ring
+    buffer, so late joiners and clients reconnecting with `Last-Event-ID`
+    replay what they missed before following the run live.
+    """
+
+    def __init__(self, thread_id: str, run_id: str, buffer_size: int):
+        self.thread_id = thread_id
+        self.run_id = run_id
+        self._events: deque[tuple[int, bytes]] = deque(maxlen=buffer_size)
+        self._last_event_id = 0
+        self._closed = False
+        self._changed = asyncio.Condition()
+
+        # live subscribers, a run nobody listens to can be cancelled
+        self._subscribers = 0
+        self._subscribers_changed = asyncio.Event()
+
+    @property
+    def first_event_id(self) -> int:
+        """Id of the oldest event still in the buffer."""
+        return self._events[0][0] if self._events else self._last_event_id + 1
+
+    async def publish(self, frame: bytes) -> int:
+        """
+        Assign the next event id to an SSE frame, buffer it and wake every subscriber.
+
+        Args:
+            frame: An encoded SSE frame.
+
+        Returns:
+            The event id.
+        """
+        async with self._changed:
+            self._last_event_id += 1
+            self._events.append((self._last_event_id, b"id: %d\n" % self._last_event_id + frame))
+            self._changed.notify_all()
+
+        return self._last_event_id
+
+    async def close(self) -> None:
+        """Mark the run as finished so subscribers drain and stop."""
+        async with self._changed:
+            self._closed = True
+            self._changed.notify_all()
+
+    async def read_batches(self, last_event_id: int = 0) -> AsyncGenerator[list[tuple[int, bytes]], None]:
+        """
+        Yield buffered events after `last_event_id`, then follow the run live.
+
+        Events published while the reader is busy arrive together as one batch.
+
+        Args:
+            last_event_id: Id of the last event the reader already has.
+
+        Yields:
+            Lists of (event id, SSE frame) pairs in id order.
+        """
+        cursor = last_event_id
+
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: cursor < self._last_event_id or self._closed)
+                batch = self._events_after(cursor)
+                closed = self._closed
+
+            if batch:
+                if batch[0][0] > cursor + 1:
+                    logger.warning(
+                        "run %s events %d-%d fell out of the replay buffer",
+                        self.run_id, cursor + 1, batch[0][0] - 1,
+                    )
+
+                cursor = batch[-1][0]
+                yield batch
+
+            if closed and cursor >= self._last_event_id:
+                return
+
+    async def subscribe(self, last_event_id: int = 0) -> AsyncGenerator[bytes, None]:
+        """
+        Yield every event of the run after `last_event_id`, then follow it live.
+
+        Args:
+            last_event_id: Id of the last event the client already has.
+
+        Yields:
+            Encoded SSE frames, joined when several are ready at once.
+        """
+        self._subscribers += 1
+        self._subscribers_changed.set()
+
+        try:
+            async for batch in self.read_batches(last_event_id):
+                yield b"".join(frame for _, frame in batch)
+        finally:
+            self._subscribers -= 1
+            self._subscribers_changed.set()
+
+    async def wait_abandoned(self, grace_seconds: float) -> None:
+        """
+        Return once the stream has had no subscribers for `grace_seconds`.
+
+        The timer runs from the start, so a run whose client never subscribes
+        (it disconnected before the response started) is abandoned as well.
+
+        Args:
+            grace_seconds: How long a client has to connect or reconnect before the run counts as abandoned.
+        """
+        while True:
+            self._subscribers_changed.clear()
+
+            if self._subscribers == 0:
+                try:
+                    await asyncio.wait_for(self._subscribers_changed.wait(), timeout=grace_seconds)
+                except TimeoutError:
+                    if self._subscribers == 0:
+                        return
+            else:
+                await self._subscribers_changed.wait()
+
+    def _events_after(self, cursor: int) -> list[tuple[int, bytes]]:
+        """Buffered events with ids greater than `cursor`."""
+        offset = max(0, cursor + 1 - self.first_event_id)
+        return list(islice(self._events, offset, None))
+
+
+class RunLease:
+    """Exclusive right to run the graph on a thread, released exactly once."""
+
+    def __init__(
+        self,
+        coordinator: "ThreadRunCoordinator",
+        thread_id: str,
+        lock_handle: ThreadLockHandle,
+        buffer_size: int,
+        run_id: str | None = None,
+        stream: RunStream | None = None,
+    ):
+        self.thread_id = thread_id
+        self.run_id = run_id or str(uuid.uuid4())
+        self.stream = stream or RunStream(thread_id, self.run_id, buffer_size)
+        # "completed", "failed" or "cancelled" once the run has ended
+        self.outcome: str | None = None
+        self._coordinator = coordinator
+        self._lock_handle = lock_handle
+        self._released = False
+        self._task: asyncio.Task | None = None
+
+    def start(
+        self,
+        events: AsyncIterator[bytes],
+        *releases: Callable[[], Awaitable[None]],
+        cancel_when_abandoned: bool = True,
+    ) -> RunStream:
+        """
+        Run the graph in the background, publishing its events to the lease's stream.
+
+        The run is not tied to any HTTP response, so clients can drop and resume
+        without re-running the graph. The lease and `releases` are freed when the
+        run finishes.
+
+        Args:
+            events: The SSE event stream of the graph run.
+            *releases: Async callbacks releasing other resources held by the run.
+            cancel_when_abandoned: Cancel the run once no client has been
+                subscribed for the coordinator's grace period, counted from the start.
+
+        Returns:
+            The stream to subscribe to.
+        """
+        self._task = self._coordinator._start_run(self, events, releases, cancel_when_abandoned)
+        return self.stream
+
+    async def cancel(self) -> None:
+        """Cancel the run and wait until its checkpoint is settled and the lease released."""
+        if self._task is None:
+            await self.release()
+            return
+
+        self._task.cancel()
+        await asyncio.wait({self._task})
+
+    async def wait(self) -> str:
+        """
+        Wait for a started run to end.
+
+        Returns:
+            The run's outcome: "completed", "failed" or "cancelled".
+        """
+        if self._task is not None:
+            await asyncio.wait({self._task})
+
+        return self.outcome or "cancelled"
+
+    async def release(self) -> None:
+        """Release the thread for the next run. Safe to call more than once."""
+        if self._released:
+            return
+
+        self._released = True
+        await self.stream.close()
+        await self._coordinator._release(self)
+
+
+class ThreadRunCoordinator:
+    """Serializes graph runs per thread within and across worker processes."""
+
+    def __init__(
+        self,
+        db_client: AsyncPostgresClient,
+        wait_timeout: float = 30.0,
+        buffer_size: int = 1024,
+        retention_seconds: float = 300.0,
+        idle_timeout: float = 120.0,
+        abandon_grace: float = 10.0,
+        checkpoint_cache: CachingCheckpointSaver | None = None,
+    ):
+        """
+        Args:
+            db_client: Postgres client providing cross-worker advisory locks and the run event store.
+            wait_timeout: Seconds a queued request waits before giving up.
+            buffer_size: Events kept in each run's replay buffer.
+            retention_seconds: Seconds a finished run stays resumable.
+            idle_timeout: Seconds a resumed stream following another worker's run
+                waits for new events before giving up.
+            abandon_grace: Seconds a run keeps going without any client, from its
+                start or its last client's disconnect, giving the client time to resume.
+            checkpoint_cache: Checkpoint cache the graph reads through, verified for each thread on acquire.
+        """
+        self._db_client = db_client
+        self._wait_timeout = wait_timeout
+        self._buffer_size = buffer_size
+        self._retention_seconds = retention_seconds
+        self._idle_timeout = idle_timeout
+        self._abandon_grace = abandon_grace
+        self._checkpoint_cache = checkpoint_cache
+
+        # thread_id -> lock, removed once no request holds or waits on it
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._lock_users: dict[str, int] = {}
+
+        # thread_id -> lease of the run currently executing in this worker
+        self._active: dict[str, RunLease] = {}
+
+        # run_id -> stream, for runs executing here or finished within the retention window
+        self._runs: dict[str, RunStream] = {}
+        self._finished_runs: TTLCache[str, RunStream] = TTLCache(
+            max_entries=MAX_RETAINED_RUNS,
+            ttl_seconds=retention_seconds,
+        )
+
+        # background run and persistence tasks, kept referenced until done
+        self._tasks: set[asyncio.Task] = set()
+        self._last_pruned_at = 0.0
+
+    def get_active_stream(self, thread_id: str) -> RunStream | None:
+        """
+        Return the stream of a run in progress on this worker, if any.
+
+        Args:
+            thread_id: The ID of the thread.
+
+        Returns:
+            The active RunStream, or None when no run is executing here.
+        """
+        lease = self._active.get(thread_id)
+        return lease.stream if lease is not None else None
+
+    def register_run(self, thread_id: str, run_id: str) -> RunStream:
+        """
+        Create the stream of a queued run so clients can subscribe before it starts.
+
+        Args:
+            thread_id: The ID of the thread.
+            run_id: The ID of the queued run.
+
+        Returns:
+            The run's stream, picked up by `acquire` when the run starts.
+        """
+        stream = RunStream(thread_id, run_id, self._buffer_size)
+        self._runs[run_id] = stream
+        return stream
+
+    async def close_run(self, thread_id: str, run_id: str, final_event: dict) -> None:
+        """
+        End a run that will not execute, e.g. a cancelled or failed queued run.
+
+        The final event reaches current subscribers, later resumes and, through
+        the run event store, subscribers on other workers.
+
+        Args:
+            thread_id: The ID of the thread.
+            run_id: The ID of the run.
+            final_event: The last event of the run's stream.
+        """
+        stream = self._runs.pop(run_id, None) or RunStream(thread_id, run_id, self._buffer_size)
+
+        if self._db_client.has_run_event_store:
+            self._spawn(self._persist_run(stream))
+
+        await stream.publish(encode_sse_event(final_event))
+        await stream.close()
+        self._finished_runs.set(run_id, stream)
+
+    async def acquire(self, thread_id: str, wait: bool = True, run_id: str | None = None) -> RunLease:
+        """
+        Take the run lease for a thread.
+
+        Args:
+            thread_id: The ID of the thread.
+            wait: Queue behind a running turn for up to `wait_timeout` seconds.
+                When False, fail immediately if the thread is busy.
+            run_id: ID of a queued run taking the lease, a new ID is generated when None.
+
+        Returns:
+            A RunLease that must be started or released.
+
+        Raises:
+            ThreadBusyError: If the thread is busy and the lease could not be taken.
+        """
+        timeout = self._wait_timeout if wait else 0
+        deadline = time.monotonic() + timeout
+
+        lock = self._locks.setdefault(thread_id, asyncio.Lock())
+        self._lock_users[thread_id] = self._lock_users.get(thread_id, 0) + 1
+
+        try:
+            # in-process lock first so only one request per worker hits postgres
+            if lock.locked() and not wait:
+                raise ThreadBusyError(f"thread {thread_id} already has a run in progress")
+
+            try:
+                await asyncio.wait_for(lock.acquire(), timeout=timeout if wait else None)
+            except TimeoutError as e:
+                raise ThreadBusyError(f"timed out waiting for run on thread {thread_id}") from e
+
+            # then the advisory lock, in case another worker is running this thread
+            try:
+                remaining = max(0.0, deadline - time.monotonic())
+                lock_handle = await self._db_client.acquire_thread_lock(thread_id, timeout=remaining)
+            except BaseException:
+                lock.release()
+                raise
+
+            if lock_handle is None:
+                lock.release()
+                raise ThreadBusyError(f"thread {thread_id} has a run in progress on another worker")
+
+            # the previous turn may have ended on another worker whose cache invalidation is still in flight
+            if self._checkpoint_cache is not None:
+                try:
+                    await self._checkpoint_cache.verify_latest(thread_id)
+                except BaseException:
+                    await self._db_client.release_thread_lock(lock_handle)
+                    lock.release()
+                    raise
+
+        except BaseException:
+            self._discard_lock_user(thread_id)
+            raise
+
+        lease = RunLease(
+            coordinator=self,
+            thread_id=thread_id,
+            lock_handle=lock_handle,
+            buffer_size=self._buffer_size,
+            run_id=run_id,
+            stream=self._runs.get(run_id) if run_id else None,
+        )
+        self._active[thread_id] = lease
+        self._runs[lease.run_id] = lease.stream
+
+        logger.debug("acquired run lease %s for thread %s", lease.run_id, thread_id)
+
+        return lease
+
+    async def resume(self, thread_id: str, run_id: str, last_event_id: int = 0) -> AsyncGenerator[bytes, None] | None:
+        """
+        Resume a run's event stream after the last event a client received.
+
+        Runs executing or recently finished on this worker are replayed from
+        memory; others are read from the Postgres run event store.
+
+        Args:
+            thread_id: The ID of the thread the run belongs to.
+            run_id: The ID of the run.
+            last_event_id: Id of the last event the client received (the `Last-Event-ID` header).
+
+        Returns:
+            An SSE event stream, or None if the run is unknown or expired.
+        """
+        stream = self._runs.get(run_id) or self._finished_runs.get(run_id)
+        if stream is not None and stream.thread_id == thread_id:
+            return self._replay_local(stream, last_event_id)
+
+        if self._db_client.has_run_event_store and (
+            await self._db_client.run_events_exist(run_id, thread_id)
+            or await self._db_client.is_run_pending(run_id, thread_id)
+        ):
+            return self._follow_persisted(thread_id, run_id, last_event_id)
+
+        return None
+
+    async def cancel(self, thread_id: str) -> CancelOutcome:
+        """
+        Cancel the run in progress on a thread, wherever it executes.
+
+        Runs on this worker are cancelled and awaited so their checkpoint is
+        settled on return; runs on another worker are signalled through Postgres.
+
+        Args:
+            thread_id: The ID of the thread.
+
+        Returns:
+            What happened to the thread's run.
+        """
+        lease = self._active.get(thread_id)
+        if lease is not None:
+            logger.info("cancelling run %s on thread %s", lease.run_id, thread_id)
+            await lease.cancel()
+            return CancelOutcome.CANCELLED
+
+        if await self._db_client.is_thread_locked(thread_id):
+            await self._db_client.notify_thread_run_cancel(thread_id)
+            return CancelOutcome.CANCEL_REQUESTED
+
+        return CancelOutcome.NOT_RUNNING
+
+    def start(self) -> None:
+        """Start listening for cancellation requests sent by other workers."""
+        if self._db_client.has_run_event_store:
+            self._spawn(self._listen_for_cancels())
+
+    async def shutdown(self) -> None:
+        """Cancel runs still executing and wait for their cleanup."""
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _start_run(
+        self,
+        lease: RunLease,
+        events: AsyncIterator[bytes],
+        releases: tuple[Callable[[], Awaitable[None]], ...],
+        cancel_when_abandoned: bool,
+    ) -> asyncio.Task:
+        """Spawn the background tasks that drive, watch and persist a run."""
+        run_task = self._spawn(self._drive_run(lease, events, releases))
+
+        if cancel_when_abandoned:
+            self._spawn(self._cancel_when_abandoned(lease, run_task))
+
+        if self._db_client.has_run_event_store:
+            self._spawn(self._persist_run(lease.stream))
+
+        return run_task
+
+    def _spawn(self, coro) -> asyncio.Task:
+        """Run a coroutine as a task that stays referenced until it completes."""
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _cancel_when_abandoned(self, lease: RunLease, run_task: asyncio.Task) -> None:
+        """Cancel a run once no client has been connected to it for the grace period."""
+        abandoned = asyncio.ensure_future(lease.stream.wait_abandoned(self._abandon_grace))
+
+        try:
+            await asyncio.wait({abandoned, run_task}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            abandoned.cancel()
+
+        if abandoned.done() and not abandoned.cancelled() and not run_task.done():
+            logger.info("cancelling abandoned run %s on thread %s", lease.run_id, lease.thread_id)
+            run_task.cancel()
+
+    async def _listen_for_cancels(self) -> None:
+        """Cancel local runs named by other workers, reconnecting if the listener drops."""
+        while True:
+            try:
+                async for thread_id in self._db_client.listen_thread_run_cancels():
+                    lease = self._active.get(thread_id)
+                    if lease is not None:
+                        logger.info("cancelling run %s on thread %s at another worker's request", lease.run_id, thread_id)
+                        self._spawn(lease.cancel())
+
+            except Exception:
+                logger.exception("run cancel listener failed, reconnecting")
+
+            await asyncio.sleep(CANCEL_LISTENER_RETRY_SECONDS)
+
+    async def _drive_run(
+        self,
+        lease: RunLease,
+        events: AsyncIterator[bytes],
+        releases: tuple[Callable[[], Awaitable[None]], ...],
+    ) -> None:
+        """Publish a run's events, then free everything the run holds."""
+        try:
+            async for event in events:
+                await lease.stream.publish(event)
+
+            lease.outcome = "completed"
+
+        except asyncio.CancelledError:
+            lease.outcome = "cancelled"
+            # tell anyone still listening why the stream ends early
+            await lease.stream.publish(encode_sse_event({"type": "cancelled"}))
+            raise
+
+        except Exception:
+            lease.outcome = "failed"
+            logger.exception("run %s on thread %s failed", lease.run_id, lease.thread_id)
+
+        finally:
+            for release in releases:
+                try:
+                    await release()
+                except Exception:
+                    logger.exception("error releasing resources of run %s", lease.run_id)
+
+            await lease.release()
+
+    async def _persist_run(self, stream: RunStream) -> None:
+        """Copy a run's events to Postgres in batches so other workers can resume it."""
+        await self._prune_run_events()
+
+        try:
+            async for batch in stream.read_batches():
+                await self._db_client.append_run_events(stream.run_id, stream.thread_id, batch)
+
+            await self._db_client.finish_run_events(stream.run_id)
+
+        except Exception:
+            logger.exception("error persisting events of run %s", stream.run_id)
+
+    async def _prune_run_events(self) -> None:
+        """Delete expired run events, at most once per retention window per worker."""
+        now = time.monotonic()
+        if now - self._last_pruned_at < self._retention_seconds:
+            return
+
+        self._last_pruned_at = now
+
+        try:
+            deleted = await self._db_client.delete_expired_run_events(self._retention_seconds)
+            logger.debug("pruned %d expired run events", deleted)
+        except Exception:
+            logger.exception("error pruning expired run events")
+
+    async def _replay_local(self, stream: RunStream, last_event_id: int) -> AsyncGenerator[bytes, None]:
+        """Replay a run held in memory, filling any gap before the buffer from Postgres."""
+        cursor = last_event_id
+
+        # events already evicted from the ring buffer may still be in the event store
+        if stream.first_event_id > cursor + 1 and self._db_client.has_run_event_store:
+            async for event_id, data in self._read_persisted(stream.thread_id, stream.run_id, cursor):
+                if event_id >= stream.first_event_id:
+                    break
+                cursor = event_id
+                yield data
+
+        async for frames in stream.subscribe(cursor):
+            yield frames
+
+    async def _follow_persisted(self, thread_id: str, run_id: str, last_event_id: int) -> AsyncGenerator[bytes, None]:
+        """Follow a run executing on another worker through the Postgres event store."""
+        cursor = last_event_id
+        idle_deadline = time.monotonic() + self._idle_timeout
+
+        while True:
+            # re-read the last delivered event too, its is_final flag may have been set since
+            rows = await self._db_client.get_run_events(
+                run_id, thread_id, after_event_id=max(0, cursor - 1), limit=RUN_EVENT_PAGE_SIZE
+            )
+
+            new_rows = [row for row in rows if row["event_id"] > cursor]
+            if new_rows:
+                cursor = new_rows[-1]["event_id"]
+                idle_deadline = time.monotonic() + self._idle_timeout
+                yield b"".join(bytes(row["data"]) for row in new_rows)
+
+            if rows and rows[-1]["is_final"]:
+                return
+
+            if len(rows) < RUN_EVENT_PAGE_SIZE:
+                if time.monotonic() >= idle_deadline:
+                    logger.warning("stopped following run %s, no events for %.0fs", run_id, self._idle_timeout)
+                    return
+
+                await asyncio.sleep(RUN_EVENT_POLL_INTERVAL_SECONDS)
+
+    async def _read_persisted(
+        self, thread_id: str, run_id: str, after_event_id: int
+    ) -> AsyncGenerator[tuple[int, bytes], None]:
+        """Page through a run's persisted events once."""
+        cursor = after_event_id
+
+        while True:
+            rows = await self._db_client.get_run_events(
+                run_id, thread_id, after_event_id=cursor, limit=RUN_EVENT_PAGE_SIZE
+            )
+
+            for row in rows:
+                cursor = row["event_id"]
+                yield cursor, bytes(row["data"])
+
+            if len(rows) < RUN_EVENT_PAGE_SIZE:
+                return
+
+    async def _release(self, lease: RunLease) -> None:
+        """Release both lock levels held by a lease and keep its stream resumable."""
+        thread_id = lease.thread_id
+
+        if self._active.get(thread_id) is lease:
+            del self._active[thread_id]
+
+        self._runs.pop(lease.run_id, None)
+        self._finished_runs.set(lease.run_id, lease.stream)
+
+        try:
+            await self._db_client.release_thread_lock(lease._lock_handle)
+        except Exception:
+            logger.exception("error releasing advisory lock for thread %s", thread_id)
+        finally:
+            self._locks[thread_id].release()
+            self._discard_lock_user(thread_id)
+
+        logger.debug("released run lease %s for thread %s", lease.run_id, thread_id)
+
+    def _discard_lock_user(self, thread_id: str) -> None:
+        """Drop a thread's lock once nothing holds or waits on it, keeping the map bounded."""
+        users = self._lock_users[thread_id] - 1
+
+        if users:
+            self._lock_users[thread_id] = users
+        else:
+            del self._lock_users[thread_id]
+            del self._locks[thread_id]
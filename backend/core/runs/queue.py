@@ -0,0 +1,182 @@
+"""
+Queue of background runs.
+
+Background runs are created by one request and executed later by a worker
+task, so they are described by a serializable RunRequest. With Postgres the
+queue is a table claimed with `FOR UPDATE SKIP LOCKED`, letting any worker
+process pick up any run; in local mode it is an in-process asyncio queue.
+Claimed runs are kept alive by a heartbeat, runs of a worker shutting down
+are put back in the queue, a run whose worker died is retried until it runs
+out of attempts, and finished runs are deleted after a retention period.
+"""
+
+import asyncio
+from typing import Literal
+
+from pydantic import BaseModel
+
+from clients.logging_client import LoggingClient
+from clients.postgres_client import AsyncPostgresClient
+
+logger = LoggingClient.get_logger(__name__)
+
+# runs waiting in the in-process queue before new ones are refused
+LOCAL_QUEUE_MAX_SIZE = 1000
+
+
+class RunQueueFullError(Exception):
+    """Raised when the in-process queue cannot take another run."""
+
+
+class RunRequest(BaseModel):
+    """A background run waiting to be executed."""
+
+    run_id: str
+    thread_id: str
+    user_id: str
+    message: str
+    state_updates: Literal["snapshot", "delta"] = "snapshot"
+
+
+class RunQueue:
+    """FIFO of background runs, backed by Postgres when available."""
+
+    def __init__(
+        self,
+        db_client: AsyncPostgresClient,
+        poll_interval: float = 0.5,
+        stale_after: float = 900.0,
+        max_attempts: int = 3,
+        retention: float = 86400.0,
+    ):
+        """
+        Args:
+            db_client: Postgres client providing the run queue table.
+            poll_interval: Seconds between claim attempts while the Postgres queue is empty.
+            stale_after: Seconds without a heartbeat after which a claimed run is retried.
+            max_attempts: Claims a run gets, a stale run out of attempts is marked failed.
+            retention: Seconds finished runs are kept before they are deleted.
+        """
+        self._db_client = db_client
+        self._poll_interval = poll_interval
+        self._stale_after = stale_after
+        self._max_attempts = max_attempts
+        self._retention = retention
+
+        # run_id -> attempt of the runs claimed from Postgres by this process, kept alive by maintain()
+        self._claimed: dict[str, int] = {}
+
+        # in-process queue for local mode, cancelled runs are dropped from `_queued`
+        self._local: asyncio.Queue[RunRequest] = asyncio.Queue(maxsize=LOCAL_QUEUE_MAX_SIZE)
+        self._queued: dict[str, RunRequest] = {}
+
+    @property
+    def maintenance_interval(self) -> float:
+        """Seconds between heartbeats, short enough that a live run is never seen as stale."""
+        return self._stale_after / 3
+
+    @property
+    def is_local(self) -> bool:
+        """Whether runs stay in this process, so only this process can execute them."""
+        return not self._db_client.has_run_queue
+
+    async def put(self, run: RunRequest) -> None:
+        """
+        Add a run to the queue.
+
+        Raises:
+            RunQueueFullError: If the in-process queue is full.
+        """
+        if self.is_local:
+            try:
+                self._local.put_nowait(run)
+            except asyncio.QueueFull as e:
+                raise RunQueueFullError("background run queue is full") from e
+
+            self._queued[run.run_id] = run
+            return
+
+        await self._db_client.enqueue_run(
+            run_id=run.run_id,
+            thread_id=run.thread_id,
+            user_id=run.user_id,
+            payload={"message": run.message, "state_updates": run.state_updates},
+        )
+
+    async def get(self) -> RunRequest:
+        """Wait for the next run and claim it."""
+        if self.is_local:
+            while True:
+                run = await self._local.get()
+                if self._queued.pop(run.run_id, None) is not None:
+                    return run
+
+        while True:
+            row = await self._db_client.claim_next_run()
+            if row is not None:
+                self._claimed[row["run_id"]] = row["attempts"]
+                return RunRequest(
+                    run_id=row["run_id"],
+                    thread_id=row["thread_id"],
+                    user_id=row["user_id"],
+                    **row["payload"],
+                )
+
+            await asyncio.sleep(self._poll_interval)
+
+    async def complete(self, run_id: str, status: str) -> None:
+        """Record how a claimed run ended."""
+        attempt = self._claimed.pop(run_id, None)
+        if attempt is None:
+            return
+
+        await self._db_client.complete_run(run_id=run_id, attempt=attempt, status=status)
+
+    async def release(self, run_id: str) -> None:
+        """Put a claimed run back in the queue for any worker to execute again, used on shutdown."""
+        attempt = self._claimed.pop(run_id, None)
+        if attempt is None:
+            return
+
+        await self._db_client.release_run(run_id=run_id, attempt=attempt)
+
+    async def maintain(self) -> None:
+        """
+        Heartbeat this process's runs, retry or fail runs whose worker died and delete old finished runs.
+
+        Called every `maintenance_interval` seconds by the worker pool.
+        """
+        if self.is_local:
+            return
+
+        await self._db_client.heartbeat_runs(dict(self._claimed))
+
+        reclaimed = await self._db_client.reclaim_stale_runs(
+            stale_after_seconds=self._stale_after,
+            max_attempts=self._max_attempts,
+        )
+        for run_id, status in reclaimed.items():
+            logger.warning("background run %s stopped heartbeating, marked %s", run_id, status)
+
+        deleted = await self._db_client.delete_finished_runs(retention_seconds=self._retention)
+        if deleted:
+            logger.info("deleted %d finished background runs", deleted)
+
+    async def cancel_queued(self, thread_id: str) -> list[str]:
+        """
+        Drop a thread's runs that have not started yet.
+
+        Returns:
+            IDs of the cancelled runs.
+        """
+        if self.is_local:
+            cancelled = [run_id for run_id, run in self._queued.items() if run.thread_id == thread_id]
+            for run_id in cancelled:
+                del self._queued[run_id]
+            return cancelled
+
+        return await self._db_client.cancel_queued_runs(thread_id)
+
+    def depth(self) -> int:
+        """Runs waiting in the in-process queue."""
+        return len(self._queued)
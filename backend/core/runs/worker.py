@@ -0,0 +1,134 @@
+"""
+Worker task pool for background runs.
+
+A single dispatcher claims runs from the RunQueue whenever a worker slot is
+free and executes each one in its own task, so graph execution is bounded
+per process and independent of the HTTP requests that created the runs or
+subscribe to their events.
+"""
+
+import asyncio
+from typing import Awaitable, Callable
+
+from clients.logging_client import LoggingClient
+from core.runs.queue import RunQueue, RunRequest
+
+logger = LoggingClient.get_logger(__name__)
+
+# pause before claiming again after the queue itself failed
+DISPATCH_RETRY_SECONDS = 1.0
+
+
+class RunWorkerPool:
+    """Executes queued runs with bounded concurrency."""
+
+    def __init__(
+        self,
+        queue: RunQueue,
+        execute: Callable[[RunRequest], Awaitable[str]],
+        concurrency: int,
+    ):
+        """
+        Args:
+            queue: The queue runs are claimed from.
+            execute: Runs one request to completion and returns its final status
+                ("completed", "failed" or "cancelled").
+            concurrency: Runs executed at once by this process.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+
+        self.concurrency = concurrency
+        self._queue = queue
+        self._execute = execute
+        self._slots = asyncio.Semaphore(concurrency)
+        self._dispatcher: asyncio.Task | None = None
+        self._maintainer: asyncio.Task | None = None
+        self._running: set[asyncio.Task] = set()
+
+    def start(self) -> None:
+        """Start claiming runs."""
+        if self._dispatcher is None:
+            self._dispatcher = asyncio.create_task(self._dispatch())
+            self._maintainer = asyncio.create_task(self._maintain())
+
+    async def stop(self) -> None:
+        """Stop claiming runs, stop those executing and put them back in the queue for another worker."""
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            self._maintainer.cancel()
+            await asyncio.gather(self._dispatcher, self._maintainer, return_exceptions=True)
+            self._dispatcher = None
+            self._maintainer = None
+
+        tasks = list(self._running)
+        for task in tasks:
+            task.cancel()
+
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> dict[str, int]:
+        """Return worker utilization for health reporting."""
+        return {
+            "running": len(self._running),
+            "concurrency": self.concurrency,
+            "queued_locally": self._queue.depth(),
+        }
+
+    async def _dispatch(self) -> None:
+        """Claim a run whenever a slot is free and execute it in its own task."""
+        while True:
+            await self._slots.acquire()
+
+            try:
+                run = await self._queue.get()
+            except asyncio.CancelledError:
+                self._slots.release()
+                raise
+            except Exception:
+                self._slots.release()
+                logger.exception("error claiming background run")
+                await asyncio.sleep(DISPATCH_RETRY_SECONDS)
+                continue
+
+            task = asyncio.create_task(self._run(run))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _maintain(self) -> None:
+        """Keep claimed runs alive and clean up the queue until stopped."""
+        while True:
+            await asyncio.sleep(self._queue.maintenance_interval)
+
+            try:
+                await self._queue.maintain()
+            except Exception:
+                logger.exception("error maintaining background run queue")
+
+    async def _run(self, run: RunRequest) -> None:
+        """Execute one run and record its outcome, or requeue it when the pool stops first."""
+        status: str | None = "failed"
+
+        try:
+            logger.info("executing background run %s for thread %s", run.run_id, run.thread_id)
+            status = await self._execute(run)
+
+        except asyncio.CancelledError:
+            # runs cancelled through the API return "cancelled", only stop() cancels this task
+            status = None
+            raise
+
+        except Exception:
+            logger.exception("background run %s for thread %s failed", run.run_id, run.thread_id)
+
+        finally:
+            self._slots.release()
+
+            try:
+                if status is None:
+                    logger.info("requeueing background run %s, the worker pool is stopping", run.run_id)
+                    await self._queue.release(run.run_id)
+                else:
+                    await self._queue.complete(run.run_id, status)
+            except Exception:
+                logger.exception("error recording status of background run %s", run.run_id)
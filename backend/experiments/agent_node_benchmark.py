@@ -0,0 +1,147 @@
+"""
+Agent node overhead benchmark.
+
+Measures the time the ReAct agent node spends around the model call, for
+threads of increasing length. The node is built exactly as the student debt
+agent builds it, with the real system prompt and context builders, a dynamic
+tool binder returning a set of synthetic tools and a model that binds tools the
+way ChatOpenAI does but answers instantly, so only the node's own work is timed.
+
+No database or API keys are needed:
+
+    python experiments/agent_node_benchmark.py --lengths 10 100 1000
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.tools import StructuredTool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import BaseModel, Field
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from core.graphs.nodes.agents.student_debt.react import render_dynamic_context, render_system_prompt  # noqa: E402
+from core.graphs.nodes.agents.utils.agent_subgraph import _create_agent_node_factory  # noqa: E402
+from core.graphs.types.state import CandidlyAgentState  # noqa: E402
+
+TOOL_RESULT_TEXT = str([
+    {"name": f"Lender {i}", "fixed_apr": "4.99% - 9.99%", "variable_apr": "5.49% - 10.2%", "min_credit_score": 680}
+    for i in range(20)
+])
+
+
+class InstantChatModel(BaseChatModel):
+    """Binds tools like ChatOpenAI and answers without a network call."""
+
+    @property
+    def _llm_type(self) -> str:
+        return "instant"
+
+    def bind_tools(self, tools: list, **kwargs: Any):
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs)
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="ok"))])
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        return self._generate(messages)
+
+
+class LoanArgs(BaseModel):
+    balance: float = Field(description="Outstanding principal in dollars")
+    interest_rate: float = Field(description="Annual interest rate in percent")
+    term_months: int = Field(description="Remaining term in months")
+    servicer: str = Field(description="Name of the loan servicer")
+    federal: bool = Field(description="Whether the loan is a federal loan")
+
+
+def make_tools(count: int) -> list[StructuredTool]:
+    def run(**kwargs: Any) -> str:
+        return "ok"
+
+    return [
+        StructuredTool.from_function(run, name=f"loan_tool_{i}", description=f"Synthetic loan tool {i}.", args_schema=LoanArgs)
+        for i in range(count)
+    ]
+
+
+def history(length: int) -> list[BaseMessage]:
+    messages: list[BaseMessage] = []
+    turn = 0
+    while len(messages) < length - 1:
+        call_id = f"call-{turn}"
+        messages.extend([
+            HumanMessage(content=f"question {turn} about my repayment options", id=f"human-{turn}"),
+            AIMessage(content="", tool_calls=[{"name": "loan_tool_0", "args": {}, "id": call_id}], id=f"call-ai-{turn}"),
+            ToolMessage(content=TOOL_RESULT_TEXT, tool_call_id=call_id, id=f"tool-{turn}"),
+            AIMessage(content="Here are the offers that match your loans.", id=f"answer-{turn}"),
+        ])
+        turn += 1
+
+    return messages[:length - 1] + [HumanMessage(content="and what about refinancing?", id="latest")]
+
+
+async def benchmark(node, length: int, iterations: int) -> float:
+    state = CandidlyAgentState(messages=history(length), react_loop_iterations=0)
+    config = {"configurable": {}}
+
+    for _ in range(5):
+        await node(state, config)
+
+    call_seconds = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await node(state, config)
+        call_seconds.append(time.perf_counter() - started)
+
+    return statistics.median(call_seconds) * 1_000_000
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lengths", type=int, nargs="+", default=[10, 100, 1000], help="thread lengths in messages")
+    parser.add_argument("--tools", type=int, default=8, help="tools returned by the dynamic tool binder")
+    parser.add_argument("--context-tokens", type=int, default=0, help="max_context_tokens, 0 disables trimming")
+    parser.add_argument("--iterations", type=int, default=200, help="timed node calls per length")
+    args = parser.parse_args()
+
+    tools = make_tools(args.tools)
+    node = _create_agent_node_factory(
+        model=InstantChatModel(),
+        tools=tools,
+        system_prompt_builder=render_system_prompt,
+        max_react_loops=6,
+        dynamic_tool_binder=lambda state: tools,
+        max_context_tokens=args.context_tokens or None,
+        context_builder=render_dynamic_context,
+    )
+
+    print(f"{'messages':>8} {'node us p50':>12}")
+    for length in args.lengths:
+        print(f"{length:>8} {await benchmark(node, length, args.iterations):>12.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
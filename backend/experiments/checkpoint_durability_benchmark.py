@@ -0,0 +1,95 @@
+"""
+Checkpoint durability benchmark.
+
+Counts checkpointer round trips (`aput` and `aput_writes`) and measures turn
+latency for each durability mode, using the synthetic chat-shaped graph from
+checkpoint_retention_benchmark.py on the real AsyncPostgresSaver.
+
+Requires a migrated checkpoint schema and the POSTGRES_* environment variables:
+
+    python experiments/checkpoint_durability_benchmark.py --turns 20
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import get_args
+
+from dotenv import load_dotenv
+from langchain_core.messages import HumanMessage
+from langgraph.types import Durability
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from clients.postgres_client import AsyncPostgresClient  # noqa: E402
+from experiments.checkpoint_retention_benchmark import build_graph  # noqa: E402
+
+
+class CountingSaver:
+    """Wraps a checkpointer's write methods to count calls."""
+
+    def __init__(self, saver):
+        self.saver = saver
+        self.puts = 0
+        self.put_writes = 0
+        self._aput = saver.aput
+        self._aput_writes = saver.aput_writes
+        saver.aput = self.aput
+        saver.aput_writes = self.aput_writes
+
+    async def aput(self, *args, **kwargs):
+        self.puts += 1
+        return await self._aput(*args, **kwargs)
+
+    async def aput_writes(self, *args, **kwargs):
+        self.put_writes += 1
+        return await self._aput_writes(*args, **kwargs)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=20, help="turns per durability mode")
+    args = parser.parse_args()
+
+    load_dotenv()
+    db_client = AsyncPostgresClient()
+    if db_client.psycopg_pool is None:
+        raise SystemExit("set POSTGRES_HOST and the other POSTGRES_* variables to a database to benchmark")
+
+    await db_client.open_checkpointer_pool()
+    saver = db_client.get_checkpointer()
+    counter = CountingSaver(saver)
+    graph = build_graph(saver)
+
+    try:
+        print(f"{'durability':<10} {'puts/turn':>10} {'put_writes/turn':>16} {'turn ms p50':>12} {'turn ms p95':>12}")
+        for durability in get_args(Durability):
+            thread_id = f"benchmark-durability-{durability}-{uuid.uuid4()}"
+            config = {"configurable": {"thread_id": thread_id}}
+            counter.puts = counter.put_writes = 0
+            turn_seconds = []
+
+            for turn in range(args.turns):
+                started = time.perf_counter()
+                await graph.ainvoke({"messages": [HumanMessage(content=f"question {turn}")]}, config, durability=durability)
+                turn_seconds.append(time.perf_counter() - started)
+
+            turn_ms = sorted(seconds * 1000 for seconds in turn_seconds)
+            print(
+                f"{durability:<10} {counter.puts / args.turns:>10.1f} {counter.put_writes / args.turns:>16.1f} "
+                f"{statistics.median(turn_ms):>12.2f} {turn_ms[int(len(turn_ms) * 0.95) - 1]:>12.2f}"
+            )
+
+            await saver.adelete_thread(thread_id)
+
+    finally:
+        await db_client.dispose_checkpointer_pool()
+        await db_client.dispose_engine()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,172 @@
+"""
+Checkpoint retention benchmark.
+
+Measures checkpoint read (`aget_state`) and write (one turn) latency against
+thread age for each retention policy. Turns run a synthetic graph with the
+same superstep shape as the chat graph (initialize, guardrail, merge and two
+ReAct iterations) on the real AsyncPostgresSaver, so no model calls are made.
+Threads are pruned after every turn, which is what the pruner converges to.
+
+Requires a migrated checkpoint schema and the POSTGRES_* environment variables:
+
+    python experiments/checkpoint_retention_benchmark.py --ages 10 50 200
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Annotated, TypedDict
+
+from dotenv import load_dotenv
+from langchain_core.messages import AIMessage, AnyMessage, HumanMessage, ToolMessage
+from langgraph.graph import END, START, StateGraph
+from langgraph.graph.message import add_messages
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from clients.postgres_client import AsyncPostgresClient  # noqa: E402
+from clients.postgres_client.queries.checkpoints import CheckpointRetention  # noqa: E402
+
+# roughly the size of an answer and a tool result
+ANSWER_TEXT = "Here is how your repayment plan changes over time. " * 12
+TOOL_RESULT_TEXT = '{"balance": 24000, "rate": 0.055, "months": 120} ' * 20
+
+
+class BenchmarkState(TypedDict):
+    messages: Annotated[list[AnyMessage], add_messages]
+    user_info: dict
+    guardrail_passed: bool
+    iterations: int
+
+
+def initialize(state: BenchmarkState) -> dict:
+    return {"user_info": state.get("user_info") or {"user_id": "benchmark", "plan": "standard"}}
+
+
+def guardrail(state: BenchmarkState) -> dict:
+    return {"guardrail_passed": True}
+
+
+def merge(state: BenchmarkState) -> dict:
+    return {"iterations": 0}
+
+
+def agent(state: BenchmarkState) -> dict:
+    if state["iterations"] < 2:
+        call_id = str(uuid.uuid4())
+        return {
+            "messages": [AIMessage(content="", tool_calls=[{"name": "lookup", "args": {}, "id": call_id}])],
+            "iterations": state["iterations"] + 1,
+        }
+    return {"messages": [AIMessage(content=ANSWER_TEXT)]}
+
+
+def tools(state: BenchmarkState) -> dict:
+    call_id = state["messages"][-1].tool_calls[0]["id"]
+    return {"messages": [ToolMessage(content=TOOL_RESULT_TEXT, tool_call_id=call_id)]}
+
+
+def route_agent(state: BenchmarkState) -> str:
+    return "tools" if state["messages"][-1].tool_calls else END
+
+
+def build_graph(checkpointer):
+    builder = StateGraph(BenchmarkState)
+    builder.add_node("initialize", initialize)
+    builder.add_node("guardrail", guardrail)
+    builder.add_node("merge", merge)
+    builder.add_node("agent", agent)
+    builder.add_node("tools", tools)
+    builder.add_edge(START, "initialize")
+    builder.add_edge("initialize", "guardrail")
+    builder.add_edge("guardrail", "merge")
+    builder.add_edge("merge", "agent")
+    builder.add_conditional_edges("agent", route_agent, ["tools", END])
+    builder.add_edge("tools", "agent")
+    return builder.compile(checkpointer=checkpointer)
+
+
+async def table_sizes(db_client: AsyncPostgresClient, thread_id: str) -> dict[str, int]:
+    sizes = {}
+    async with db_client.psycopg_pool.connection() as conn:
+        for table in ("checkpoints", "checkpoint_writes", "checkpoint_blobs"):
+            result = await conn.execute(f"select count(*) as n from {table} where thread_id = %s", (thread_id,))
+            sizes[table] = (await result.fetchone())["n"]
+    return sizes
+
+
+async def benchmark_policy(db_client, graph, policy: CheckpointRetention, ages: list[int], reads: int) -> list[dict]:
+    db_client.checkpoint_retention = policy
+    thread_id = f"benchmark-{policy.value}-{uuid.uuid4()}"
+    config = {"configurable": {"thread_id": thread_id}}
+
+    rows = []
+    turn_seconds = []
+    turn = 0
+
+    for age in ages:
+        while turn < age:
+            started = time.perf_counter()
+            await graph.ainvoke({"messages": [HumanMessage(content=f"question {turn}")]}, config)
+            turn_seconds.append(time.perf_counter() - started)
+            await db_client.prune_checkpoints([thread_id])
+            turn += 1
+
+        read_seconds = []
+        for _ in range(reads):
+            started = time.perf_counter()
+            await graph.aget_state(config)
+            read_seconds.append(time.perf_counter() - started)
+
+        rows.append({
+            "policy": policy.value,
+            "turns": age,
+            "write_ms": statistics.median(turn_seconds[-10:]) * 1000,
+            "read_ms": statistics.median(read_seconds) * 1000,
+            **await table_sizes(db_client, thread_id),
+        })
+
+    await db_client.checkpointer.adelete_thread(thread_id)
+    return rows
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ages", type=int, nargs="+", default=[10, 50, 200], help="thread ages in turns")
+    parser.add_argument("--reads", type=int, default=50, help="aget_state calls per measurement")
+    parser.add_argument(
+        "--policies",
+        nargs="+",
+        default=[policy.value for policy in CheckpointRetention],
+        choices=[policy.value for policy in CheckpointRetention],
+    )
+    args = parser.parse_args()
+
+    load_dotenv()
+    db_client = AsyncPostgresClient()
+    if db_client.psycopg_pool is None:
+        raise SystemExit("set POSTGRES_HOST and the other POSTGRES_* variables to a database to benchmark")
+
+    await db_client.open_checkpointer_pool()
+    graph = build_graph(db_client.get_checkpointer())
+
+    try:
+        print(f"{'policy':<8} {'turns':>6} {'write ms':>9} {'read ms':>8} {'checkpoints':>12} {'writes':>7} {'blobs':>6}")
+        for policy in args.policies:
+            for row in await benchmark_policy(db_client, graph, CheckpointRetention(policy), sorted(args.ages), args.reads):
+                print(
+                    f"{row['policy']:<8} {row['turns']:>6} {row['write_ms']:>9.2f} {row['read_ms']:>8.2f} "
+                    f"{row['checkpoints']:>12} {row['checkpoint_writes']:>7} {row['checkpoint_blobs']:>6}"
+                )
+
+    finally:
+        await db_client.dispose_checkpointer_pool()
+        await db_client.dispose_engine()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
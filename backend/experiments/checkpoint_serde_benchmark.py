@@ -0,0 +1,135 @@
+"""
+Checkpoint serializer benchmark.
+
+Compares encode/decode time and stored bytes of the `messages` and
+`artifacts` channels, which are rewritten on every superstep, for realistic
+student debt threads: each turn adds a question, a tool call, a ToolMessage
+carrying an amortization chart or refinance table artifact, and an answer.
+
+    python experiments/checkpoint_serde_benchmark.py --turns 5 20 50
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from clients.postgres_client.serde import CompressedJsonPlusSerializer  # noqa: E402
+from core.graphs.types.artifact import Artifact, RefinanceArtifactRow, RowData  # noqa: E402
+
+ANSWER_TEMPLATE = (
+    "Switching to {plan} lowers your starting payment to about ${payment:,.0f} a month, "
+    "but you would pay roughly ${extra:,.0f} more over the life of the loan. If you can afford ${boost} extra "
+    "each month on the standard plan you would be debt-free {months} months sooner. "
+)
+PLANS = ["SAVE", "PAYE", "IBR", "ICR", "an extended plan", "a graduated plan"]
+
+# figures differ from turn to turn like real tool results do, seeded for repeatable sizes
+rng = random.Random(7)
+
+
+def amortization_artifact(tool_call_id: str) -> Artifact:
+    balance, rate = rng.uniform(8000, 90000), rng.uniform(0.03, 0.08) / 12
+    payment = balance * rate / (1 - (1 + rate) ** -120)
+    rows = []
+    for month in range(1, 121):
+        interest = balance * rate
+        balance = max(0.0, balance - (payment - interest))
+        rows.append(RowData(x=month, y0=round(balance, 2), y1=round(interest, 2), y2=round(payment - interest, 2)))
+    return Artifact(
+        id=tool_call_id, name="Loan balance over time", description="Standard 10 year plan", type="LINE_CHART", data=rows
+    )
+
+
+def refinance_artifact(tool_call_id: str) -> Artifact:
+    rows = [
+        RefinanceArtifactRow(
+            name=f"Lender {rng.randrange(100)}",
+            variable_apr=f"{rng.uniform(4, 6):.2f}% - {rng.uniform(9, 12):.2f}%",
+            fixed_apr=f"{rng.uniform(4, 6):.2f}% - {rng.uniform(8, 11):.2f}%",
+            bullets=["No origination fees", "Autopay discount of 0.25%", "Unemployment protection"],
+            disclosure="Rates shown include the autopay discount. Terms and conditions apply. " * 3,
+            repayment_lengths="5, 7, 10, 15 or 20 years",
+            minimum_credit_score="680",
+            tracking_url=f"https://partners.example.com/track?lender={i}&utm_source=chat",
+            logo=f"https://cdn.example.com/logos/lender-{i}.png",
+        )
+        for i in range(8)
+    ]
+    return Artifact(id=tool_call_id, name="Refinance offers", type="REFINANCE_TABLE", data=rows)
+
+
+def build_thread(turns: int) -> dict[str, list]:
+    messages, artifacts = [], []
+    for turn in range(turns):
+        tool_call_id = f"call_{turn:04d}"
+        artifact = amortization_artifact(tool_call_id) if turn % 2 == 0 else refinance_artifact(tool_call_id)
+        artifacts.append(artifact)
+        messages.extend([
+            HumanMessage(content=f"What happens to my loans if I change plans? ({turn})"),
+            AIMessage(content="", tool_calls=[{"name": "calculate", "args": {"plan": "standard"}, "id": tool_call_id}]),
+            ToolMessage(
+                content='{"artifact_rendered": true, "summary": {"total_paid": 41640.0, "months": 120}}',
+                tool_call_id=tool_call_id,
+                artifact=artifact.model_dump(mode="json"),
+            ),
+            AIMessage(content=ANSWER_TEMPLATE.format(
+                plan=rng.choice(PLANS),
+                payment=rng.uniform(90, 600),
+                extra=rng.uniform(1000, 20000),
+                boost=rng.randrange(25, 300),
+                months=rng.randrange(3, 60),
+            )),
+        ])
+    return {"messages": messages, "artifacts": artifacts}
+
+
+def timed(fn: Callable[[], Any], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, nargs="+", default=[5, 20, 50], help="thread lengths in turns")
+    parser.add_argument("--repeat", type=int, default=30, help="runs per measurement")
+    args = parser.parse_args()
+
+    legacy = JsonPlusSerializer()
+    serializers: dict[str, tuple[Callable[[Any], Any], Callable[[Any], Any]]] = {
+        # the JSON encoding older checkpoints were written with
+        "json": (lambda obj: ("json", legacy.dumps(obj)), legacy.loads_typed),
+        "msgpack": (legacy.dumps_typed, legacy.loads_typed),
+        "msgpack+zstd": (CompressedJsonPlusSerializer().dumps_typed, CompressedJsonPlusSerializer().loads_typed),
+    }
+
+    print(f"{'turns':>5} {'channel':<10} {'serializer':<13} {'bytes':>9} {'ratio':>6} {'encode ms':>10} {'decode ms':>10}")
+    for turns in args.turns:
+        thread = build_thread(turns)
+        for channel, value in thread.items():
+            baseline = None
+            for name, (dumps, loads) in serializers.items():
+                encoded = dumps(value)
+                baseline = baseline or len(encoded[1])
+                encode_ms = timed(lambda: dumps(value), args.repeat)
+                decode_ms = timed(lambda: loads(encoded), args.repeat)
+                print(
+                    f"{turns:>5} {channel:<10} {name:<13} {len(encoded[1]):>9} "
+                    f"{len(encoded[1]) / baseline:>6.2f} {encode_ms:>10.3f} {decode_ms:>10.3f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
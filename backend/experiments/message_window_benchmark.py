@@ -0,0 +1,112 @@
+"""
+Message window benchmark.
+
+Measures turn latency against thread length with and without the message
+window. Each turn runs the real initialize node, which archives messages
+older than the window, followed by a synthetic answer node that keeps the
+conversation summary covering everything before its answer, on the real
+AsyncPostgresSaver, so no model calls are made. Threads are seeded with
+history in one update and warmed up by one turn before timing.
+
+Requires a migrated checkpoint schema, the app tables from
+`python -m clients.postgres_client.migrations` and the POSTGRES_* environment variables:
+
+    python experiments/message_window_benchmark.py --lengths 10 100 500 --window 40
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+from dotenv import load_dotenv
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import END, START, StateGraph
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from clients.postgres_client import AsyncPostgresClient  # noqa: E402
+from core.graphs.nodes.initialize import node as initialize  # noqa: E402
+from core.graphs.types.conversation_summary import ConversationSummary  # noqa: E402
+from core.graphs.types.state import CandidlyAgentState  # noqa: E402
+from experiments.checkpoint_retention_benchmark import ANSWER_TEXT  # noqa: E402
+
+
+def answer(state: CandidlyAgentState) -> dict:
+    # initialize only archives summarized messages, so stand in for summarize_node as well
+    summary = ConversationSummary(text="summary", message_count=state.archived_message_count + len(state.messages))
+    return {"messages": [AIMessage(content=ANSWER_TEXT)], "conversation_summary": summary}
+
+
+def build_graph(checkpointer):
+    builder = StateGraph(CandidlyAgentState)
+    builder.add_node("initialize", initialize.initialize_node)
+    builder.add_node("answer", answer)
+    builder.add_edge(START, "initialize")
+    builder.add_edge("initialize", "answer")
+    builder.add_edge("answer", END)
+    return builder.compile(checkpointer=checkpointer)
+
+
+def history(length: int) -> list:
+    messages = []
+    for turn in range(length // 2):
+        messages.append(HumanMessage(content=f"question {turn} about my repayment plan"))
+        messages.append(AIMessage(content=ANSWER_TEXT))
+    return messages
+
+
+async def benchmark_thread(db_client, graph, length: int, window: int, turns: int) -> float:
+    initialize.MESSAGE_WINDOW_SIZE = window
+    thread_id = str(uuid.uuid4())
+    config = {"configurable": {"thread_id": thread_id, "user_id": "benchmark", "db_client": db_client}}
+
+    await graph.aupdate_state(config, {
+        "messages": history(length),
+        "react_loop_iterations": 0,
+        "conversation_summary": ConversationSummary(text="summary", message_count=length),
+    })
+    await graph.ainvoke({"messages": [HumanMessage(content="warm up")]}, config, durability="exit")
+
+    turn_seconds = []
+    for turn in range(turns):
+        started = time.perf_counter()
+        await graph.ainvoke({"messages": [HumanMessage(content=f"follow up {turn}")]}, config, durability="exit")
+        turn_seconds.append(time.perf_counter() - started)
+
+    await db_client.checkpointer.adelete_thread(thread_id)
+    return statistics.median(turn_seconds) * 1000
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lengths", type=int, nargs="+", default=[10, 100, 500], help="thread lengths in messages")
+    parser.add_argument("--window", type=int, default=40, help="MESSAGE_WINDOW_SIZE to compare against no window")
+    parser.add_argument("--turns", type=int, default=20, help="timed turns per thread")
+    args = parser.parse_args()
+
+    load_dotenv()
+    db_client = AsyncPostgresClient()
+    if db_client.psycopg_pool is None:
+        raise SystemExit("set POSTGRES_HOST and the other POSTGRES_* variables to a database to benchmark")
+
+    await db_client.open_checkpointer_pool()
+    graph = build_graph(db_client.get_checkpointer())
+
+    try:
+        print(f"{'messages':>8} {'no window ms':>13} {f'window {args.window} ms':>13}")
+        for length in args.lengths:
+            unbounded_ms = await benchmark_thread(db_client, graph, length, 0, args.turns)
+            windowed_ms = await benchmark_thread(db_client, graph, length, args.window, args.turns)
+            print(f"{length:>8} {unbounded_ms:>13.2f} {windowed_ms:>13.2f}")
+
+    finally:
+        await db_client.dispose_checkpointer_pool()
+        await db_client.dispose_engine()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,155 @@
+"""
+Guardrail pre-filter benchmark.
+
+Measures the per-message cost of the input pre-filter on 2,000 character
+messages, comparing:
+
+- legacy: the pattern lists rebuilt on every call and a case-insensitive
+  re.search per pattern, as pre_filter_validation used to run
+- combined: every pattern in one case-insensitive alternation with named groups
+- engine: PreFilterEngine with the rules in pre_filter_rules.toml
+
+No database or API keys are needed:
+
+    python experiments/pre_filter_benchmark.py --iterations 2000
+"""
+
+import argparse
+import random
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from core.graphs.nodes.guardrails.pre_filter import load_pre_filter_engine  # noqa: E402
+
+MESSAGE_CHARS = 2000
+
+# loan questions, the second set adds words that contain rule keywords ("most", "important", "select ... from")
+PLAIN_WORDS = (
+    "my federal loans have a balance of 32000 dollars and I want to know whether income driven repayment "
+    "or refinancing with a private lender makes more sense given my salary of 70000 per year"
+).split()
+KEYWORD_WORDS = PLAIN_WORDS + (
+    "it is important that I select the plan with the lowest cost from the options most borrowers qualify for"
+).split()
+
+
+def legacy_pre_filter(user_input: str) -> bool:
+    if len(user_input) > 2000:
+        return True
+
+    high_risk_patterns = [
+        "ignore previous", "ignore all", "act as", "pretend you are",
+        "you are now", "new instructions", "override", "jailbreak",
+        "your training", "system prompt", "internal instructions"
+    ]
+
+    input_lower = user_input.lower()
+    for pattern in high_risk_patterns:
+        if pattern in input_lower:
+            return True
+
+    sql_patterns = [
+        r"\bselect\s+[\w\*]+(?:\s*,\s*[\w\*]+)*\s+from\s+\w+",
+        r"\binsert\s+into\s+\w+\s+(?:values|select)",
+        r"\bupdate\s+\w+\s+set\s+\w+\s*=",
+        r"\bdelete\s+from\s+\w+\s+where",
+        r"\bdrop\s+(?:table|database)\s+\w+",
+        r"\balter\s+table\s+\w+",
+        r"\btruncate\s+table\s+\w+",
+        r"\bgrant\s+[\w\s]+privileges",
+        r"--\s*;\s*select",
+    ]
+
+    if any(re.search(pattern, user_input, re.IGNORECASE) for pattern in sql_patterns):
+        return True
+
+    code_patterns = [
+        r"\bimport\s+(?:os|sys|subprocess|shutil)\b",
+        r"\bos\s*\.\s*(?:system|popen|environ)\s*\(",
+        r"\bsubprocess\s*\.\s*(?:run|call|Popen)\s*\(",
+        r"\beval\s*\(",
+        r"\bexec\s*\(",
+        r"\b__import__\s*\(",
+        r"\bwith\s+open\s*\(",
+        r"\bopen\s*\(\s*['\"](?:/|\\)",
+        r"^def\s+\w+\s*\(.*\):",
+        r"^class\s+\w+\s*:",
+    ]
+
+    return any(re.search(pattern, user_input, re.IGNORECASE) for pattern in code_patterns)
+
+
+def make_combined_pre_filter() -> Callable[[str], bool]:
+    engine = load_pre_filter_engine()
+    phrases = [phrase for rule in engine.rules for phrase in rule.phrases]
+    combined = re.compile(
+        "|".join(f"(?P<{rule.name}>{rule.pattern.pattern})" for rule in engine.rules if rule.pattern),
+        re.IGNORECASE,
+    )
+
+    def combined_pre_filter(user_input: str) -> bool:
+        if len(user_input) > engine.max_length:
+            return True
+
+        lowered = user_input.lower()
+        return any(phrase in lowered for phrase in phrases) or combined.search(user_input) is not None
+
+    return combined_pre_filter
+
+
+def messages(count: int, words: list[str], attack: str | None = None) -> list[str]:
+    rng = random.Random(0)
+    texts = []
+    for _ in range(count):
+        text = " ".join(rng.choice(words) for _ in range(MESSAGE_CHARS // 4))
+        if attack:
+            text = text[:MESSAGE_CHARS - len(attack) - 1] + " " + attack
+        texts.append(text[:MESSAGE_CHARS])
+
+    return texts
+
+
+def benchmark(check: Callable[[str], object], texts: list[str]) -> float:
+    for text in texts[:20]:
+        check(text)
+
+    call_seconds = []
+    for text in texts:
+        started = time.perf_counter()
+        check(text)
+        call_seconds.append(time.perf_counter() - started)
+
+    return statistics.median(call_seconds) * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000, help="timed messages per case")
+    args = parser.parse_args()
+
+    engine = load_pre_filter_engine()
+    filters = {
+        "legacy": legacy_pre_filter,
+        "combined": make_combined_pre_filter(),
+        "engine": engine.validate,
+    }
+    cases = {
+        "plain": messages(args.iterations, PLAIN_WORDS),
+        "keywords": messages(args.iterations, KEYWORD_WORDS),
+        "sql at end": messages(args.iterations, PLAIN_WORDS, attack="drop table loans"),
+        "code at end": messages(args.iterations, PLAIN_WORDS, attack="__import__('os')"),
+    }
+
+    print(f"{'case':>12} " + " ".join(f"{name + ' us p50':>16}" for name in filters))
+    for case, texts in cases.items():
+        print(f"{case:>12} " + " ".join(f"{benchmark(check, texts):>16.1f}" for check in filters.values()))
+
+
+if __name__ == "__main__":
+    main()
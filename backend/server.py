@@ -1,31 +1,46 @@
-import json
+import asyncio
 import os
 import uuid
 from contextlib import asynccontextmanager
-from typing import Any
+from functools import partial
+from typing import Any, AsyncIterator, get_args
 
 import uvicorn
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException, Request, status
+from fastapi import FastAPI, HTTPException, Query, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
+from langgraph.types import Durability
 
-from clients.postgres_client import AsyncPostgresClient
+from clients.auth_client import AuthenticatedUser, AuthenticationError, SupabaseAuthClient
+from clients.postgres_client import AsyncPostgresClient, get_pool_sizes
+from clients.postgres_client.queries.threads import ThreadAccess, ThreadPage
 from clients.logging_client import LoggingClient
 
+from core.checkpoints.cache import CachingCheckpointSaver
+from core.checkpoints.pruner import CheckpointPruner
 from core.graphs.builder import create_initial_state_for_user, get_graph
+from core.graphs.utils.model import close_model_connections, get_model_usage_stats, warm_up_model_connections
+from core.runs.admission import AdmissionController, AdmissionRejectedError
+from core.runs.coordinator import CancelOutcome, ConflictPolicy, ThreadBusyError, ThreadRunCoordinator
+from core.runs.queue import RunQueue, RunQueueFullError, RunRequest
+from core.runs.worker import RunWorkerPool
 from utils.api_models import (
+    CancelRunResponse,
     ChatRequest,
     ChunksRequest,
     ChunksResponse,
+    CreateRunRequest,
     HealthResponse,
     InvokeResponse,
+    RunCreatedResponse,
     ServiceConsentsRequest,
     ServiceConsentsResponse,
     StartingMessagesResponse,
     StateResponse,
     StateUpdateRequest,
     ThreadIdResponse,
+    ThreadMessagesResponse,
     ThreadsResponse,
 )
 
@@ -35,10 +50,12 @@ from utils.message_converter import (
     convert_historical_messages,
     create_user_message_for_graph,
     get_default_message,
+    get_message_preview,
     get_starting_messages,
     invoke_graph_raw,
     stream_graph_responses,
 )
+from utils.sse import encode_sse_event
 
 # Load environment variables
 load_dotenv()
@@ -50,6 +67,7 @@ logger = LoggingClient.get_logger(__name__)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Manage application lifecycle."""
+    # the app's tables and indexes are created by `python -m clients.postgres_client.migrations` before deploy
     # Create db client and store in app.state
     app.state.db_client = AsyncPostgresClient()
     app.state.db_engine = app.state.db_client.get_engine()
@@ -66,20 +84,97 @@ async def lifespan(app: FastAPI):
 
     # supabase: Client = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
     app.state.supabase = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_ANON_KEY"))
+    app.state.auth_client = SupabaseAuthClient(supabase=app.state.supabase)
+
+    # serve each thread's latest checkpoint from memory, other workers' writes invalidate it
+    checkpointer = app.state.db_client.get_checkpointer()
+    checkpoint_cache_size = int(os.getenv("CHECKPOINT_CACHE_MAX_ENTRIES", "1000"))
+    app.state.checkpoint_cache = None
+    if app.state.db_client.has_shared_checkpoints and checkpoint_cache_size > 0:
+        app.state.checkpoint_cache = CachingCheckpointSaver(
+            saver=checkpointer,
+            db_client=app.state.db_client,
+            max_entries=checkpoint_cache_size,
+            ttl_seconds=float(os.getenv("CHECKPOINT_CACHE_TTL_SECONDS", "600")),
+        )
+        app.state.checkpoint_cache.start()
+        checkpointer = app.state.checkpoint_cache
 
     # Create an async graph
     uncompiled_graph = get_graph()
     graph = uncompiled_graph.compile(
-        checkpointer=app.state.db_client.get_checkpointer(),
+        checkpointer=checkpointer,
     )
     app.state.graph = graph
 
+    # when graph runs persist checkpoints: "exit" writes once per turn, "async"/"sync" every superstep
+    app.state.graph_durability = os.getenv("CHECKPOINT_DURABILITY", "exit")
+    if app.state.graph_durability not in get_args(Durability):
+        raise ValueError(f"CHECKPOINT_DURABILITY must be one of {get_args(Durability)}")
+
+    # delete historical checkpoints the retention policy does not keep
+    app.state.checkpoint_pruner = CheckpointPruner(
+        db_client=app.state.db_client,
+        interval=float(os.getenv("CHECKPOINT_PRUNE_INTERVAL_SECONDS", "60")),
+        sweep_interval=float(os.getenv("CHECKPOINT_SWEEP_INTERVAL_SECONDS", "86400")),
+        batch_size=int(os.getenv("CHECKPOINT_PRUNE_BATCH_SIZE", "100")),
+    )
+    app.state.checkpoint_pruner.start()
+
+    # serialize graph runs per thread and keep their events resumable
+    app.state.run_coordinator = ThreadRunCoordinator(
+        db_client=app.state.db_client,
+        wait_timeout=float(os.getenv("THREAD_RUN_WAIT_TIMEOUT_SECONDS", "30")),
+        buffer_size=int(os.getenv("RUN_STREAM_BUFFER_SIZE", "1024")),
+        retention_seconds=float(os.getenv("RUN_STREAM_RETENTION_SECONDS", "300")),
+        idle_timeout=float(os.getenv("RUN_STREAM_IDLE_TIMEOUT_SECONDS", "120")),
+        abandon_grace=float(os.getenv("RUN_ABANDON_GRACE_SECONDS", "10")),
+        checkpoint_cache=app.state.checkpoint_cache,
+    )
+    app.state.run_coordinator.start()
+
+    # bound concurrent graph runs so overload queues instead of collapsing latency
+    # each run pins a lock pool connection for its thread lock, so the lock pool size is the limit
+    app.state.admission_controller = AdmissionController(
+        max_concurrent_runs=get_pool_sizes()["lock_pool_max_size"],
+        max_queue_size=int(os.getenv("RUN_QUEUE_MAX_SIZE", "50")),
+        queue_timeout=float(os.getenv("RUN_QUEUE_TIMEOUT_SECONDS", "10")),
+    )
+
+    # execute background runs on a worker task pool fed by the run queue
+    app.state.run_queue = RunQueue(
+        db_client=app.state.db_client,
+        poll_interval=float(os.getenv("RUN_QUEUE_POLL_INTERVAL_SECONDS", "0.5")),
+        stale_after=float(os.getenv("RUN_QUEUE_STALE_AFTER_SECONDS", "900")),
+        max_attempts=int(os.getenv("RUN_QUEUE_MAX_ATTEMPTS", "3")),
+        retention=float(os.getenv("RUN_QUEUE_RETENTION_SECONDS", "86400")),
+    )
+    # background runs share the admission limit and lock pool with chat, so they get at most half by default
+    max_runs = app.state.admission_controller.max_concurrent_runs
+    worker_concurrency = int(os.getenv("RUN_WORKER_CONCURRENCY") or max(1, max_runs // 2))
+    app.state.run_worker_pool = RunWorkerPool(
+        queue=app.state.run_queue,
+        execute=execute_background_run,
+        concurrency=min(worker_concurrency, max_runs),
+    )
+    app.state.run_worker_pool.start()
+
+    # open model provider connections now so the first request skips DNS and TLS setup
+    await warm_up_model_connections()
+
     # FastAPI convention: app runs here
     yield
 
     # Shutdown: clean up resources
+    await app.state.run_worker_pool.stop()
+    await app.state.run_coordinator.shutdown()
+    await app.state.checkpoint_pruner.stop()
+    if app.state.checkpoint_cache is not None:
+        await app.state.checkpoint_cache.stop()
+    app.state.auth_client.close()
     await app.state.db_client.dispose_engine()
     await app.state.db_client.dispose_checkpointer_pool()
+    await close_model_connections()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -91,6 +186,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Run-Id"],
 )
 
 
@@ -109,13 +205,48 @@ def get_sse_headers() -> dict[str, str]:
     }
 
 
-async def validate_thread_id(user_id: str, thread_id: str, context: Request) -> None:
+def create_run_stream_response(events: AsyncIterator[bytes], run_id: str) -> StreamingResponse:
+    """
+    Wraps a graph run's SSE events in a StreamingResponse.
+
+    The run ID is returned in the `X-Run-Id` header so clients can resume the
+    stream with `GET /threads/{thread_id}/runs/{run_id}/stream` if they drop.
+
+    Args:
+        events: The SSE event stream of the run.
+        run_id: The ID of the run.
+
+    Returns:
+        A streaming response with SSE-formatted events.
+    """
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={**get_sse_headers(), "X-Run-Id": run_id},
+    )
+
+
+async def validate_thread_id(user_id: str, thread_id: str, context: Request) -> ThreadAccess:
+    """
+    Validates that a thread belongs to the user and reports whether it is new.
+
+    Ownership and checkpoint existence are checked in a single read-only query,
+    and owned threads are cached in-process so repeat turns skip the database.
+
+    Args:
+        user_id: The ID of the user.
+        thread_id: The ID of the thread.
+        context: FastAPI request context.
+
+    Returns:
+        ThreadAccess for the user_id thread_id pair.
+    """
     # get db_client from app context
     db_client = context.app.state.db_client
 
     # confirm thread id against conversations table
     try:
-        thread_id_valid = await db_client.confirm_thread_id(
+        thread_access = await db_client.validate_thread_access(
             user_id=user_id,
             thread_id=thread_id
         )
@@ -128,17 +259,21 @@ async def validate_thread_id(user_id: str, thread_id: str, context: Request) ->
         ) from e
 
     # raise 404 if thread_id doesn't exist or is mis-matched
-    if not thread_id_valid:
+    if not thread_access.owned:
         logger.error(f"thread validation failed for user_id {user_id} and thread_id {thread_id}")
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"thread_id {thread_id} not found for user_id {user_id}"
         )
 
+    return thread_access
+
+
 async def get_or_initialize_thread_state(
         user_id: str,
         thread_id: str,
         user_message: str,
+        is_new: bool | None = None,
 ) -> dict[str, Any]:
     """
     Gets the existing thread state or initializes a new one if it doesn't exist.
@@ -147,15 +282,18 @@ async def get_or_initialize_thread_state(
         user_id: The ID of the user.
         thread_id: The ID of the thread.
         user_message: The user message content.
-        candidly_token: The Candidly authentication token.
+        is_new: Whether the thread has no checkpoint yet, if already known.
+            When None the checkpoint is loaded to find out.
 
     Returns:
         The input state for the graph.
     """
-    config = {"configurable": {"thread_id": thread_id}}
-    thread_state = await app.state.graph.aget_state(config)
+    if is_new is None:
+        config = {"configurable": {"thread_id": thread_id}}
+        thread_state = await app.state.graph.aget_state(config)
+        is_new = thread_state.values.get("user_info", None) is None
 
-    if thread_state.values.get("user_info", None) is None:
+    if is_new:
         logger.info("New thread %s: Setting initial state for user %s", thread_id, user_id)
 
         # Create initial state with user info
@@ -174,21 +312,44 @@ async def get_or_initialize_thread_state(
         return create_user_message_for_graph(user_message)
 
 
-async def get_user_credentials(context: Request) -> str:
+async def complete_thread_turn(user_id: str, thread_id: str, final_state: dict[str, Any]) -> None:
     """
-    Check if a user is authenticated with Supabase.
-    Extract the JWT token from Authorization header and verify with Supabase.
-    Returns the user ID string.
+    Record a finished turn: the thread now has a checkpoint and a new last message.
+
+    Args:
+        user_id: The ID of the user.
+        thread_id: The ID of the thread.
+        final_state: The graph state at the end of the turn.
+    """
+    app.state.db_client.mark_thread_initialized(user_id, thread_id)
+    app.state.checkpoint_pruner.mark_dirty(thread_id)
+
+    await app.state.db_client.update_thread_activity(
+        user_id=user_id,
+        thread_id=thread_id,
+        last_message_preview=get_message_preview(final_state.get("messages", [])),
+    )
+
+
+def extract_bearer_token(context: Request) -> str:
+    """
+    Extract the JWT token from the Authorization header.
+
+    Args:
+        context: FastAPI request context.
+
+    Returns:
+        The raw bearer token.
     """
     # Get the Authorization header
     auth_header = context.headers.get("Authorization")
-    
+
     if not auth_header:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Authorization header missing"
         )
-    
+
     # Extract the token (Bearer <token>)
     try:
         scheme, token = auth_header.split(" ")
@@ -202,17 +363,23 @@ async def get_user_credentials(context: Request) -> str:
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid Authorization header format"
         )
-    
-    # Verify the token with Supabase
+
+    return token
+
+
+async def authenticate_user(context: Request) -> AuthenticatedUser:
+    """
+    Verify the request's Supabase JWT and return the authenticated user.
+
+    Tokens are verified locally against the cached signing secret or JWKS, and
+    only fall back to Supabase's auth API (off the event loop) when no key is
+    available.
+    """
+    token = extract_bearer_token(context)
+
     try:
-        response = context.app.state.supabase.auth.get_user(token)
-        if not response or not response.user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid or expired token"
-            )
-        return response.user.id
-    except Exception as e:
+        return await context.app.state.auth_client.authenticate(token)
+    except AuthenticationError as e:
         logger.error(f"Token verification failed: {e}")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -220,6 +387,16 @@ async def get_user_credentials(context: Request) -> str:
         )
 
 
+async def get_user_credentials(context: Request) -> str:
+    """
+    Check if a user is authenticated with Supabase.
+    Extract the JWT token from Authorization header and verify it.
+    Returns the user ID string.
+    """
+    user = await authenticate_user(context)
+    return user.user_id
+
+
 @app.get("/health", response_model=HealthResponse)
 async def health(context: Request):
     """
@@ -247,7 +424,10 @@ async def health(context: Request):
     # checkpointer health check
     try:
         await context.app.state.db_client.ping_checkpointer_pool()
-        health_status["services"]["checkpointer"] = {"status": "up"}
+        health_status["services"]["checkpointer"] = {
+            "status": "up",
+            **context.app.state.db_client.get_checkpointer_stats(),
+        }
     except Exception:
         logger.exception("checkpointer health check failed")
         health_status["status"] = "degraded"
@@ -256,6 +436,39 @@ async def health(context: Request):
             "error": "ping failed please check logs",
         }
 
+    # graph run admission queue depth and wait times
+    health_status["services"]["admission"] = {
+        "status": "up",
+        **context.app.state.admission_controller.stats(),
+    }
+
+    # verified token cache hit rate, a miss costs a signature check or a supabase round trip
+    health_status["services"]["auth_cache"] = {
+        "status": "up",
+        **context.app.state.auth_client.get_stats(),
+    }
+
+    # token usage per model, cached_input_ratio shows how often the provider's prompt cache hits
+    health_status["services"]["models"] = {"status": "up", "usage": get_model_usage_stats()}
+
+    # latest checkpoint cache hit rate, disabled in local mode
+    checkpoint_cache = context.app.state.checkpoint_cache
+    health_status["services"]["checkpoint_cache"] = (
+        {"status": "up", **checkpoint_cache.stats()} if checkpoint_cache is not None else {"status": "disabled"}
+    )
+
+    # checkpoint retention policy and pruning totals
+    health_status["services"]["checkpoint_pruner"] = {
+        "status": "up" if context.app.state.checkpoint_pruner.enabled else "disabled",
+        **context.app.state.checkpoint_pruner.stats(),
+    }
+
+    # background run worker utilization
+    health_status["services"]["run_workers"] = {
+        "status": "up",
+        **context.app.state.run_worker_pool.stats(),
+    }
+
     return health_status
 
 
@@ -264,54 +477,192 @@ async def get_user(context: Request):
     """
     Test the authentication of the user. Return the user info.
     """
-    # Get the Authorization header and retrieve full user details
-    auth_header = context.headers.get("Authorization")
-    
-    if not auth_header:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Authorization header missing"
+    user = await authenticate_user(context)
+
+    return {
+        "authenticated": True,
+        "user_id": user.user_id,
+        "email": user.email,
+        "created_at": user.created_at,
+        "metadata": user.metadata
+    }
+
+
+async def execute_background_run(run: RunRequest) -> str:
+    """
+    Execute a queued run to completion on the worker pool.
+
+    Args:
+        run: The claimed run.
+
+    Returns:
+        The run's final status: "completed", "failed" or "cancelled".
+    """
+    run_coordinator = app.state.run_coordinator
+
+    async def fail(message: str) -> str:
+        await run_coordinator.close_run(
+            run.thread_id, run.run_id, {"id": str(uuid.uuid4()), "type": "error", "content": message}
         )
-    
-    # Extract the token (Bearer <token>)
+        return "failed"
+
+    # take a global run slot first, so a queued background run never holds a thread lease or lock connection
     try:
-        scheme, token = auth_header.split(" ")
-        if scheme.lower() != "bearer":
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authentication scheme"
-            )
-    except ValueError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid Authorization header format"
-        )
-    
-    # Verify the token with Supabase and get full user details
+        ticket = await app.state.admission_controller.admit()
+    except AdmissionRejectedError as e:
+        logger.warning(f"background run {run.run_id} rejected by admission control: {e}")
+        return await fail(str(e))
+
+    # wait behind any turn already running on the thread
     try:
-        response = context.app.state.supabase.auth.get_user(token)
-        if not response or not response.user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid or expired token"
-            )
-        
-        # Extract user details
-        user = response.user
-        return {
-            "authenticated": True,
-            "user_id": user.id,
-            "email": user.email,
-            "created_at": user.created_at,
-            "metadata": user.user_metadata
+        lease = await run_coordinator.acquire(thread_id=run.thread_id, wait=True, run_id=run.run_id)
+    except ThreadBusyError as e:
+        logger.warning(f"background run {run.run_id} could not take thread {run.thread_id}: {e}")
+        await ticket.release()
+        return await fail(str(e))
+    except BaseException:
+        await ticket.release()
+        raise
+
+    try:
+        # the thread may have been deleted while the run was queued
+        thread_access = await app.state.db_client.validate_thread_access(
+            user_id=run.user_id,
+            thread_id=run.thread_id,
+        )
+        if not thread_access.owned:
+            raise RuntimeError(f"thread_id {run.thread_id} not found for user_id {run.user_id}")
+
+        input_state = await get_or_initialize_thread_state(
+            user_id=run.user_id,
+            thread_id=run.thread_id,
+            user_message=run.message,
+            is_new=thread_access.is_new,
+        )
+
+        config = {
+            "configurable": {
+                "thread_id": run.thread_id,
+                "user_id": run.user_id,
+                "db_client": app.state.db_client,
+                "db_engine": app.state.db_engine,
+            }
         }
+
+        graph_stream = stream_graph_responses(
+            app.state.graph,
+            input_state,
+            config,
+            run.thread_id,
+            on_complete=partial(complete_thread_turn, run.user_id, run.thread_id),
+            state_updates=run.state_updates,
+            durability=app.state.graph_durability,
+        )
+
     except Exception as e:
-        logger.error(f"Token verification failed: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token verification failed"
+        logger.exception(f"error starting background run {run.run_id} for thread {run.thread_id}")
+        await ticket.release()
+        await fail(str(e))
+        await lease.release()
+        return "failed"
+
+    # nobody may be subscribed to a background run, so it is never cancelled as abandoned
+    lease.start(graph_stream, ticket.release, cancel_when_abandoned=False)
+
+    try:
+        return await lease.wait()
+    except asyncio.CancelledError:
+        # the worker pool is stopping, end the run here so the thread is free when it is requeued
+        await lease.cancel()
+        raise
+
+
+@app.get("/threads", response_model=ThreadsResponse)
+async def list_threads(
+    context: Request,
+    limit: int = Query(default=50, ge=1, le=100),
+    cursor: str | None = None,
+):
+    """
+    List the user's threads newest first, one page at a time.
+
+    Args:
+        context: FastAPI application context.
+        limit: Threads per page.
+        cursor: `next_cursor` from the previous page, omitted for the first page.
+
+    Returns:
+        ThreadsResponse with the page and the cursor for the next one.
+    """
+    # ensure user_id and token are in request (raises HTTP errors on failure)
+    user_id = await get_user_credentials(context)
+
+    try:
+        page: ThreadPage = await context.app.state.db_client.list_threads(
+            user_id=user_id,
+            limit=limit,
+            cursor=cursor,
+        )
+
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+
+    except Exception as e:
+        logger.exception(f"error listing threads for user {user_id}")
+        raise HTTPException(status_code=500, detail="could not list threads") from e
+
+    return ThreadsResponse(threads=page.threads, next_cursor=page.next_cursor)
+
+
+@app.get("/threads/{thread_id}/messages", response_model=ThreadMessagesResponse)
+async def list_thread_messages(
+    thread_id: str,
+    context: Request,
+    before: int | None = Query(default=None, ge=0),
+    limit: int = Query(default=50, ge=1, le=200),
+):
+    """
+    Page backwards through messages that were archived out of the thread's state.
+
+    State updates carry only the recent message window and `archived_message_count`,
+    the number of older messages, so clients fetch those here when the user scrolls up.
+
+    Args:
+        thread_id: The unique identifier for the thread.
+        context: FastAPI application context.
+        before: `archived_message_count` from the state for the first page, then
+            `next_before` from the previous page. Omitted means the newest archived page.
+        limit: Archived messages per page, filtered internal messages are not returned.
+
+    Returns:
+        ThreadMessagesResponse with the page in conversation order.
+    """
+    # ensure user_id and token are in request (raises HTTP errors on failure)
+    user_id = await get_user_credentials(context)
+
+    # validate user_id thread_id pair (raises HTTP errors on failure)
+    await validate_thread_id(
+        user_id=user_id,
+        thread_id=thread_id,
+        context=context
+    )
+
+    try:
+        page = await context.app.state.db_client.list_thread_messages(
+            thread_id=thread_id,
+            before=before if before is not None else 2**31 - 1,
+            limit=limit,
         )
 
+    except Exception as e:
+        logger.exception(f"error listing archived messages for thread {thread_id}")
+        raise HTTPException(status_code=500, detail="could not list thread messages") from e
+
+    return ThreadMessagesResponse(
+        messages=convert_historical_messages(page.messages).messages,
+        next_before=page.next_before,
+    )
+
 
 @app.post("/threads/{thread_id}/chat")
 async def chat_stream(thread_id: str, request: ChatRequest, context: Request) -> StreamingResponse:
@@ -321,7 +672,8 @@ async def chat_stream(thread_id: str, request: ChatRequest, context: Request) ->
     Args:
         thread_id: The unique identifier for the thread.
         context: FastAPI application context.
-        request: The chat request containing message and optional default_message_id.
+        request: The chat request containing message, optional default_message_id
+            and the on_conflict policy for threads with a run in progress.
 
     Returns:
         A streaming response with SSE-formatted events.
@@ -330,7 +682,7 @@ async def chat_stream(thread_id: str, request: ChatRequest, context: Request) ->
     user_id = await get_user_credentials(context)
 
     # validate user_id thread_id pair (raises HTTP errors on failure)
-    await validate_thread_id(
+    thread_access = await validate_thread_id(
         user_id=user_id,
         thread_id=thread_id,
         context=context
@@ -352,17 +704,64 @@ async def chat_stream(thread_id: str, request: ChatRequest, context: Request) ->
                         {"type": "done"},
                     ]
                     for chunk in chunks:
-                        yield f"data: {json.dumps(chunk)}\n\n"
+                        yield encode_sse_event(chunk)
 
                 return StreamingResponse(stream_default(), media_type="text/event-stream", headers=get_sse_headers())
             else:
                 logger.warning("Default message not found: %s", request.default_message_id)
 
+        # join the run already streaming on this thread instead of starting another
+        run_coordinator = context.app.state.run_coordinator
+        if request.on_conflict == ConflictPolicy.JOIN:
+            active_stream = run_coordinator.get_active_stream(thread_id)
+            if active_stream is not None:
+                logger.info("Joining active run for thread: %s", thread_id)
+                return create_run_stream_response(active_stream.subscribe(), active_stream.run_id)
+
+    except Exception as e:
+        logger.exception(f"Error in chat stream for thread {thread_id}")
+        raise HTTPException(status_code=500, detail=f"Error processing chat request: {str(e)}") from e
+
+    # wait for a global run slot first, so queued requests never hold a thread lease or lock connection
+    try:
+        ticket = await context.app.state.admission_controller.admit()
+
+    except AdmissionRejectedError as e:
+        logger.warning(f"rejected chat request for thread {thread_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        ) from e
+
+    # take the per-thread run lease (raises ThreadBusyError when busy)
+    try:
+        lease = await run_coordinator.acquire(
+            thread_id=thread_id,
+            wait=request.on_conflict == ConflictPolicy.QUEUE,
+        )
+
+    except ThreadBusyError as e:
+        await ticket.release()
+        logger.warning(f"rejected chat request for busy thread {thread_id}: {e}")
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e)) from e
+
+    except Exception as e:
+        await ticket.release()
+        logger.exception(f"Error in chat stream for thread {thread_id}")
+        raise HTTPException(status_code=500, detail=f"Error processing chat request: {str(e)}") from e
+
+    except BaseException:
+        await ticket.release()
+        raise
+
+    try:
         # initialize input state and config for graph
         input_state = await get_or_initialize_thread_state(
             user_id=user_id,
             thread_id=thread_id,
             user_message=request.message,
+            is_new=thread_access.is_new,
         )
 
         config = {
@@ -375,18 +774,189 @@ async def chat_stream(thread_id: str, request: ChatRequest, context: Request) ->
             }
         }
 
-        # Stream the response
-        return StreamingResponse(
-            stream_graph_responses(app.state.graph, input_state, config, thread_id),
-            media_type="text/event-stream",
-            headers=get_sse_headers(),
+        graph_stream = stream_graph_responses(
+            app.state.graph,
+            input_state,
+            config,
+            thread_id,
+            on_complete=partial(complete_thread_turn, user_id, thread_id),
+            state_updates=request.state_updates,
+            durability=context.app.state.graph_durability,
         )
 
+        # run in the background, freeing the run slot and lease once it ends
+        run_stream = lease.start(graph_stream, ticket.release)
+
+        return create_run_stream_response(run_stream.subscribe(), lease.run_id)
+
     except Exception as e:
+        await ticket.release()
+        await lease.release()
         logger.exception(f"Error in chat stream for thread {thread_id}")
         raise HTTPException(status_code=500, detail=f"Error processing chat request: {str(e)}") from e
 
 
+@app.post("/threads/{thread_id}/runs", status_code=status.HTTP_202_ACCEPTED, response_model=RunCreatedResponse)
+async def create_run(thread_id: str, request: CreateRunRequest, context: Request):
+    """
+    Queue a background run and return its ID without waiting for it.
+
+    The run executes on the worker pool independently of any connection.
+    Subscribe to its events with `GET /threads/{thread_id}/runs/{run_id}/stream`.
+
+    Args:
+        thread_id: The unique identifier for the thread.
+        request: The message to run and the state update format.
+        context: FastAPI application context.
+
+    Returns:
+        RunCreatedResponse with the queued run ID.
+    """
+    # ensure user_id and token are in request (raises HTTP errors on failure)
+    user_id = await get_user_credentials(context)
+
+    # validate user_id thread_id pair (raises HTTP errors on failure)
+    await validate_thread_id(
+        user_id=user_id,
+        thread_id=thread_id,
+        context=context
+    )
+
+    run = RunRequest(
+        run_id=str(uuid.uuid4()),
+        thread_id=thread_id,
+        user_id=user_id,
+        message=request.message,
+        state_updates=request.state_updates,
+    )
+
+    run_queue = context.app.state.run_queue
+
+    # in-process runs get their stream now so clients can subscribe before the run starts
+    if run_queue.is_local:
+        context.app.state.run_coordinator.register_run(thread_id, run.run_id)
+
+    try:
+        await run_queue.put(run)
+
+    except RunQueueFullError as e:
+        await context.app.state.run_coordinator.close_run(
+            thread_id, run.run_id, {"id": str(uuid.uuid4()), "type": "error", "content": str(e)}
+        )
+        logger.warning(f"rejected background run for thread {thread_id}: {e}")
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e)) from e
+
+    except Exception as e:
+        logger.exception(f"error queueing background run for thread {thread_id}")
+        raise HTTPException(status_code=500, detail=f"could not queue run for thread_id {thread_id}") from e
+
+    logger.info("Queued background run %s for thread %s", run.run_id, thread_id)
+
+    return RunCreatedResponse(run_id=run.run_id, thread_id=thread_id)
+
+
+@app.get("/threads/{thread_id}/runs/{run_id}/stream")
+async def resume_run_stream(thread_id: str, run_id: str, context: Request) -> StreamingResponse:
+    """
+    Resume the event stream of a run after a dropped connection.
+
+    Events after the `Last-Event-ID` header are replayed, then the stream
+    follows the run live if it is still executing.
+
+    Args:
+        thread_id: The unique identifier for the thread.
+        run_id: The run ID from the chat response's `X-Run-Id` header.
+        context: FastAPI application context.
+
+    Returns:
+        A streaming response with SSE-formatted events.
+    """
+    # ensure user_id and token are in request (raises HTTP errors on failure)
+    user_id = await get_user_credentials(context)
+
+    # validate user_id thread_id pair (raises HTTP errors on failure)
+    await validate_thread_id(
+        user_id=user_id,
+        thread_id=thread_id,
+        context=context
+    )
+
+    # id of the last event the client received, absent replays from the start
+    last_event_id = context.headers.get("Last-Event-ID", "0")
+    if not last_event_id.isdigit():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Last-Event-ID must be a non-negative integer"
+        )
+
+    try:
+        events = await context.app.state.run_coordinator.resume(
+            thread_id=thread_id,
+            run_id=run_id,
+            last_event_id=int(last_event_id),
+        )
+
+    except Exception as e:
+        logger.exception(f"error resuming run {run_id} for thread {thread_id}")
+        raise HTTPException(status_code=500, detail=f"could not resume run {run_id}") from e
+
+    if events is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"run_id {run_id} not found for thread_id {thread_id}"
+        )
+
+    logger.info("Resuming run %s for thread %s after event %s", run_id, thread_id, last_event_id)
+
+    return create_run_stream_response(events, run_id)
+
+
+@app.post("/threads/{thread_id}/cancel", response_model=CancelRunResponse)
+async def cancel_run(thread_id: str, context: Request):
+    """
+    Cancel the run in progress on a thread.
+
+    The graph task and its in-flight model requests are cancelled, and the
+    thread is checkpointed with the answer streamed so far.
+
+    Args:
+        thread_id: The unique identifier for the thread.
+        context: FastAPI application context.
+
+    Returns:
+        CancelRunResponse with the outcome.
+    """
+    # ensure user_id and token are in request (raises HTTP errors on failure)
+    user_id = await get_user_credentials(context)
+
+    # validate user_id thread_id pair (raises HTTP errors on failure)
+    await validate_thread_id(
+        user_id=user_id,
+        thread_id=thread_id,
+        context=context
+    )
+
+    run_coordinator = context.app.state.run_coordinator
+
+    try:
+        # background runs that have not started yet are dropped outright
+        cancelled_queued = await context.app.state.run_queue.cancel_queued(thread_id)
+        for run_id in cancelled_queued:
+            await run_coordinator.close_run(thread_id, run_id, {"type": "cancelled"})
+
+        outcome = await run_coordinator.cancel(thread_id)
+        if outcome is CancelOutcome.NOT_RUNNING and cancelled_queued:
+            outcome = CancelOutcome.CANCELLED
+
+    except Exception as e:
+        logger.exception(f"error cancelling run for thread {thread_id}")
+        raise HTTPException(status_code=500, detail=f"could not cancel run for thread_id {thread_id}") from e
+
+    logger.info("Cancel request for thread %s: %s", thread_id, outcome.value)
+
+    return CancelRunResponse(thread_id=thread_id, status=outcome.value)
+
+
 @app.post("/generate-thread-id", status_code=status.HTTP_201_CREATED, response_model=ThreadIdResponse)
 async def generate_thread_id(context: Request):
     """
@@ -429,9 +999,20 @@ async def generate_thread_id(context: Request):
 
 
 def main():
-    """Run the uvicorn server."""
+    """
+    Run the uvicorn server.
+
+    SERVER_MODE=production runs pre-forked workers sized to the available cores,
+    otherwise a single auto-reloading development server is started.
+    """
     host = os.getenv("BACKEND_HOST", "0.0.0.0")
     port = int(os.getenv("BACKEND_PORT", "8000"))
+
+    if os.getenv("SERVER_MODE", "development").lower() == "production":
+        from utils.production_server import run_production_server
+        run_production_server("server:app", host=host, port=port)
+        return
+
     uvicorn.run(
         "server:app",
         host=host,
@@ -17,6 +17,18 @@ class ChatRequest(BaseModel):
 
     message: str
     default_message_id: str | None = None
+    # behavior when the thread already has a run in progress
+    on_conflict: Literal["queue", "reject", "join"] = "queue"
+    # "delta" streams state_delta patches instead of full state_update snapshots
+    state_updates: Literal["snapshot", "delta"] = "snapshot"
+
+
+class CreateRunRequest(BaseModel):
+    """Request model for starting a background run."""
+
+    message: str
+    # "delta" streams state_delta patches instead of full state_update snapshots
+    state_updates: Literal["snapshot", "delta"] = "snapshot"
 
 
 class StateUpdateRequest(BaseModel):
@@ -74,22 +86,65 @@ class StateUpdateChunk(BaseModel):
     state: dict[str, Any]
 
 
+class StateDeltaChunk(BaseModel):
+    """
+    Incremental state update for streaming.
+
+    `state` holds only messages and artifacts that are new or changed since the
+    previous delta (upserted by id), plus `removed_message_ids` and, when older
+    messages were archived out of the window, `archived_message_count`. `seq`
+    increases by one per delta within a stream so clients can detect gaps.
+    """
+
+    type: Literal["state_delta"]
+    seq: int
+    state: dict[str, Any]
+
+
 class DoneChunk(BaseModel):
     """End of stream marker."""
 
     type: Literal["done"]
 
 
+class CancelledChunk(BaseModel):
+    """End of stream marker for a run that was cancelled before finishing."""
+
+    type: Literal["cancelled"]
+
+
 # Response Models for Regular Endpoints
 class ThreadIdResponse(BaseModel):
     """Response for thread ID generation."""
 
     thread_id: str
 
+class RunCreatedResponse(BaseModel):
+    """Response for a queued background run."""
+
+    run_id: str
+    thread_id: str
+    status: Literal["queued"] = "queued"
+
+class CancelRunResponse(BaseModel):
+    """Response for cancelling a thread's run."""
+
+    thread_id: str
+    status: Literal["cancelled", "cancel_requested", "not_running"]
+
 class ThreadsResponse(BaseModel):
-    """Response for requesting a list of user's threads."""
+    """Response for requesting a page of the user's threads."""
 
     threads: list[dict[str, Any]]
+    # pass as `cursor` to fetch the next page, None on the last page
+    next_cursor: str | None = None
+
+class ThreadMessagesResponse(BaseModel):
+    """Response for requesting a page of a thread's archived messages."""
+
+    messages: list["ProcessedMessage"]
+    # pass as `before` to fetch the preceding page, None once the start of the thread is reached
+    next_before: int | None = None
 
 class StartingMessagesResponse(BaseModel):
     """Response for starting messages."""
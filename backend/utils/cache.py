@@ -0,0 +1,110 @@
+"""
+In-process caching primitives shared by the server and clients.
+
+These caches are intentionally simple: they live on the event loop thread, are
+bounded by entry count, and evict in least-recently-used order so memory stays
+flat no matter how many users or threads a worker sees.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+# sentinel used to distinguish a cached None from a miss
+_MISSING = object()
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Size-bounded LRU cache whose entries expire after a time-to-live.
+
+    Entries may carry their own expiry (e.g. a JWT `exp` claim) which is capped
+    by the cache-wide `ttl_seconds`.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: K) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def get(self, key: K, default: Any = None) -> V | Any:
+        """
+        Return the cached value for `key`, or `default` if missing or expired.
+
+        Args:
+            key: The cache key.
+            default: Value returned on a miss.
+
+        Returns:
+            The cached value or `default`.
+        """
+        entry = self._entries.get(key)
+
+        if entry is None:
+            self.misses += 1
+            return default
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: K, value: V, expires_at: float | None = None) -> None:
+        """
+        Store `value` under `key`, evicting the least recently used entry when full.
+
+        Args:
+            key: The cache key.
+            value: The value to store.
+            expires_at: Optional absolute expiry on the `time.monotonic()` clock.
+                It is capped by the cache-wide TTL.
+        """
+        max_expiry = time.monotonic() + self.ttl_seconds
+        expiry = max_expiry if expires_at is None else min(expires_at, max_expiry)
+
+        self._entries[key] = (expiry, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: K, default: Any = None) -> V | Any:
+        """Remove `key` from the cache, returning its value if present."""
+        entry = self._entries.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def keys(self) -> list[K]:
+        """Return the cached keys, least recently used first, including expired ones."""
+        return list(self._entries)
+
+    def clear(self) -> None:
+        """Remove every entry from the cache."""
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Return size and hit/miss counters for health reporting."""
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -5,19 +5,22 @@ This module handles all LangGraph/LangChain specific logic, converting between
 LangGraph types and the clean API format. This keeps server.py framework-agnostic.
 """
 
-import json
+import asyncio
 import uuid
-from datetime import date, datetime
-from typing import Any, AsyncGenerator
+from typing import Any, AsyncGenerator, Awaitable, Callable, Literal
 
 from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, ToolMessage
+from langgraph.graph import END
+from langgraph.types import Durability
 
 from clients.logging_client import LoggingClient
 from core.graphs.types.artifact import StreamingArtifact
+from core.graphs.types.guardrail_validation import GuardrailVerdict
 from utils.api_models import (
     ConversionResult,
     ProcessedMessage,
 )
+from utils.sse import coalesce_sse_events
 
 # Configure logging
 logger = LoggingClient.get_logger(__name__)
@@ -40,18 +43,8 @@ STARTING_MESSAGES = [
     {"label": "College Planning", "message": "What are my options for college funding?"},
 ]
 
-
-class StateGraphEncoder(json.JSONEncoder):
-    """Custom JSON encoder for LangGraph state objects."""
-
-    def default(self, obj):
-        if isinstance(obj, BaseMessage):
-            return obj.to_json()["kwargs"]
-        if hasattr(obj, "__dict__"):  # For RowData or similar objects
-            return obj.__dict__
-        if isinstance(obj, (date, datetime)):
-            return obj.isoformat()
-        return super().default(obj)
+# characters of the last message kept for the thread list
+MESSAGE_PREVIEW_MAX_CHARS = 160
 
 
 def get_default_message(message_id: str) -> str | None:
@@ -77,6 +70,28 @@ def get_starting_messages() -> list[dict[str, str]]:
     return STARTING_MESSAGES.copy()
 
 
+def get_message_preview(messages: list[BaseMessage], max_chars: int = MESSAGE_PREVIEW_MAX_CHARS) -> str | None:
+    """
+    Build the thread list preview from the last user or AI message with text.
+
+    Args:
+        messages: The thread's messages in order.
+        max_chars: Maximum preview length.
+
+    Returns:
+        The whitespace-collapsed, truncated text, or None if no message has text.
+    """
+    for message in reversed(messages):
+        if not isinstance(message, (HumanMessage, AIMessage)):
+            continue
+
+        preview = " ".join(message.text().split())
+        if preview:
+            return preview if len(preview) <= max_chars else preview[: max_chars - 1].rstrip() + "…"
+
+    return None
+
+
 def should_convert_tool_to_artifact(tool_message: ToolMessage) -> bool:
     """
     Determine if a ToolMessage should be converted to an artifact.
@@ -162,74 +177,127 @@ def convert_tool_message_for_streaming(tool_message: ToolMessage) -> dict[str, A
     return chunk
 
 
-def process_streaming_chunk(stream_mode: str, chunk: Any, thread_id: str) ->str | None:
+def process_streaming_chunk(
+    stream_mode: str,
+    chunk: Any,
+    thread_id: str,
+    delta_tracker: "StateDeltaTracker | None" = None,
+) -> dict[str, Any] | None:
     """
-    Process a stream chunk from LangGraph and format it for SSE.
+    Process a stream chunk from LangGraph and convert it to an API payload.
 
     Args:
-        stream_mode: The mode of the stream chunk ("messages" or "values").
+        stream_mode: The mode of the stream chunk ("messages", "values" or "custom").
         chunk: The chunk data from LangGraph.
         thread_id: The ID of the thread (for logging).
+        delta_tracker: When provided, state is streamed as `state_delta` patches
+            instead of full `state_update` snapshots.
 
     Returns:
-        SSE-formatted data string, or None if chunk should be skipped.
+        Payload dict to send as an SSE event, or None if chunk should be skipped.
     """
     if stream_mode == "messages":
-        logger.debug("Processing message chunk for thread %s", thread_id)
-
         # Handle AI message chunks
         if isinstance(chunk[0], AIMessageChunk):
-            formatted_chunk = convert_ai_message_chunk_for_streaming(chunk[0])
-            if formatted_chunk:
-                return f"data: {json.dumps(formatted_chunk)}\n\n"
+            return convert_ai_message_chunk_for_streaming(chunk[0])
 
         return None
 
     elif stream_mode == "custom":
 
         if isinstance(chunk, StreamingArtifact):
-            serialized_artifact = chunk.model_dump(mode="json")
-            return f"data: {json.dumps(serialized_artifact)}\n\n"
+            return chunk.model_dump(mode="json")
 
         return None
 
+    elif stream_mode == "values" and delta_tracker is not None:
+        # Stream only messages and artifacts that changed since the last superstep
+        return delta_tracker.diff(chunk)
+
     elif stream_mode == "values":
         # Handle state updates - only stream state updates, not suggested messages
-        try:
-            # Work with the chunk dict directly before serialization
-            filtered_state_dict = {}
-
-            # Only convert messages if the key exists
-            if "messages" in chunk:
-                converted_messages = convert_historical_messages(chunk["messages"]).messages
-                filtered_state_dict["messages"] = converted_messages
+        filtered_state_dict = {}
 
-            # Include artifacts if the key exists (even if empty list)
-            if "artifacts" in chunk:
-                filtered_state_dict["artifacts"] = chunk["artifacts"]
+        # Only convert messages if the key exists
+        if "messages" in chunk:
+            converted_messages = convert_historical_messages(chunk["messages"]).messages
+            filtered_state_dict["messages"] = converted_messages
 
-            # Return None if neither messages nor artifacts keys are present
-            if not filtered_state_dict:
-                return None
+        # Include artifacts if the key exists (even if empty list)
+        if "artifacts" in chunk:
+            filtered_state_dict["artifacts"] = chunk["artifacts"]
 
-            state_chunk = {
-                "type": "state_update",
-                "state": filtered_state_dict,
-            }
+        # Older messages than the window are paged from GET /threads/{thread_id}/messages
+        if chunk.get("archived_message_count"):
+            filtered_state_dict["archived_message_count"] = chunk["archived_message_count"]
 
-            return f"data: {json.dumps(state_chunk, cls=StateGraphEncoder)}\n\n"
+        # Return None if neither messages nor artifacts keys are present
+        if not filtered_state_dict:
+            return None
 
-        except (TypeError, ValueError) as err:
-            logger.error("Error serializing state for thread %s: %s", thread_id, err, exc_info=True)
-            # Handle non-serializable objects gracefully
-            fallback_chunk = {"type": "state_update", "state": {"error": "State not serializable"}}
-            return f"data: {json.dumps(fallback_chunk)}\n\n"
+        return {"type": "state_update", "state": filtered_state_dict}
 
     else:
-        logger.debug("Ignoring stream mode: %s", stream_mode)
+        logger.debug("Ignoring stream mode %s for thread %s", stream_mode, thread_id)
         return None
 
 
+def convert_message(msg: BaseMessage) -> ProcessedMessage | None:
+    """
+    Convert a single LangGraph message to API format.
+
+    Args:
+        msg: A LangGraph BaseMessage.
+
+    Returns:
+        The processed message, or None if the message is internal and filtered out.
+    """
+    if isinstance(msg, HumanMessage):
+        return ProcessedMessage(type="human", content=msg.content, id=msg.id)
+
+    elif isinstance(msg, AIMessage):
+        content = msg.content
+
+        if isinstance(content, list):
+
+            text_parts = []
+            for item in content:
+                if isinstance(item, str):
+                    text_parts.append(item)
+                elif isinstance(item, dict) and "text" in item:
+                    text_parts.append(item["text"])
+                elif hasattr(item, "text"):
+                    text_parts.append(item.text)
+
+            # If there are no text parts, skip the message
+            if not text_parts:
+                return None
+
+            content = " ".join(text_parts)
+
+        return ProcessedMessage(type="ai_message", content=content, id=msg.id)
+
+    elif isinstance(msg, ToolMessage) and should_convert_tool_to_artifact(msg):
+        # Build the processed message with artifact data
+        processed_msg = ProcessedMessage(
+            type="artifact",
+            content=None,
+            id=msg.tool_call_id
+        )
+
+        # If artifact data is provided, flatten it into the message
+        if hasattr(msg, 'artifact') and isinstance(msg.artifact, dict):
+            processed_msg.artifact = msg.artifact
+
+        logger.debug("Converted ToolMessage to artifact: %s", msg.tool_call_id)
+
+        return processed_msg
+
+    # Filter out internal messages
+    logger.debug("Filtering internal message type: %s", type(msg).__name__)
+    return None
+
+
 def convert_historical_messages(messages: list[BaseMessage]) -> ConversionResult:
     """
     Convert historical messages from LangGraph format to API format.
@@ -246,97 +314,296 @@ def convert_historical_messages(messages: list[BaseMessage]) -> ConversionResult
     processed_messages = []
 
     for msg in messages:
-        if isinstance(msg, HumanMessage):
-            content = msg.content
-            processed_messages.append(ProcessedMessage(type="human", content=content, id=msg.id))
-
-        elif isinstance(msg, AIMessage):
-            content = msg.content
-
-            if isinstance(content, list):
-
-                text_parts = []
-                for item in content:
-                    if isinstance(item, str):
-                        text_parts.append(item)
-                    elif isinstance(item, dict) and "text" in item:
-                        text_parts.append(item["text"])
-                    elif hasattr(item, "text"):
-                        text_parts.append(item.text)
-
-                # If there are no text parts, skip the message
-                if not text_parts:
-                    continue
+        processed_msg = convert_message(msg)
+        if processed_msg is not None:
+            processed_messages.append(processed_msg)
 
-                content = " ".join(text_parts)
+    return ConversionResult(messages=processed_messages)
 
-            processed_messages.append(ProcessedMessage(type="ai_message", content=content, id=msg.id))
 
-        elif isinstance(msg, ToolMessage) and should_convert_tool_to_artifact(msg):
-            # Build the processed message with artifact data
-            processed_msg = ProcessedMessage(
-                type="artifact",
-                content=None,
-                id=msg.tool_call_id
-            )
+class StateDeltaTracker:
+    """
+    Tracks what a client has already received during one streamed run so each
+    `values` superstep can be sent as a patch instead of a full-state snapshot.
+
+    Messages are keyed by id and compared by object identity, so unchanged
+    history costs a dictionary lookup per message rather than a conversion and
+    JSON encode. The first superstep only establishes the baseline: history the
+    client already has is recorded but not re-sent. Messages archived out of the
+    window are reported through `archived_message_count`, not as removals.
+    """
+
+    def __init__(self, new_message_count: int = 0):
+        """
+        Args:
+            new_message_count: Number of messages the run's input appends to the
+                thread. These are sent with the first delta; older ones are not.
+        """
+        self._new_message_count = new_message_count
+        self._has_baseline = False
+        self._seq = 0
+
+        # message id -> (message object last sent, processed id or None if filtered)
+        self._messages: dict[str, tuple[BaseMessage, str | None]] = {}
+        self._artifacts: dict[str, Any] = {}
+        self._archived_message_count = 0
+
+    def diff(self, state: dict[str, Any]) -> dict[str, Any] | None:
+        """
+        Compute the patch between what was sent and the current state.
+
+        Args:
+            state: A `values` stream chunk.
+
+        Returns:
+            A state_delta chunk, or None if nothing visible changed.
+        """
+        delta: dict[str, Any] = {}
+
+        # the oldest tracked messages moved to the archive, the client keeps showing them
+        archived_message_count = state.get("archived_message_count") or 0
+        if archived_message_count > self._archived_message_count:
+            if self._has_baseline:
+                for message_id in list(self._messages)[:archived_message_count - self._archived_message_count]:
+                    del self._messages[message_id]
+                delta["archived_message_count"] = archived_message_count
+            self._archived_message_count = archived_message_count
+
+        if "messages" in state:
+            upserted, removed_ids = self._diff_messages(state["messages"])
+            if upserted:
+                delta["messages"] = upserted
+            if removed_ids:
+                delta["removed_message_ids"] = removed_ids
+
+        if "artifacts" in state:
+            artifacts = self._diff_artifacts(state["artifacts"])
+            if artifacts:
+                delta["artifacts"] = artifacts
+
+        self._has_baseline = True
+
+        if not delta:
+            return None
 
-            # If artifact data is provided, flatten it into the message
-            if hasattr(msg, 'artifact') and isinstance(msg.artifact, dict):
-                processed_msg.artifact = msg.artifact
+        self._seq += 1
+        return {"type": "state_delta", "seq": self._seq, "state": delta}
 
-            processed_messages.append(processed_msg)
+    def _diff_messages(self, messages: list[BaseMessage]) -> tuple[list[ProcessedMessage], list[str]]:
+        """Return converted new or replaced messages, and processed ids of removed ones."""
+        # history before the run's own input is already on the client
+        baseline_end = 0
+        if not self._has_baseline:
+            baseline_end = max(0, len(messages) - self._new_message_count)
 
-            logger.info("Converted historical ToolMessage to artifact: %s", msg.tool_call_id)
+        upserted = []
+        current_ids = set()
 
-        else:
-            # Filter out internal messages
-            logger.debug("Filtering internal message type: %s", type(msg).__name__)
+        for index, msg in enumerate(messages):
+            current_ids.add(msg.id)
+            tracked = self._messages.get(msg.id)
 
-    return ConversionResult(messages=processed_messages)
+            if tracked is not None and tracked[0] is msg:
+                continue
+
+            processed_msg = convert_message(msg)
+            processed_id = processed_msg.id if processed_msg is not None else None
+            self._messages[msg.id] = (msg, processed_id)
+
+            if processed_msg is not None and index >= baseline_end:
+                upserted.append(processed_msg)
+
+        removed_ids = []
+        if len(current_ids) != len(self._messages):
+            for message_id in [mid for mid in self._messages if mid not in current_ids]:
+                _, processed_id = self._messages.pop(message_id)
+                if processed_id is not None:
+                    removed_ids.append(processed_id)
+
+        return upserted, removed_ids
+
+    def _diff_artifacts(self, artifacts: list[Any]) -> list[Any]:
+        """Return artifacts that are new or were replaced since the last delta."""
+        changed = []
+
+        for artifact in artifacts:
+            artifact_id = artifact.get("id") if isinstance(artifact, dict) else getattr(artifact, "id", None)
+            if self._artifacts.get(artifact_id) is artifact:
+                continue
+
+            self._artifacts[artifact_id] = artifact
+            if self._has_baseline:
+                changed.append(artifact)
+
+        return changed
 
 
-async def  stream_graph_responses(
-    graph, input_state: dict[str, Any], config: dict[str, Any], thread_id: str
-) -> AsyncGenerator[str, None]:
+async def stream_graph_responses(
+    graph,
+    input_state: dict[str, Any],
+    config: dict[str, Any],
+    thread_id: str,
+    on_complete: Callable[[dict[str, Any]], Awaitable[None]] | None = None,
+    state_updates: Literal["snapshot", "delta"] = "snapshot",
+    durability: Durability = "async",
+) -> AsyncGenerator[bytes, None]:
     """
     Stream responses from the LangGraph and convert them to API format.
 
+    Consecutive AI token deltas are coalesced into larger frames, see
+    `utils.sse.coalesce_sse_events`. Output of an agent started ahead of the input
+    guardrail is held back until the guardrail passes it, and dropped if it blocks.
+
     Args:
         graph: The compiled LangGraph instance.
         input_state: The input state for the graph.
         config: The configuration for the graph execution.
         thread_id: The thread ID for logging.
+        on_complete: Optional coroutine awaited with the final state once the graph run
+            finishes without error.
+        state_updates: "snapshot" sends the full converted state after every superstep,
+            "delta" sends only new or changed messages and artifacts with a sequence number.
+        durability: When checkpoints are written. "exit" keeps intermediate supersteps in
+            memory and persists once when the run ends, including when it fails or is
+            cancelled; "async" and "sync" persist every superstep.
 
     Yields:
-        SSE-formatted data strings.
+        Encoded SSE frames.
     """
+    payloads = _stream_graph_payloads(graph, input_state, config, thread_id, on_complete, state_updates, durability)
+
+    async for frame in coalesce_sse_events(payloads):
+        yield frame
+
+
+async def _stream_graph_payloads(
+    graph,
+    input_state: dict[str, Any],
+    config: dict[str, Any],
+    thread_id: str,
+    on_complete: Callable[[dict[str, Any]], Awaitable[None]] | None,
+    state_updates: Literal["snapshot", "delta"],
+    durability: Durability,
+) -> AsyncGenerator[dict[str, Any], None]:
+    """Run the graph and yield API payloads, ending with a done or error payload."""
+    # text of the AI message being streamed, kept if the run is cancelled mid-answer
+    partial_message_id: str | None = None
+    partial_parts: list[str] = []
+
+    # last full state of the parent graph, handed to on_complete
+    final_state: dict[str, Any] = input_state
+
+    # payloads of a speculatively started answer, held while the guardrail verdict is pending
+    held_payloads: list[dict[str, Any]] | None = None
+
     try:
         logger.info("Starting graph stream for thread: %s", thread_id)
 
         stream_modes = ["messages", "values", "custom"]
 
-        async for stream_mode, chunk in graph.astream(input_state, config=config, stream_mode=stream_modes):
+        delta_tracker = None
+        if state_updates == "delta":
+            delta_tracker = StateDeltaTracker(new_message_count=len(input_state.get("messages", [])))
+
+        # subgraphs=True so tokens from agent subgraphs are streamed too
+        async for namespace, stream_mode, chunk in graph.astream(
+            input_state, config=config, stream_mode=stream_modes, subgraphs=True, durability=durability
+        ):
+            # state updates only describe the parent graph's state
+            if stream_mode == "values":
+                if namespace:
+                    continue
+                final_state = chunk
+
+            # speculative answers are released or dropped once the guardrail decides
+            if stream_mode == "custom" and isinstance(chunk, GuardrailVerdict):
+                if chunk.status == "pending":
+                    held_payloads = []
+                    continue
+
+                payloads = held_payloads if chunk.status == "passed" else []
+                if chunk.status == "blocked":
+                    logger.info("Dropped %d speculative payloads for thread %s", len(held_payloads or []), thread_id)
+                held_payloads = None
+
+            else:
+                try:
+                    payload = process_streaming_chunk(stream_mode, chunk, thread_id, delta_tracker)
+                except Exception as chunk_error:
+                    logger.error(
+                        "Error processing stream chunk for thread %s: %s", thread_id, str(chunk_error), exc_info=True
+                    )
+                    payload = {"id": str(uuid.uuid4()), "type": "error", "content": "Error processing response chunk"}
+
+                if not payload:
+                    continue
+
+                if held_payloads is not None:
+                    held_payloads.append(payload)
+                    continue
+
+                payloads = [payload]
+
+            for payload in payloads:
+                if payload["type"] == "ai_message":
+                    if payload["id"] != partial_message_id:
+                        partial_message_id, partial_parts = payload["id"], []
+                    partial_parts.append(payload["content"])
+
+                yield payload
+
+        if on_complete is not None:
             try:
-                formatted_data = process_streaming_chunk(stream_mode, chunk, thread_id)
-                if formatted_data:
-                    yield formatted_data
-            except Exception as chunk_error:
-                logger.error(
-                    "Error processing stream chunk for thread %s: %s", thread_id, str(chunk_error), exc_info=True
-                )
-                error_chunk = {"id": str(uuid.uuid4()), "type": "error", "content": "Error processing response chunk"}
-                yield f"data: {json.dumps(error_chunk)}\n\n"
+                await on_complete(final_state)
+            except Exception:
+                logger.exception("Error recording completed run for thread %s", thread_id)
 
         # Signal end of stream
-        done_chunk = {"type": "done"}
-        yield f"data: {json.dumps(done_chunk)}\n\n"
+        yield {"type": "done"}
 
         logger.info("Completed graph stream for thread: %s", thread_id)
 
+    except asyncio.CancelledError:
+        logger.info("Graph stream cancelled for thread: %s", thread_id)
+
+        partial_message = None
+        if partial_parts:
+            partial_message = AIMessage(id=partial_message_id, content="".join(partial_parts))
+
+        await checkpoint_cancelled_run(graph, config, partial_message)
+        raise
+
     except Exception as e:
         logger.error("Error in graph stream for thread %s: %s", thread_id, str(e), exc_info=True)
-        error_chunk = {"id": str(uuid.uuid4()), "type": "error", "content": str(e)}
-        yield f"data: {json.dumps(error_chunk)}\n\n"
+        yield {"id": str(uuid.uuid4()), "type": "error", "content": str(e)}
+
+
+async def checkpoint_cancelled_run(graph, config: dict[str, Any], partial_message: AIMessage | None = None) -> None:
+    """
+    Leave a cancelled run's thread in a state the next turn can build on.
+
+    Nodes still pending in the interrupted superstep are cleared so the thread
+    ends cleanly instead of keeping unfinished work (e.g. tool calls without
+    results), and the answer streamed so far is kept as the turn's AI message.
+
+    Args:
+        graph: The compiled LangGraph instance.
+        config: The configuration of the cancelled run.
+        partial_message: The partially streamed AI message, if any.
+    """
+    try:
+        state = await graph.aget_state(config)
+        if not state.next:
+            return
+
+        await graph.aupdate_state(config, None, as_node=END)
+
+        saved_ids = {msg.id for msg in state.values.get("messages", [])}
+        if partial_message is not None and partial_message.id not in saved_ids:
+            await graph.aupdate_state(config, {"messages": [partial_message]})
+
+    except Exception:
+        logger.exception("Error checkpointing cancelled run for thread %s", config["configurable"].get("thread_id"))
 
 
 async def invoke_graph_raw(
@@ -0,0 +1,167 @@
+"""
+Production server runner.
+
+Runs the FastAPI app under a small pre-fork supervisor: the app module (and
+with it the compiled graph, chat models and prompt templates) is imported once
+in the parent, then N uvicorn workers are forked sharing one listening socket.
+uvicorn's own `workers=` option spawns fresh interpreters, which would repeat
+all of that start-up work in every worker and share nothing.
+
+Each worker runs uvloop and httptools when available. On SIGTERM the parent
+forwards the signal to every worker, and each worker stops accepting
+connections and lets in-flight SSE streams finish for up to
+`GRACEFUL_SHUTDOWN_TIMEOUT_SECONDS` before exiting.
+"""
+
+import gc
+import importlib
+import importlib.util
+import os
+import signal
+import sys
+import time
+from types import FrameType
+
+import uvicorn
+
+from clients.logging_client import LoggingClient
+
+logger = LoggingClient.get_logger(__name__)
+
+# pause before replacing a worker that died unexpectedly
+WORKER_RESTART_DELAY_SECONDS = 1.0
+
+
+def get_worker_count() -> int:
+    """
+    Number of worker processes, from WEB_CONCURRENCY or the CPUs available to this process.
+
+    Returns:
+        int: Worker process count (at least 1).
+    """
+    configured_workers = os.getenv("WEB_CONCURRENCY")
+    if configured_workers:
+        return max(1, int(configured_workers))
+
+    # respects cpu affinity / container cpusets, unlike os.cpu_count()
+    return max(1, len(os.sched_getaffinity(0)))
+
+
+def _select_implementation(preferred: str, module_name: str) -> str:
+    """Use the preferred uvicorn implementation when its package is installed."""
+    if importlib.util.find_spec(module_name) is not None:
+        return preferred
+
+    logger.warning("%s is not installed, falling back to uvicorn's default implementation", module_name)
+    return "auto"
+
+
+def _load_app(app_path: str):
+    """Import `module:attribute` and return the ASGI app."""
+    module_name, _, attribute = app_path.partition(":")
+    module = importlib.import_module(module_name)
+    return getattr(module, attribute)
+
+
+def _run_worker(config: uvicorn.Config, sockets: list) -> None:
+    """Serve requests in a forked worker until it is told to exit."""
+    # drop the supervisor's handlers, uvicorn installs its own for graceful shutdown
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+    server = uvicorn.Server(config)
+    server.run(sockets=sockets)
+
+
+def run_production_server(app_path: str, host: str, port: int) -> None:
+    """
+    Preload the app, fork worker processes and supervise them until shutdown.
+
+    Args:
+        app_path: Import path of the ASGI app, e.g. "server:app".
+        host: Interface to bind.
+        port: Port to bind.
+    """
+    workers = get_worker_count()
+
+    # exported before import so per-worker resources (e.g. db pools) size themselves
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+
+    # import graph, models and templates once, before forking
+    app = _load_app(app_path)
+
+    from core.prompts.loader import preload_templates
+    preload_templates()
+
+    config = uvicorn.Config(
+        app,
+        host=host,
+        port=port,
+        loop=_select_implementation("uvloop", "uvloop"),
+        http=_select_implementation("httptools", "httptools"),
+        lifespan="on",
+        proxy_headers=True,
+        timeout_keep_alive=int(os.getenv("KEEP_ALIVE_TIMEOUT_SECONDS", "5")),
+        timeout_graceful_shutdown=int(os.getenv("GRACEFUL_SHUTDOWN_TIMEOUT_SECONDS", "60")),
+    )
+    sockets = [config.bind_socket()]
+
+    # keep preloaded objects out of the gc's reach so forked workers share their pages
+    gc.collect()
+    gc.freeze()
+
+    children: set[int] = set()
+    shutting_down = False
+
+    def spawn_worker() -> None:
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 1
+            try:
+                _run_worker(config, sockets)
+                exit_code = 0
+            except BaseException:
+                logger.exception("worker %d crashed", os.getpid())
+            finally:
+                os._exit(exit_code)
+
+        children.add(pid)
+
+    def forward_signal(sig: int, frame: FrameType | None) -> None:
+        nonlocal shutting_down
+        shutting_down = True
+        logger.info("received %s, draining %d workers", signal.Signals(sig).name, len(children))
+
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, forward_signal)
+    signal.signal(signal.SIGINT, forward_signal)
+
+    logger.info("starting %d workers on %s:%d", workers, host, port)
+    for _ in range(workers):
+        spawn_worker()
+
+    # supervise workers, replacing any that die outside of shutdown
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+
+        children.discard(pid)
+
+        if not shutting_down:
+            logger.error("worker %d exited with status %d, restarting", pid, os.waitstatus_to_exitcode(status))
+            # avoid a tight crash loop when workers fail on start-up
+            time.sleep(WORKER_RESTART_DELAY_SECONDS)
+            spawn_worker()
+
+    for sock in sockets:
+        sock.close()
+
+    logger.info("all workers stopped")
+    sys.exit(0)
@@ -0,0 +1,163 @@
+"""
+Server-Sent Events encoding layer.
+
+Turns API payload dicts into SSE frames with orjson and precomputed frame
+bytes, and coalesces runs of `ai_message` token deltas into fewer frames so
+long answers cost far fewer writes without losing perceived smoothness.
+"""
+
+import asyncio
+import os
+import uuid
+from typing import Any, AsyncGenerator, AsyncIterator
+
+import orjson
+from langchain_core.messages import BaseMessage
+
+from clients.logging_client import LoggingClient
+
+logger = LoggingClient.get_logger(__name__)
+
+# precomputed frame pieces, every event is `data: <json>\n\n`
+DATA_PREFIX = b"data: "
+FRAME_SUFFIX = b"\n\n"
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+# token coalescing thresholds, either set to 0 disables coalescing
+COALESCE_INTERVAL_SECONDS = float(os.getenv("SSE_COALESCE_INTERVAL_MS", "20")) / 1000
+COALESCE_MAX_BYTES = int(os.getenv("SSE_COALESCE_MAX_BYTES", "256"))
+
+
+def _default(obj: Any) -> Any:
+    """Serialize LangGraph state objects orjson does not handle natively."""
+    if isinstance(obj, BaseMessage):
+        return obj.to_json()["kwargs"]
+    if hasattr(obj, "__dict__"):  # For ProcessedMessage, RowData or similar objects
+        return obj.__dict__
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def encode_sse_event(payload: Any) -> bytes:
+    """
+    Encode a payload as a single SSE `data:` frame.
+
+    Args:
+        payload: JSON-serializable payload (dicts, lists, LangGraph messages, dates).
+
+    Returns:
+        The encoded SSE frame.
+    """
+    return DATA_PREFIX + orjson.dumps(payload, default=_default, option=ORJSON_OPTIONS) + FRAME_SUFFIX
+
+
+def _encode_or_error(payload: dict[str, Any]) -> bytes:
+    """Encode a payload, replacing it with an error event if it cannot be serialized."""
+    try:
+        return encode_sse_event(payload)
+    except TypeError as err:
+        logger.error("Error serializing %s event: %s", payload.get("type"), err, exc_info=True)
+        return encode_sse_event(
+            {"id": str(uuid.uuid4()), "type": "error", "content": "Error processing response chunk"}
+        )
+
+
+def _is_token_delta(payload: dict[str, Any]) -> bool:
+    """Whether the payload is a streamed AI text delta that can be merged."""
+    return payload.get("type") == "ai_message" and isinstance(payload.get("content"), str)
+
+
+async def coalesce_sse_events(
+    payloads: AsyncIterator[dict[str, Any]],
+    flush_interval: float = COALESCE_INTERVAL_SECONDS,
+    flush_bytes: int = COALESCE_MAX_BYTES,
+) -> AsyncGenerator[bytes, None]:
+    """
+    Encode payloads as SSE frames, merging consecutive token deltas.
+
+    Consecutive `ai_message` payloads with the same id are buffered and sent as
+    one frame once `flush_bytes` of content accumulate, `flush_interval` seconds
+    pass since the first buffered token, or any other event arrives. Event order
+    is preserved.
+
+    Args:
+        payloads: API payload dicts in stream order.
+        flush_interval: Maximum seconds a token may wait in the buffer.
+        flush_bytes: Buffered content size that forces a flush.
+
+    Yields:
+        Encoded SSE frames.
+    """
+    if flush_interval <= 0 or flush_bytes <= 0:
+        async for payload in payloads:
+            yield _encode_or_error(payload)
+        return
+
+    loop = asyncio.get_running_loop()
+    iterator = aiter(payloads)
+
+    # pending token delta being merged
+    buffered_id: str | None = None
+    buffered_parts: list[str] = []
+    buffered_size = 0
+    flush_at = 0.0
+
+    # outstanding read from the source, only created while tokens are buffered
+    pending_read: asyncio.Future | None = None
+
+    def flush() -> bytes:
+        nonlocal buffered_id, buffered_parts, buffered_size
+        frame = encode_sse_event({"id": buffered_id, "type": "ai_message", "content": "".join(buffered_parts)})
+        buffered_id, buffered_parts, buffered_size = None, [], 0
+        return frame
+
+    try:
+        while True:
+            # wait for the next payload, flushing buffered tokens when their time is up
+            if buffered_id is not None:
+                if pending_read is None:
+                    pending_read = asyncio.ensure_future(anext(iterator))
+
+                done, _ = await asyncio.wait({pending_read}, timeout=max(0.0, flush_at - loop.time()))
+                if not done:
+                    yield flush()
+                    continue
+
+            try:
+                payload = await (pending_read if pending_read is not None else anext(iterator))
+            except StopAsyncIteration:
+                pending_read = None
+                break
+
+            pending_read = None
+
+            if _is_token_delta(payload):
+                if buffered_id is not None and payload["id"] != buffered_id:
+                    yield flush()
+
+                if buffered_id is None:
+                    buffered_id = payload["id"]
+                    flush_at = loop.time() + flush_interval
+
+                buffered_parts.append(payload["content"])
+                buffered_size += len(payload["content"].encode())
+
+                if buffered_size >= flush_bytes:
+                    yield flush()
+                continue
+
+            if buffered_id is not None:
+                yield flush()
+
+            yield _encode_or_error(payload)
+
+        if buffered_id is not None:
+            yield flush()
+
+    finally:
+        # stop the source, cancelling a read still in flight and letting its cleanup finish
+        if pending_read is not None:
+            pending_read.cancel()
+            await asyncio.wait({pending_read})
+        elif hasattr(iterator, "aclose"):
+            await iterator.aclose()